@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Appointment
+from .models import Appointment, ArchivedAppointment, CalendarSyncState, CalendarSyncTask, SlotHold
 
 
 @admin.register(Appointment)
@@ -18,3 +18,33 @@ class AppointmentAdmin(admin.ModelAdmin):
         queryset.update(status='cancelled')
 
     cancel_appointments.short_description = "Скасувати вибрані записи"
+
+
+
+@admin.register(CalendarSyncTask)
+class CalendarSyncTaskAdmin(admin.ModelAdmin):
+    list_display = ['appointment', 'action', 'status', 'attempts', 'next_attempt_at', 'created_at']
+    list_filter = ['status', 'action']
+    readonly_fields = ['appointment', 'action', 'event_id', 'attempts', 'last_error', 'created_at', 'updated_at']
+
+
+
+@admin.register(CalendarSyncState)
+class CalendarSyncStateAdmin(admin.ModelAdmin):
+    list_display = ['calendar_id', 'last_synced_at']
+    readonly_fields = ['sync_token', 'last_synced_at']
+
+
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    list_display = ['user', 'doctor', 'appointment_date', 'appointment_time', 'expires_at']
+    list_filter = ['appointment_date']
+
+
+
+@admin.register(ArchivedAppointment)
+class ArchivedAppointmentAdmin(admin.ModelAdmin):
+    list_display = ['user', 'doctor', 'appointment_date', 'appointment_time', 'status', 'archived_at']
+    list_filter = ['status', 'appointment_date']
+    search_fields = ['user__username', 'doctor__first_name', 'doctor__last_name']
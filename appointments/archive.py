@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Appointment, ArchivedAppointment
+
+ARCHIVED_STATUSES = ('completed', 'cancelled')
+
+
+def archivable(older_than_days):
+    """Finished appointments whose date is more than older_than_days in the past"""
+    cutoff = timezone.localdate() - timedelta(days=older_than_days)
+    return Appointment.objects.filter(status__in=ARCHIVED_STATUSES, appointment_date__lt=cutoff)
+
+
+def archive_batch(ids):
+    """Copy the given appointments to the archive and delete them from the hot table in one transaction"""
+    with transaction.atomic():
+        rows = Appointment.objects.filter(pk__in=ids, status__in=ARCHIVED_STATUSES).values(
+            *ArchivedAppointment.COPIED_FIELDS
+        )
+        archived = ArchivedAppointment.objects.bulk_create(
+            [ArchivedAppointment(**row) for row in rows],
+            ignore_conflicts=True
+        )
+        Appointment.objects.filter(pk__in=[row.pk for row in archived]).delete()
+    return len(archived)
+
+
+def archive_appointments(older_than_days, batch_size=500):
+    """Move archivable appointments batch by batch; returns the number of rows moved"""
+    moved = 0
+    while True:
+        ids = list(archivable(older_than_days).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return moved
+        moved += archive_batch(ids)
@@ -0,0 +1,179 @@
+import datetime
+import heapq
+import itertools
+from collections import defaultdict
+
+from django.utils import timezone
+
+from doctors.models import DoctorSchedule
+from .models import Appointment, SlotHold, DEFAULT_DURATION_MINUTES
+
+SLOT_STEP_MINUTES = 15
+MINUTES_PER_DAY = 24 * 60
+EARLIEST_HORIZON_DAYS = 30
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def interval_minutes(start_time, end_time):
+    """Minute offsets of a stored [start, end) interval; end_time is absent on legacy rows"""
+    start = to_minutes(start_time)
+    if end_time is None:
+        return start, min(start + DEFAULT_DURATION_MINUTES, MINUTES_PER_DAY)
+    if end_time == datetime.time.max:
+        return start, MINUTES_PER_DAY
+    return start, to_minutes(end_time)
+
+
+def span_mask(start, end):
+    """Bitmask with one bit per minute in [start, end)"""
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def date_range(date_from, date_to):
+    # Counted by offset so a range ending on date.max does not step past it
+    for offset in range((date_to - date_from).days + 1):
+        yield date_from + datetime.timedelta(days=offset)
+
+
+def load_schedules(doctor_ids):
+    """Return {doctor_id: {weekday: (start_minute, end_minute)}} in one query
+
+    doctor_ids may be a list or a values('id') queryset used as a subquery.
+    """
+    schedules = defaultdict(dict)
+    rows = DoctorSchedule.objects.filter(
+        doctor_id__in=doctor_ids,
+        is_active=True
+    ).values_list('doctor_id', 'weekday', 'start_time', 'end_time')
+
+    for doctor_id, weekday, start_time, end_time in rows:
+        schedules[doctor_id][weekday] = (to_minutes(start_time), to_minutes(end_time))
+    return schedules
+
+
+def load_busy_masks(doctor_ids, date_from, date_to, user=None):
+    """Return {(doctor_id, date): busy minute bitmask} for active appointments and live holds
+
+    Holds of `user` are not counted, so a patient still sees the slot they hold.
+    """
+    busy = defaultdict(int)
+    rows = Appointment.objects.active().filter(
+        doctor_id__in=doctor_ids,
+        appointment_date__range=(date_from, date_to)
+    ).values_list('doctor_id', 'appointment_date', 'appointment_time', 'end_time')
+
+    holds = SlotHold.objects.live().filter(
+        doctor_id__in=doctor_ids,
+        appointment_date__range=(date_from, date_to)
+    )
+    if user is not None and user.is_authenticated:
+        holds = holds.exclude(user=user)
+    hold_rows = holds.values_list('doctor_id', 'appointment_date', 'appointment_time', 'end_time')
+
+    for doctor_id, day, start_time, end_time in itertools.chain(rows, hold_rows):
+        busy[(doctor_id, day)] |= span_mask(*interval_minutes(start_time, end_time))
+    return busy
+
+
+def earliest_start(day, step=SLOT_STEP_MINUTES):
+    """First bookable minute of the day: slots that already started today are skipped"""
+    now = timezone.localtime()
+    if day < now.date():
+        return MINUTES_PER_DAY
+    if day > now.date():
+        return 0
+    current = now.hour * 60 + now.minute + 1
+    return -(-current // step) * step
+
+
+def iter_free_slots(working_hours, busy_mask, duration, not_before=0, step=SLOT_STEP_MINUTES):
+    """Yield start minutes of free slots of the given duration within working hours"""
+    if not working_hours:
+        return
+    start, end = working_hours
+    slot = start
+    if not_before > start:
+        slot += -(-(not_before - start) // step) * step
+    slot_mask = (1 << duration) - 1
+
+    while slot + duration <= end:
+        if not (busy_mask >> slot) & slot_mask:
+            yield slot
+        slot += step
+
+
+def doctor_availability(doctor_id, date_from, date_to, duration=DEFAULT_DURATION_MINUTES, user=None):
+    """Free slots of one doctor as a list of (date, [time, ...]) pairs"""
+    schedule = load_schedules([doctor_id]).get(doctor_id, {})
+    busy = load_busy_masks([doctor_id], date_from, date_to, user=user)
+
+    days = []
+    for day in date_range(date_from, date_to):
+        slots = iter_free_slots(
+            schedule.get(day.weekday()),
+            busy.get((doctor_id, day), 0),
+            duration,
+            not_before=earliest_start(day)
+        )
+        days.append((day, [from_minutes(slot) for slot in slots]))
+    return days
+
+
+def _doctor_slot_stream(doctor_id, schedule, busy, date_from, date_to, duration):
+    """Free slots of one doctor as sorted (date, minute, doctor_id) tuples"""
+    for day in date_range(date_from, date_to):
+        working_hours = schedule.get(day.weekday())
+        if not working_hours:
+            continue
+        slots = iter_free_slots(
+            working_hours,
+            busy.get((doctor_id, day), 0),
+            duration,
+            not_before=earliest_start(day)
+        )
+        for slot in slots:
+            yield day, slot, doctor_id
+
+
+def earliest_slots(doctor_ids, date_from, duration=DEFAULT_DURATION_MINUTES, limit=10,
+                   horizon_days=EARLIEST_HORIZON_DAYS, window_days=7, user=None):
+    """Soonest free slots across many doctors as a list of (date, time, doctor_id)
+
+    Appointments are loaded for all doctors at once per day window, and the
+    per-doctor slot streams are merged lazily with a heap, so the search stops
+    as soon as `limit` slots are found.
+    """
+    schedules = load_schedules(doctor_ids)
+    scheduled_ids = sorted(schedules)
+    if not scheduled_ids:
+        return []
+
+    results = []
+    horizon_end = date_from + datetime.timedelta(days=horizon_days - 1)
+    window_start = date_from
+
+    while window_start <= horizon_end and len(results) < limit:
+        window_end = min(window_start + datetime.timedelta(days=window_days - 1), horizon_end)
+        busy = load_busy_masks(doctor_ids, window_start, window_end, user=user)
+
+        streams = [
+            _doctor_slot_stream(doctor_id, schedules[doctor_id], busy, window_start, window_end, duration)
+            for doctor_id in scheduled_ids
+        ]
+        for day, slot, doctor_id in heapq.merge(*streams):
+            results.append((day, from_minutes(slot), doctor_id))
+            if len(results) == limit:
+                break
+
+        window_start = window_end + datetime.timedelta(days=1)
+
+    return results
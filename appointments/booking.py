@@ -0,0 +1,103 @@
+import itertools
+from collections import defaultdict
+
+from django.db import transaction
+
+from .availability import interval_minutes, span_mask
+from .models import Appointment, CalendarSyncTask, SlotHold, DEFAULT_DURATION_MINUTES, compute_end_time
+
+
+SLOT_TAKEN_MESSAGE = 'Цей час вже зайнятий.'
+SLOT_HELD_MESSAGE = 'Цей час тимчасово заброньовано іншим користувачем.'
+
+
+class SlotUnavailable(Exception):
+    """Raised inside the booking transaction to roll the new row back"""
+
+
+def check_slot_free(appointment, user):
+    """Verify a just-saved appointment inside its transaction
+
+    Exact double bookings are already rejected by the unique_active_appointment_slot
+    constraint when the row is inserted. This covers partial overlaps and other
+    patients' holds. On SQLite the INSERT takes the write lock before this check
+    runs, so two concurrent bookings cannot both pass it.
+    """
+    overlapping = Appointment.objects.overlapping(
+        appointment.doctor_id,
+        appointment.appointment_date,
+        appointment.appointment_time,
+        appointment.end_time
+    ).exclude(pk=appointment.pk)
+    if overlapping.exists():
+        raise SlotUnavailable(SLOT_TAKEN_MESSAGE)
+
+    held = SlotHold.objects.overlapping(
+        appointment.doctor_id,
+        appointment.appointment_date,
+        appointment.appointment_time,
+        appointment.end_time
+    ).exclude(user=user)
+    if held.exists():
+        raise SlotUnavailable(SLOT_HELD_MESSAGE)
+
+
+@transaction.atomic
+def book_series(user, doctor, slots, service=None, notes='', all_or_nothing=False):
+    """Book many (date, time) slots for one doctor in a single transaction
+
+    All slots are checked against existing bookings and other patients'
+    holds with one query each and against each other, then inserted with
+    bulk_create. Returns a list of per-slot dicts with status 'created' or
+    'conflict'; with all_or_nothing a single conflict leaves the free slots
+    'skipped'.
+    """
+    duration = service.duration_minutes if service else DEFAULT_DURATION_MINUTES
+
+    busy = defaultdict(int)
+    booked = Appointment.objects.active().filter(
+        doctor=doctor,
+        appointment_date__in={day for day, _ in slots}
+    ).values_list('appointment_date', 'appointment_time', 'end_time')
+    held = SlotHold.objects.live().filter(
+        doctor=doctor,
+        appointment_date__in={day for day, _ in slots}
+    ).exclude(user=user).values_list('appointment_date', 'appointment_time', 'end_time')
+    for day, start_time, end_time in itertools.chain(booked, held):
+        busy[day] |= span_mask(*interval_minutes(start_time, end_time))
+
+    results = []
+    new_appointments = []
+    for day, start_time in slots:
+        end_time = compute_end_time(start_time, duration)
+        mask = span_mask(*interval_minutes(start_time, end_time))
+        result = {'appointment_date': day, 'appointment_time': start_time, 'status': 'conflict', 'id': None}
+
+        if not busy[day] & mask:
+            busy[day] |= mask
+            result['status'] = 'created'
+            new_appointments.append((result, Appointment(
+                user=user,
+                doctor=doctor,
+                service=service,
+                appointment_date=day,
+                appointment_time=start_time,
+                end_time=end_time,
+                notes=notes
+            )))
+        results.append(result)
+
+    if all_or_nothing and len(new_appointments) != len(slots):
+        for result, _ in new_appointments:
+            result['status'] = 'skipped'
+        return results
+
+    if new_appointments:
+        created = Appointment.objects.bulk_create([appointment for _, appointment in new_appointments])
+        CalendarSyncTask.objects.bulk_create([
+            CalendarSyncTask(appointment=appointment, action='create') for appointment in created
+        ])
+        for (result, _), appointment in zip(new_appointments, created):
+            result['id'] = appointment.id
+
+    return results
@@ -0,0 +1,125 @@
+import itertools
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class SyncTokenExpired(Exception):
+    """The backend no longer accepts the stored sync token; a full listing is needed"""
+
+
+def get_calendar_backend():
+    """Instantiate the calendar backend configured in settings.CALENDAR_BACKEND"""
+    return import_string(settings.CALENDAR_BACKEND)()
+
+
+def open_batch(backend):
+    """Batch for the backend; backends without batch() get a sequential one"""
+    if hasattr(backend, 'batch'):
+        return backend.batch()
+    return SequentialBatch(backend)
+
+
+class SequentialBatch:
+    """Batch interface over a backend that can only make one call at a time"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._calls = []
+
+    def create_appointment_event(self, appointment):
+        return self._add(self.backend.create_appointment_event, appointment)
+
+    def update_appointment_event(self, event_id, appointment):
+        return self._add(self.backend.update_appointment_event, event_id, appointment)
+
+    def delete_appointment_event(self, event_id):
+        return self._add(self.backend.delete_appointment_event, event_id)
+
+    def _add(self, method, *args):
+        self._calls.append((method, args))
+        return len(self._calls) - 1
+
+    def execute(self):
+        results = []
+        for method, args in self._calls:
+            try:
+                results.append(method(*args))
+            except Exception as e:
+                results.append(e)
+        self._calls = []
+        return results
+
+
+class InMemoryCalendarBackend:
+    """Local stand-in for GoogleCalendarService used in development and tests
+
+    Events are kept in a class-level dict so that every instance created by the
+    outbox worker sees the same calendar. Every change is appended to a change
+    log; a sync token is a position in that log.
+    """
+    events = {}
+    change_log = []
+    _ids = itertools.count(1)
+
+    @classmethod
+    def reset(cls):
+        cls.events.clear()
+        cls.change_log.clear()
+        cls._ids = itertools.count(1)
+
+    def _event_body(self, appointment):
+        return {
+            'appointment_id': appointment.pk,
+            'summary': f'Прийом у {appointment.doctor.full_name}',
+            'date': appointment.appointment_date,
+            'start': appointment.appointment_time,
+            'end': appointment.end_time,
+        }
+
+    def create_appointment_event(self, appointment):
+        event_id = f'local{next(self._ids)}'
+        self.events[event_id] = self._event_body(appointment)
+        self.change_log.append(event_id)
+        return event_id
+
+    def update_appointment_event(self, event_id, appointment):
+        if event_id not in self.events:
+            return False
+        self.events[event_id] = self._event_body(appointment)
+        self.change_log.append(event_id)
+        return True
+
+    def delete_appointment_event(self, event_id):
+        if self.events.pop(event_id, None) is not None:
+            self.change_log.append(event_id)
+        return True
+
+    def edit_event(self, event_id, **fields):
+        """Change an event the way its owner would in the calendar app"""
+        self.events[event_id].update(fields)
+        self.change_log.append(event_id)
+
+    def list_changes(self, sync_token=None):
+        """Changed events since sync_token (all events without one) and the next token"""
+        if sync_token is None:
+            changed = list(self.events)
+        else:
+            position = int(sync_token)
+            if position > len(self.change_log):
+                raise SyncTokenExpired(sync_token)
+            changed = list(dict.fromkeys(self.change_log[position:]))
+        return [self._change(event_id) for event_id in changed], str(len(self.change_log))
+
+    def _change(self, event_id):
+        event = self.events.get(event_id)
+        if event is None:
+            return {'event_id': event_id, 'cancelled': True, 'start': None, 'end': None}
+        return {
+            'event_id': event_id,
+            'cancelled': False,
+            'start': timezone.make_aware(datetime.combine(event['date'], event['start'])),
+            'end': timezone.make_aware(datetime.combine(event['date'], event['end'])),
+        }
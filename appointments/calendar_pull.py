@@ -0,0 +1,73 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .booking import SlotUnavailable, check_slot_free
+from .calendar_backends import SyncTokenExpired, get_calendar_backend
+from .models import Appointment, CalendarSyncState
+
+LOOKUP_CHUNK = 500  # event ids per IN (...) lookup, below SQLite's variable limit
+
+
+def _apply_change(appointment, change):
+    """Bring an appointment in line with its calendar event; returns the stats key or None"""
+    if appointment.status not in Appointment.ACTIVE_STATUSES:
+        return None
+
+    if change['cancelled']:
+        appointment.status = 'cancelled'
+        appointment.save(update_fields=['status', 'updated_at'])
+        return 'cancelled'
+
+    if change['start'] is None:
+        return None
+    start = timezone.localtime(change['start'])
+    if (start.date(), start.time()) == (appointment.appointment_date, appointment.appointment_time):
+        return None
+
+    appointment.appointment_date = start.date()
+    appointment.appointment_time = start.time()
+    try:
+        with transaction.atomic():
+            appointment.save()
+            check_slot_free(appointment, appointment.user_id)
+    except (IntegrityError, SlotUnavailable):
+        return 'conflicts'
+    return 'moved'
+
+
+def pull_calendar_changes(backend=None, calendar_id='primary'):
+    """Apply events changed in the calendar since the last pull
+
+    Only events changed since the stored sync token are fetched; an expired
+    token falls back to one full listing. Changes are written straight to
+    Appointment without enqueueing outbox tasks, so they are not pushed back.
+    Returns a dict with received/moved/cancelled/conflicts counts.
+    """
+    if backend is None:
+        backend = get_calendar_backend()
+    state, _ = CalendarSyncState.objects.get_or_create(calendar_id=calendar_id)
+
+    try:
+        changes, next_token = backend.list_changes(state.sync_token or None)
+    except SyncTokenExpired:
+        changes, next_token = backend.list_changes(None)
+
+    # The latest change of an event wins
+    by_event = {change['event_id']: change for change in changes}
+    stats = {'received': len(changes), 'moved': 0, 'cancelled': 0, 'conflicts': 0}
+
+    event_ids = list(by_event)
+    for offset in range(0, len(event_ids), LOOKUP_CHUNK):
+        appointments = Appointment.objects.filter(
+            google_calendar_event_id__in=event_ids[offset:offset + LOOKUP_CHUNK]
+        ).select_related('service')
+        for appointment in appointments:
+            result = _apply_change(appointment, by_event[appointment.google_calendar_event_id])
+            if result:
+                stats[result] += 1
+
+    if next_token:
+        state.sync_token = next_token
+    state.last_synced_at = timezone.now()
+    state.save()
+    return stats
@@ -0,0 +1,24 @@
+import django_filters
+
+from .models import Appointment, ArchivedAppointment, upcoming_q
+
+
+class AppointmentFilter(django_filters.FilterSet):
+    upcoming = django_filters.BooleanFilter(method='filter_upcoming')
+    past = django_filters.BooleanFilter(method='filter_past')
+
+    class Meta:
+        model = Appointment
+        fields = ['status', 'doctor', 'appointment_date']
+
+    def filter_upcoming(self, queryset, name, value):
+        return queryset.filter(upcoming_q()) if value else queryset.exclude(upcoming_q())
+
+    def filter_past(self, queryset, name, value):
+        return self.filter_upcoming(queryset, name, not value)
+
+
+class ArchivedAppointmentFilter(AppointmentFilter):
+
+    class Meta(AppointmentFilter.Meta):
+        model = ArchivedAppointment
@@ -1,46 +1,169 @@
 import datetime
+import json
 import os
+import threading
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
 from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from .calendar_backends import SequentialBatch, SyncTokenExpired
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+BATCH_LIMIT = 50  # Google Calendar accepts at most 50 calls per batch request
+LIST_PAGE_SIZE = 2500  # largest page events().list returns
 
+_lock = threading.Lock()
+_local = threading.local()
+_credentials = None
+_discovery_document = None
 
-class GoogleCalendarService:
-    def __init__(self):
-        self.creds = None
-        self.service = None
-        self._authenticate()
 
-    def _authenticate(self):
-        """Authenticate with Google Calendar API"""
-        token_path = os.path.join(settings.BASE_DIR, 'token.json')
-        credentials_path = settings.GOOGLE_CALENDAR_CREDENTIALS
+def _load_credentials():
+    """Read token.json (or run the OAuth flow) once per process"""
+    token_path = os.path.join(settings.BASE_DIR, 'token.json')
+    credentials_path = settings.GOOGLE_CALENDAR_CREDENTIALS
+    creds = None
 
-        if os.path.exists(token_path):
-            self.creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    if os.path.exists(token_path):
+        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                self.creds.refresh(Request())
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            if os.path.exists(credentials_path):
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    credentials_path, SCOPES
+                )
+                creds = flow.run_local_server(port=0)
             else:
-                if os.path.exists(credentials_path):
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        credentials_path, SCOPES
-                    )
-                    self.creds = flow.run_local_server(port=0)
-                else:
-                    return None
+                return None
+
+        with open(token_path, 'w') as token:
+            token.write(creds.to_json())
+
+    return creds
+
+
+def get_credentials():
+    """Process-wide credentials, refreshed under a lock when they expire"""
+    global _credentials
 
+    with _lock:
+        if _credentials is None:
+            _credentials = _load_credentials()
+        elif not _credentials.valid and _credentials.refresh_token:
+            _credentials.refresh(Request())
+            token_path = os.path.join(settings.BASE_DIR, 'token.json')
             with open(token_path, 'w') as token:
-                token.write(self.creds.to_json())
+                token.write(_credentials.to_json())
+        return _credentials
+
+
+def _get_discovery_document():
+    global _discovery_document
+
+    if _discovery_document is None:
+        document = discovery_cache.get_static_doc('calendar', 'v3')
+        _discovery_document = json.loads(document) if document else None
+    return _discovery_document
+
+
+def get_calendar_client():
+    """Calendar API client for the current thread, built once from the cached discovery document
+
+    httplib2 connections are not thread-safe, so each thread keeps its own
+    client while credentials and the discovery document are shared.
+    """
+    creds = get_credentials()
+    if not creds:
+        return None
+
+    client = getattr(_local, 'client', None)
+    if client is None or _local.creds is not creds:
+        document = _get_discovery_document()
+        if document:
+            client = build_from_document(document, credentials=creds)
+        else:
+            client = build('calendar', 'v3', credentials=creds)
+        _local.client = client
+        _local.creds = creds
+    return client
+
 
-        if self.creds:
-            self.service = build('calendar', 'v3', credentials=self.creds)
+def _event_times(appointment):
+    start_datetime = datetime.datetime.combine(
+        appointment.appointment_date,
+        appointment.appointment_time
+    )
+    end_datetime = start_datetime + datetime.timedelta(minutes=appointment.duration_minutes)
+
+    return {
+        'start': {
+            'dateTime': start_datetime.isoformat(),
+            'timeZone': 'Europe/Kiev',
+        },
+        'end': {
+            'dateTime': end_datetime.isoformat(),
+            'timeZone': 'Europe/Kiev',
+        },
+    }
+
+
+def _event_description(appointment):
+    return f'Послуга: {appointment.service.name if appointment.service else "Консультація"}\n' \
+           f'Лікар: {appointment.doctor.full_name}\n' \
+           f'Клініка: {appointment.doctor.clinic.name}\n' \
+           f'Примітки: {appointment.notes}'
+
+
+def _event_body(appointment):
+    return {
+        'summary': f'Прийом у {appointment.doctor.full_name}',
+        'location': appointment.doctor.clinic.address,
+        'description': _event_description(appointment),
+        **_event_times(appointment),
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                {'method': 'popup', 'minutes': 60},  # 1 hour before
+            ],
+        },
+    }
+
+
+def _event_patch(appointment):
+    return {
+        'description': _event_description(appointment),
+        **_event_times(appointment),
+    }
+
+
+def _event_change(event):
+    """Backend-neutral change dict for an item of events().list"""
+    if event.get('status') == 'cancelled':
+        return {'event_id': event['id'], 'cancelled': True, 'start': None, 'end': None}
+    # All-day events have only a 'date' and never belong to an appointment
+    start = event.get('start', {}).get('dateTime')
+    end = event.get('end', {}).get('dateTime')
+    return {
+        'event_id': event['id'],
+        'cancelled': False,
+        'start': parse_datetime(start) if start else None,
+        'end': parse_datetime(end) if end else None,
+    }
+
+
+class GoogleCalendarService:
+    def __init__(self):
+        self.creds = get_credentials()
+        self.service = get_calendar_client() if self.creds else None
 
     def create_appointment_event(self, appointment):
         """Create a calendar event for an appointment"""
@@ -48,42 +171,9 @@ class GoogleCalendarService:
             return None
 
         try:
-            start_datetime = datetime.datetime.combine(
-                appointment.appointment_date,
-                appointment.appointment_time
-            )
-
-            # Assume 30 minutes duration if service duration not available
-            duration = appointment.service.duration_minutes if appointment.service else 30
-            end_datetime = start_datetime + datetime.timedelta(minutes=duration)
-
-            event = {
-                'summary': f'Прийом у {appointment.doctor.full_name}',
-                'location': appointment.doctor.clinic.address,
-                'description': f'Послуга: {appointment.service.name if appointment.service else "Консультація"}\n'
-                               f'Лікар: {appointment.doctor.full_name}\n'
-                               f'Клініка: {appointment.doctor.clinic.name}\n'
-                               f'Примітки: {appointment.notes}',
-                'start': {
-                    'dateTime': start_datetime.isoformat(),
-                    'timeZone': 'Europe/Kiev',
-                },
-                'end': {
-                    'dateTime': end_datetime.isoformat(),
-                    'timeZone': 'Europe/Kiev',
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                        {'method': 'popup', 'minutes': 60},  # 1 hour before
-                    ],
-                },
-            }
-
             created_event = self.service.events().insert(
                 calendarId='primary',
-                body=event
+                body=_event_body(appointment)
             ).execute()
 
             return created_event.get('id')
@@ -98,38 +188,12 @@ class GoogleCalendarService:
             return False
 
         try:
-            start_datetime = datetime.datetime.combine(
-                appointment.appointment_date,
-                appointment.appointment_time
-            )
-
-            duration = appointment.service.duration_minutes if appointment.service else 30
-            end_datetime = start_datetime + datetime.timedelta(minutes=duration)
-
-            event = self.service.events().get(
-                calendarId='primary',
-                eventId=event_id
-            ).execute()
-
-            event['start'] = {
-                'dateTime': start_datetime.isoformat(),
-                'timeZone': 'Europe/Kiev',
-            }
-            event['end'] = {
-                'dateTime': end_datetime.isoformat(),
-                'timeZone': 'Europe/Kiev',
-            }
-            event['description'] = f'Послуга: {appointment.service.name if appointment.service else "Консультація"}\n' \
-                                   f'Лікар: {appointment.doctor.full_name}\n' \
-                                   f'Клініка: {appointment.doctor.clinic.name}\n' \
-                                   f'Примітки: {appointment.notes}'
-
-            updated_event = self.service.events().update(
+            # patch only sends the changed fields, so no GET is needed first
+            self.service.events().patch(
                 calendarId='primary',
                 eventId=event_id,
-                body=event
+                body=_event_patch(appointment)
             ).execute()
-
             return True
 
         except HttpError as error:
@@ -150,4 +214,88 @@ class GoogleCalendarService:
 
         except HttpError as error:
             print(f'An error occurred: {error}')
-            return False
\ No newline at end of file
+            return False
+
+    def list_changes(self, sync_token=None):
+        """Events changed since sync_token (all events without one) and the next sync token"""
+        if not self.service:
+            return [], sync_token
+
+        changes = []
+        params = {'calendarId': 'primary', 'singleEvents': True, 'maxResults': LIST_PAGE_SIZE}
+        if sync_token:
+            params['syncToken'] = sync_token
+
+        while True:
+            try:
+                response = self.service.events().list(**params).execute()
+            except HttpError as error:
+                if error.resp.status == 410:
+                    raise SyncTokenExpired(sync_token) from error
+                raise
+
+            changes.extend(_event_change(event) for event in response.get('items', []))
+            if 'nextPageToken' not in response:
+                return changes, response.get('nextSyncToken')
+            params['pageToken'] = response['nextPageToken']
+
+    def batch(self):
+        """Collect event operations and send them as HTTP batch requests"""
+        if not self.service:
+            return SequentialBatch(self)
+        return GoogleCalendarBatch(self.service)
+
+
+class GoogleCalendarBatch:
+    """Queues insert/patch/delete calls and sends them in batches of BATCH_LIMIT
+
+    Each queue method returns an index into the list returned by execute();
+    an item is the call result (event id or True) or the exception it raised.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._requests = []
+
+    def create_appointment_event(self, appointment):
+        return self._add(
+            self.service.events().insert(calendarId='primary', body=_event_body(appointment)),
+            lambda response: response.get('id')
+        )
+
+    def update_appointment_event(self, event_id, appointment):
+        return self._add(
+            self.service.events().patch(calendarId='primary', eventId=event_id, body=_event_patch(appointment)),
+            lambda response: True
+        )
+
+    def delete_appointment_event(self, event_id):
+        return self._add(
+            self.service.events().delete(calendarId='primary', eventId=event_id),
+            lambda response: True
+        )
+
+    def _add(self, request, parse):
+        self._requests.append((request, parse))
+        return len(self._requests) - 1
+
+    def execute(self):
+        results = [None] * len(self._requests)
+
+        for offset in range(0, len(self._requests), BATCH_LIMIT):
+            chunk = self._requests[offset:offset + BATCH_LIMIT]
+
+            def callback(request_id, response, exception, offset=offset):
+                index = offset + int(request_id)
+                if exception is not None:
+                    results[index] = exception
+                else:
+                    results[index] = self._requests[index][1](response)
+
+            http_batch = self.service.new_batch_http_request(callback=callback)
+            for position, (request, _) in enumerate(chunk):
+                http_batch.add(request, request_id=str(position))
+            http_batch.execute()
+
+        self._requests = []
+        return results
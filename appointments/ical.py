@@ -0,0 +1,112 @@
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.db.models import Count, Max, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Appointment, DEFAULT_DURATION_MINUTES
+
+FEED_SALT = 'appointments.calendar-feed'
+FEED_KINDS = ('user', 'doctor')
+ICS_STATUSES = {
+    'pending': 'TENTATIVE',
+    'confirmed': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+}
+
+_signer = signing.Signer(salt=FEED_SALT, sep='.')
+
+
+def feed_token(kind, pk):
+    """Signed, non-expiring token naming the owner of a feed, e.g. 'doctor-3.<signature>'"""
+    return _signer.sign(f'{kind}-{pk}')
+
+
+def feed_owner(token):
+    """(kind, pk) for a valid token, otherwise None"""
+    try:
+        kind, pk = _signer.unsign(token).split('-')
+    except (signing.BadSignature, ValueError):
+        return None
+    if kind not in FEED_KINDS or not pk.isdigit():
+        return None
+    return kind, int(pk)
+
+
+def feed_queryset(kind, pk):
+    if kind == 'doctor':
+        return Appointment.objects.filter(doctor_id=pk)
+    return Appointment.objects.filter(user_id=pk)
+
+
+def feed_etag(queryset):
+    """ETag from the newest updated_at and the row count; one aggregate query"""
+    state = queryset.aggregate(latest=Max('updated_at'), count=Count('id'))
+    digest = hashlib.md5(f"{state['latest']}|{state['count']}".encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def _escape(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Split a content line into 75-octet chunks as RFC 5545 requires"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        # Do not cut a multi-byte character in half
+        while limit < len(encoded) and (encoded[limit] & 0xC0) == 0x80:
+            limit -= 1
+        parts.append(encoded[:limit].decode())
+        encoded = encoded[limit:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def iter_calendar(queryset, name):
+    """Yield a VCALENDAR one VEVENT at a time from a server-side cursor"""
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//FindVet//Appointments//UK\r\n'
+    yield 'CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n'
+    yield _fold(f'X-WR-CALNAME:{_escape(name)}')
+
+    rows = (
+        queryset
+        .order_by('appointment_date', 'appointment_time')
+        .values('id', 'appointment_date', 'appointment_time', 'status', 'notes', 'updated_at',
+                'doctor__first_name', 'doctor__last_name', 'doctor__clinic__name', 'doctor__clinic__address',
+                'service__name')
+        .annotate(duration=Coalesce('service__duration_minutes', Value(DEFAULT_DURATION_MINUTES)))
+    )
+    for row in rows.iterator(chunk_size=500):
+        start = timezone.make_aware(datetime.combine(row['appointment_date'], row['appointment_time']))
+        doctor = f"{row['doctor__first_name']} {row['doctor__last_name']}"
+        service = row['service__name'] or 'Консультація'
+        description = f"Послуга: {service}\nЛікар: {doctor}\nКлініка: {row['doctor__clinic__name']}"
+        if row['notes']:
+            description += f"\nПримітки: {row['notes']}"
+
+        yield ''.join([
+            'BEGIN:VEVENT\r\n',
+            f"UID:appointment-{row['id']}@findvet\r\n",
+            f"DTSTAMP:{_utc(row['updated_at'])}\r\n",
+            f'DTSTART:{_utc(start)}\r\n',
+            f"DTEND:{_utc(start + timedelta(minutes=row['duration']))}\r\n",
+            _fold(f'SUMMARY:{_escape(f"Прийом у {doctor}")}'),
+            _fold(f"LOCATION:{_escape(row['doctor__clinic__address'])}"),
+            _fold(f'DESCRIPTION:{_escape(description)}'),
+            f"STATUS:{ICS_STATUSES[row['status']]}\r\n",
+            'END:VEVENT\r\n',
+        ])
+
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,30 @@
+import time
+
+from django.utils import timezone
+
+from .models import Appointment, ended_q
+
+
+def complete_past_appointments(batch_size=500, moment=None):
+    """Mark pending/confirmed visits that ended before moment as completed
+
+    Each batch is a single UPDATE ... WHERE id IN (SELECT ... LIMIT batch_size),
+    so no rows are loaded into Python and locks are held only briefly.
+    Returns a dict with the number of completed rows, batches and elapsed seconds.
+    """
+    moment = moment or timezone.now()
+    stale = Appointment.objects.active().filter(ended_q(moment)).order_by('pk')
+    stats = {'completed': 0, 'batches': 0, 'seconds': 0.0}
+    started = time.monotonic()
+
+    while True:
+        updated = Appointment.objects.filter(
+            pk__in=stale.values('pk')[:batch_size]
+        ).update(status='completed', updated_at=timezone.now())
+        if not updated:
+            break
+        stats['completed'] += updated
+        stats['batches'] += 1
+
+    stats['seconds'] = time.monotonic() - started
+    return stats
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from appointments.archive import archive_appointments
+
+
+class Command(BaseCommand):
+    help = 'Move completed and cancelled appointments older than the given age to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.APPOINTMENT_ARCHIVE_AFTER_DAYS,
+                            help='Archive appointments dated more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        moved = archive_appointments(options['days'], batch_size=options['batch_size'])
+        self.stdout.write(f'archived: {moved}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from appointments.lifecycle import complete_past_appointments
+
+
+class Command(BaseCommand):
+    help = 'Mark pending and confirmed appointments whose time has passed as completed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        stats = complete_past_appointments(batch_size=options['batch_size'])
+        self.stdout.write(
+            f"completed: {stats['completed']}, batches: {stats['batches']}, "
+            f"time: {stats['seconds']:.3f}s"
+        )
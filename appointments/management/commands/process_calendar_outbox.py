@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from appointments.outbox import process_calendar_outbox
+
+
+class Command(BaseCommand):
+    help = 'Push queued appointment changes to the calendar backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = process_calendar_outbox(batch_size=options['batch_size'])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"done: {stats['done']}, retried: {stats['retried']}, failed: {stats['failed']}"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
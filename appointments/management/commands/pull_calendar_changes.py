@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from appointments.calendar_pull import pull_calendar_changes
+
+
+class Command(BaseCommand):
+    help = 'Apply event moves and deletions made in the calendar to appointments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling the calendar')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = pull_calendar_changes()
+            if any(stats.values()):
+                self.stdout.write(
+                    f"received: {stats['received']}, moved: {stats['moved']}, "
+                    f"cancelled: {stats['cancelled']}, conflicts: {stats['conflicts']}"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
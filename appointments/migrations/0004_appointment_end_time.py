@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:23
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+
+
+def fill_end_time(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+
+    appointments = list(Appointment.objects.select_related('service'))
+    for appointment in appointments:
+        duration = appointment.service.duration_minutes if appointment.service else 30
+        start = datetime.combine(datetime.min.date(), appointment.appointment_time)
+        end = start + timedelta(minutes=duration)
+        appointment.end_time = end.time() if end.date() == start.date() else time.max
+
+    Appointment.objects.bulk_update(appointments, ['end_time'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='end_time',
+            field=models.TimeField(blank=True, editable=False, null=True, verbose_name='Час завершення'),
+        ),
+        migrations.RunPython(fill_end_time, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointment_end_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSyncTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('create', 'Створення'), ('update', 'Оновлення'), ('delete', 'Видалення')], max_length=10, verbose_name='Дія')),
+                ('event_id', models.CharField(blank=True, max_length=255, null=True, verbose_name='ID події')),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('done', 'Виконано'), ('failed', 'Помилка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Спроби')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Наступна спроба')),
+                ('last_error', models.TextField(blank=True, verbose_name='Остання помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('appointment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='calendar_sync_tasks', to='appointments.appointment', verbose_name='Запис')),
+            ],
+            options={
+                'verbose_name': 'Синхронізація календаря',
+                'verbose_name_plural': 'Черга синхронізації календаря',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='appointment_status_7f7886_idx')],
+            },
+        ),
+    ]
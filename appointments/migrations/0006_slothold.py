@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('appointments', '0005_calendarsynctask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appointment_date', models.DateField(verbose_name='Дата прийому')),
+                ('appointment_time', models.TimeField(verbose_name='Час прийому')),
+                ('end_time', models.TimeField(verbose_name='Час завершення')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Діє до')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to='doctors.doctor', verbose_name='Лікар')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Бронювання слоту',
+                'verbose_name_plural': 'Бронювання слотів',
+                'ordering': ['appointment_date', 'appointment_time'],
+                'unique_together': {('doctor', 'appointment_date', 'appointment_time')},
+            },
+        ),
+    ]
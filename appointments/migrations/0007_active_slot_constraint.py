@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_slothold'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'appointment_date'], name='appointment_doctor_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=('doctor', 'appointment_date', 'appointment_time'), name='unique_active_appointment_slot'),
+        ),
+    ]
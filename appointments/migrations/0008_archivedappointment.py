@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+        ('doctors', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('appointments', '0007_active_slot_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('appointment_date', models.DateField(verbose_name='Дата прийому')),
+                ('appointment_time', models.TimeField(verbose_name='Час прийому')),
+                ('end_time', models.TimeField(blank=True, null=True, verbose_name='Час завершення')),
+                ('status', models.CharField(choices=[('pending', 'Очікується'), ('confirmed', 'Підтверджено'), ('completed', 'Завершено'), ('cancelled', 'Скасовано')], max_length=20, verbose_name='Статус')),
+                ('notes', models.TextField(blank=True, verbose_name='Примітки')),
+                ('google_calendar_event_id', models.CharField(blank=True, max_length=255, null=True, verbose_name='ID події в Google Calendar')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='doctors.doctor', verbose_name='Лікар')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_appointments', to='services.service', verbose_name='Послуга')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Архівний запис',
+                'verbose_name_plural': 'Архів записів',
+                'ordering': ['-appointment_date', '-appointment_time'],
+                'indexes': [models.Index(fields=['user', 'appointment_date'], name='archived_user_date_idx'), models.Index(fields=['doctor', 'appointment_date'], name='archived_doctor_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_archivedappointment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'appointment_date', 'end_time'], name='appointment_status_date_idx'),
+        ),
+    ]
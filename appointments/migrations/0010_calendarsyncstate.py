@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0009_appointment_status_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calendar_id', models.CharField(max_length=255, unique=True, verbose_name='ID календаря')),
+                ('sync_token', models.TextField(blank=True, verbose_name='Токен синхронізації')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Остання синхронізація')),
+            ],
+            options={
+                'verbose_name': 'Стан синхронізації календаря',
+                'verbose_name_plural': 'Стани синхронізації календарів',
+            },
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='google_calendar_event_id',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='ID події в Google Calendar'),
+        ),
+    ]
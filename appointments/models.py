@@ -1,10 +1,58 @@
 from django.db import models
 from django.utils import timezone
-from datetime import datetime, time as dt_time
+from django.utils.dateparse import parse_time
+from datetime import datetime, timedelta, time as dt_time
 from users.models import User
 from doctors.models import Doctor
 from services.models import Service
 
+DEFAULT_DURATION_MINUTES = 30
+
+
+def compute_end_time(start_time, duration_minutes):
+    """End of a visit on the same day; visits running past midnight end at 23:59:59"""
+    if isinstance(start_time, str):
+        start_time = parse_time(start_time)
+    start = datetime.combine(datetime.min.date(), start_time)
+    end = start + timedelta(minutes=duration_minutes)
+    if end.date() != start.date():
+        return dt_time.max
+    return end.time()
+
+
+def upcoming_q(moment=None):
+    """Visits starting at or after moment (default: now, in local time)"""
+    moment = timezone.localtime(moment)
+    return (models.Q(appointment_date__gt=moment.date())
+            | models.Q(appointment_date=moment.date(), appointment_time__gte=moment.time()))
+
+
+def ended_q(moment=None):
+    """Visits whose end_time is at or before moment (default: now, in local time)"""
+    moment = timezone.localtime(moment)
+    return (models.Q(appointment_date__lt=moment.date())
+            | models.Q(appointment_date=moment.date(), end_time__lte=moment.time()))
+
+
+class AppointmentQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(status__in=Appointment.ACTIVE_STATUSES)
+
+    def upcoming(self, moment=None):
+        return self.filter(upcoming_q(moment))
+
+    def past(self, moment=None):
+        return self.exclude(upcoming_q(moment))
+
+    def overlapping(self, doctor, appointment_date, start_time, end_time):
+        """Active appointments of the doctor whose [start, end) intersects the given interval"""
+        return self.active().filter(
+            doctor=doctor,
+            appointment_date=appointment_date,
+            appointment_time__lt=end_time,
+            end_time__gt=start_time
+        )
+
 
 class Appointment(models.Model):
     STATUS_CHOICES = (
@@ -13,6 +61,7 @@ class Appointment(models.Model):
         ('completed', 'Завершено'),
         ('cancelled', 'Скасовано'),
     )
+    ACTIVE_STATUSES = ('pending', 'confirmed')
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='appointments', verbose_name='Користувач')
     doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='appointments', verbose_name='Лікар')
@@ -21,16 +70,19 @@ class Appointment(models.Model):
 
     appointment_date = models.DateField(verbose_name='Дата прийому')
     appointment_time = models.TimeField(verbose_name='Час прийому')
+    end_time = models.TimeField(null=True, blank=True, editable=False, verbose_name='Час завершення')
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='Статус')
     notes = models.TextField(blank=True, verbose_name='Примітки')
 
-    google_calendar_event_id = models.CharField(max_length=255, blank=True, null=True,
+    google_calendar_event_id = models.CharField(max_length=255, blank=True, null=True, db_index=True,
                                                 verbose_name='ID події в Google Calendar')
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AppointmentQuerySet.as_manager()
+
     def __str__(self):
 
         if isinstance(self.appointment_time, dt_time):
@@ -39,6 +91,14 @@ class Appointment(models.Model):
             time_str = str(self.appointment_time)
         return f"{self.user.username} -> {self.doctor.full_name} ({self.appointment_date} {time_str})"
 
+    @property
+    def duration_minutes(self):
+        return self.service.duration_minutes if self.service_id else DEFAULT_DURATION_MINUTES
+
+    def save(self, *args, **kwargs):
+        self.end_time = compute_end_time(self.appointment_time, self.duration_minutes)
+        super().save(*args, **kwargs)
+
     @property
     def is_past(self):
 
@@ -64,4 +124,143 @@ class Appointment(models.Model):
         ordering = ['-appointment_date', '-appointment_time']
         verbose_name = 'Запис'
         verbose_name_plural = 'Записи'
+        constraints = [
+            # Only live bookings occupy a slot, so a cancelled slot can be booked again
+            models.UniqueConstraint(
+                fields=['doctor', 'appointment_date', 'appointment_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='unique_active_appointment_slot'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['doctor', 'appointment_date'], name='appointment_doctor_date_idx'),
+            models.Index(fields=['status', 'appointment_date', 'end_time'], name='appointment_status_date_idx'),
+        ]
+
+
+class ArchivedAppointment(models.Model):
+    """Completed or cancelled appointment moved out of the hot table; id is the original Appointment id"""
+    id = models.IntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_appointments',
+                             verbose_name='Користувач')
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='archived_appointments',
+                               verbose_name='Лікар')
+    service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True, related_name='archived_appointments',
+                                verbose_name='Послуга')
+
+    appointment_date = models.DateField(verbose_name='Дата прийому')
+    appointment_time = models.TimeField(verbose_name='Час прийому')
+    end_time = models.TimeField(null=True, blank=True, verbose_name='Час завершення')
+
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES, verbose_name='Статус')
+    notes = models.TextField(blank=True, verbose_name='Примітки')
+
+    google_calendar_event_id = models.CharField(max_length=255, blank=True, null=True,
+                                                verbose_name='ID події в Google Calendar')
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Fields copied one-to-one from Appointment when a row is archived
+    COPIED_FIELDS = ('id', 'user_id', 'doctor_id', 'service_id', 'appointment_date', 'appointment_time',
+                     'end_time', 'status', 'notes', 'google_calendar_event_id', 'created_at', 'updated_at')
+
+    def __str__(self):
+        return f"{self.user.username} -> {self.doctor.full_name} ({self.appointment_date} {self.appointment_time})"
+
+    class Meta:
+        ordering = ['-appointment_date', '-appointment_time']
+        verbose_name = 'Архівний запис'
+        verbose_name_plural = 'Архів записів'
+        indexes = [
+            models.Index(fields=['user', 'appointment_date'], name='archived_user_date_idx'),
+            models.Index(fields=['doctor', 'appointment_date'], name='archived_doctor_date_idx'),
+        ]
+
+
+class SlotHoldQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+    def overlapping(self, doctor, appointment_date, start_time, end_time):
+        """Live holds of the doctor whose [start, end) intersects the given interval"""
+        return self.live().filter(
+            doctor=doctor,
+            appointment_date=appointment_date,
+            appointment_time__lt=end_time,
+            end_time__gt=start_time
+        )
+
+
+class SlotHold(models.Model):
+    """Short reservation of a slot while a patient fills in the booking form"""
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='slot_holds', verbose_name='Лікар')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='slot_holds', verbose_name='Користувач')
+    appointment_date = models.DateField(verbose_name='Дата прийому')
+    appointment_time = models.TimeField(verbose_name='Час прийому')
+    end_time = models.TimeField(verbose_name='Час завершення')
+    expires_at = models.DateTimeField(db_index=True, verbose_name='Діє до')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SlotHoldQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user.username} -> {self.doctor.full_name} ({self.appointment_date} {self.appointment_time})"
+
+    class Meta:
         unique_together = ['doctor', 'appointment_date', 'appointment_time']
+        ordering = ['appointment_date', 'appointment_time']
+        verbose_name = 'Бронювання слоту'
+        verbose_name_plural = 'Бронювання слотів'
+
+
+class CalendarSyncTask(models.Model):
+    ACTION_CHOICES = (
+        ('create', 'Створення'),
+        ('update', 'Оновлення'),
+        ('delete', 'Видалення'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Очікує'),
+        ('done', 'Виконано'),
+        ('failed', 'Помилка'),
+    )
+
+    appointment = models.ForeignKey(Appointment, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='calendar_sync_tasks', verbose_name='Запис')
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name='Дія')
+    event_id = models.CharField(max_length=255, blank=True, null=True, verbose_name='ID події')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='Статус')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Спроби')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Наступна спроба')
+    last_error = models.TextField(blank=True, verbose_name='Остання помилка')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_action_display()} #{self.appointment_id} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+        verbose_name = 'Синхронізація календаря'
+        verbose_name_plural = 'Черга синхронізації календаря'
+
+
+class CalendarSyncState(models.Model):
+    """Sync token of the last incremental pull from an external calendar"""
+    calendar_id = models.CharField(max_length=255, unique=True, verbose_name='ID календаря')
+    sync_token = models.TextField(blank=True, verbose_name='Токен синхронізації')
+    last_synced_at = models.DateTimeField(null=True, blank=True, verbose_name='Остання синхронізація')
+
+    def __str__(self):
+        return self.calendar_id
+
+    class Meta:
+        verbose_name = 'Стан синхронізації календаря'
+        verbose_name_plural = 'Стани синхронізації календарів'
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .calendar_backends import get_calendar_backend, open_batch
+from .models import Appointment, CalendarSyncTask
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+
+def enqueue_calendar_sync(appointment, action):
+    """Record a calendar change; call inside the transaction that changes the appointment"""
+    return CalendarSyncTask.objects.create(
+        appointment=appointment,
+        action=action,
+        event_id=appointment.google_calendar_event_id
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def _plan(task):
+    """Backend call for a task as (method, args, dedupe key); method is None when nothing is to be done"""
+    appointment = task.appointment
+
+    if task.action == 'delete':
+        event_id = task.event_id or (appointment and appointment.google_calendar_event_id)
+        if not event_id:
+            return None, (), None
+        return 'delete_appointment_event', (event_id,), ('delete', event_id)
+
+    if appointment is None or appointment.status == 'cancelled':
+        return None, (), None
+
+    # An event that already exists is updated instead of created again,
+    # so a retried or duplicated task never produces a second event.
+    if appointment.google_calendar_event_id:
+        if task.action == 'create':
+            return None, (), None
+        return ('update_appointment_event', (appointment.google_calendar_event_id, appointment),
+                ('upsert', appointment.pk))
+
+    return 'create_appointment_event', (appointment,), ('upsert', appointment.pk)
+
+
+def process_calendar_outbox(backend=None, batch_size=50):
+    """Drain due tasks in one backend batch; returns a dict with done/retried/failed counts"""
+    now = timezone.now()
+    max_attempts = settings.CALENDAR_SYNC_MAX_ATTEMPTS
+    stats = {'done': 0, 'retried': 0, 'failed': 0}
+
+    tasks = list(
+        CalendarSyncTask.objects
+        .filter(status='pending', next_attempt_at__lte=now)
+        .select_related('appointment__doctor__clinic', 'appointment__service')
+        .order_by('id')[:batch_size]
+    )
+    if not tasks:
+        return stats
+
+    if backend is None:
+        backend = get_calendar_backend()
+    batch = open_batch(backend)
+
+    # Tasks touching the same event share one call
+    calls = {}
+    planned = []
+    for task in tasks:
+        # Claim the task so a second worker skips it
+        claimed = CalendarSyncTask.objects.filter(
+            pk=task.pk, status='pending', attempts=task.attempts
+        ).update(attempts=F('attempts') + 1)
+        if not claimed:
+            continue
+        task.attempts += 1
+
+        method, args, key = _plan(task)
+        if method is None:
+            planned.append((task, None, method))
+            continue
+        if key not in calls:
+            calls[key] = getattr(batch, method)(*args)
+        planned.append((task, calls[key], method))
+
+    results = batch.execute() if calls else []
+
+    for task, index, method in planned:
+        result = True if index is None else results[index]
+
+        if isinstance(result, Exception):
+            succeeded, error = False, str(result)
+        elif not result:
+            succeeded, error = False, 'Calendar backend returned no result'
+        else:
+            succeeded, error = True, ''
+            if method == 'create_appointment_event':
+                Appointment.objects.filter(pk=task.appointment_id).update(google_calendar_event_id=result)
+
+        if succeeded:
+            task.status = 'done'
+            task.last_error = ''
+            stats['done'] += 1
+        elif task.attempts >= max_attempts:
+            task.status = 'failed'
+            task.last_error = error
+            stats['failed'] += 1
+        else:
+            task.next_attempt_at = now + retry_delay(task.attempts)
+            task.last_error = error
+            stats['retried'] += 1
+
+        task.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'updated_at'])
+
+    return stats
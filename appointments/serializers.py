@@ -1,8 +1,15 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from appointments.models import Appointment
+from appointments.models import Appointment, ArchivedAppointment, SlotHold, DEFAULT_DURATION_MINUTES, compute_end_time
+from doctors.models import Doctor
 from doctors.serializers import DoctorListSerializer
+from services.models import Service
 from services.serializers import ServiceSerializer
 
+MAX_SERIES_SLOTS = 52
+
 
 class AppointmentListSerializer(serializers.ModelSerializer):
     doctor = DoctorListSerializer(read_only=True)
@@ -15,6 +22,13 @@ class AppointmentListSerializer(serializers.ModelSerializer):
                   'status', 'status_display', 'notes', 'created_at']
 
 
+class ArchivedAppointmentListSerializer(AppointmentListSerializer):
+
+    class Meta:
+        model = ArchivedAppointment
+        fields = AppointmentListSerializer.Meta.fields + ['archived_at']
+
+
 class AppointmentDetailSerializer(serializers.ModelSerializer):
     doctor = DoctorListSerializer(read_only=True)
     service = ServiceSerializer(read_only=True)
@@ -41,22 +55,6 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
 
         validators = []
 
-    def validate(self, data):
-
-        existing = Appointment.objects.filter(
-            doctor=data['doctor'],
-            appointment_date=data['appointment_date'],
-            appointment_time=data['appointment_time'],
-            status__in=['pending', 'confirmed']
-        ).exists()
-
-        if existing:
-            raise serializers.ValidationError(
-                "Цей час вже зайнятий."
-            )
-
-        return data
-
     def to_representation(self, instance):
 
         representation = super().to_representation(instance)
@@ -74,23 +72,117 @@ class AppointmentUpdateSerializer(serializers.ModelSerializer):
         model = Appointment
         fields = ['appointment_date', 'appointment_time', 'status', 'notes']
 
+
+class SlotHoldSerializer(serializers.ModelSerializer):
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all(), required=False,
+                                                 allow_null=True, write_only=True)
+
+    class Meta:
+        model = SlotHold
+        fields = ['id', 'doctor', 'service', 'appointment_date', 'appointment_time',
+                  'end_time', 'expires_at', 'created_at']
+        read_only_fields = ['id', 'end_time', 'expires_at', 'created_at']
+        # Expired holds may still occupy the unique slot until evicted, so
+        # uniqueness is left to the database after eviction.
+        validators = []
+
     def validate(self, data):
 
-        doctor = self.instance.doctor
-        appointment_date = data.get('appointment_date', self.instance.appointment_date)
-        appointment_time = data.get('appointment_time', self.instance.appointment_time)
+        if not data['doctor'].is_available:
+            raise serializers.ValidationError(
+                "Лікар зараз не приймає записів."
+            )
 
+        now = timezone.localtime()
+        if (data['appointment_date'], data['appointment_time']) <= (now.date(), now.time()):
+            raise serializers.ValidationError(
+                "Неможливо забронювати час, який уже минув."
+            )
 
-        conflicting = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=appointment_date,
-            appointment_time=appointment_time,
-            status__in=['pending', 'confirmed']
-        ).exclude(pk=self.instance.pk)
+        service = data.pop('service', None)
+        duration = service.duration_minutes if service else DEFAULT_DURATION_MINUTES
+        end_time = compute_end_time(data['appointment_time'], duration)
 
-        if conflicting.exists():
+        booked = Appointment.objects.overlapping(
+            data['doctor'],
+            data['appointment_date'],
+            data['appointment_time'],
+            end_time
+        ).exists()
+
+        if booked:
             raise serializers.ValidationError(
                 "Цей час вже зайнятий."
             )
 
-        return data
\ No newline at end of file
+        held = SlotHold.objects.overlapping(
+            data['doctor'],
+            data['appointment_date'],
+            data['appointment_time'],
+            end_time
+        ).exclude(user=self.context['request'].user).exists()
+
+        if held:
+            raise serializers.ValidationError(
+                "Цей час тимчасово заброньовано іншим користувачем."
+            )
+
+        data['end_time'] = end_time
+        return data
+
+
+class AppointmentSlotSerializer(serializers.Serializer):
+    appointment_date = serializers.DateField()
+    appointment_time = serializers.TimeField()
+
+
+class AppointmentRecurrenceSerializer(serializers.Serializer):
+    UNIT_CHOICES = (
+        ('days', 'Дні'),
+        ('weeks', 'Тижні'),
+    )
+
+    start_date = serializers.DateField()
+    appointment_time = serializers.TimeField()
+    every = serializers.IntegerField(min_value=1, max_value=MAX_SERIES_SLOTS, default=1)
+    unit = serializers.ChoiceField(choices=UNIT_CHOICES, default='weeks')
+    count = serializers.IntegerField(min_value=1, max_value=MAX_SERIES_SLOTS)
+
+    def to_slots(self, data):
+        step = timedelta(**{data['unit']: data['every']})
+        return [
+            (data['start_date'] + step * index, data['appointment_time'])
+            for index in range(data['count'])
+        ]
+
+
+class AppointmentBulkCreateSerializer(serializers.Serializer):
+    MAX_SLOTS = MAX_SERIES_SLOTS
+
+    doctor = serializers.PrimaryKeyRelatedField(queryset=Doctor.objects.all())
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all(), required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    slots = AppointmentSlotSerializer(many=True, required=False)
+    recurrence = AppointmentRecurrenceSerializer(required=False)
+    all_or_nothing = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+
+        if ('slots' in data) == ('recurrence' in data):
+            raise serializers.ValidationError("Вкажіть або список слотів, або правило повторення.")
+
+        if 'recurrence' in data:
+            try:
+                slots = AppointmentRecurrenceSerializer().to_slots(data.pop('recurrence'))
+            except OverflowError:
+                raise serializers.ValidationError("Серія записів виходить за межі календаря.")
+        else:
+            slots = [(slot['appointment_date'], slot['appointment_time']) for slot in data['slots']]
+
+        if not slots or len(slots) > self.MAX_SLOTS:
+            raise serializers.ValidationError(
+                f"Кількість слотів має бути від 1 до {self.MAX_SLOTS}."
+            )
+
+        data['slots'] = slots
+        return data
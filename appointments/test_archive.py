@@ -0,0 +1,104 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import timedelta
+from appointments.models import Appointment, ArchivedAppointment, CalendarSyncTask
+
+User = get_user_model()
+
+
+@pytest.fixture
+def doctor(make_clinic, make_doctor):
+
+    return make_doctor(make_clinic('Clinic'), 'doctor')
+
+
+@pytest.fixture
+def patient(db):
+
+    return User.objects.create_user(username='patient', password='pass')
+
+
+@pytest.fixture
+def patient_client(patient):
+
+    client = APIClient()
+    client.force_authenticate(user=patient)
+    return client
+
+
+def book(patient, doctor, days_ago, status='completed', time='10:00'):
+
+    return Appointment.objects.create(
+        user=patient,
+        doctor=doctor,
+        appointment_date=timezone.localdate() - timedelta(days=days_ago),
+        appointment_time=time,
+        status=status
+    )
+
+
+@pytest.mark.django_db
+class TestArchiveAppointments:
+
+
+    def test_command_moves_old_finished_appointments(self, patient, doctor):
+
+        old_completed = book(patient, doctor, 400)
+        old_cancelled = book(patient, doctor, 500, status='cancelled')
+        old_pending = book(patient, doctor, 400, status='pending', time='11:00')
+        recent = book(patient, doctor, 10)
+        CalendarSyncTask.objects.create(appointment=old_completed, action='create', status='done')
+
+        call_command('archive_appointments', days=365, batch_size=1)
+
+        assert set(Appointment.objects.values_list('id', flat=True)) == {old_pending.id, recent.id}
+        archived = ArchivedAppointment.objects.get(pk=old_completed.id)
+        assert archived.doctor == doctor
+        assert archived.end_time == old_completed.end_time
+        assert archived.created_at == old_completed.created_at
+        assert ArchivedAppointment.objects.filter(pk=old_cancelled.id, status='cancelled').exists()
+        assert CalendarSyncTask.objects.get().appointment is None
+
+    def test_list_reads_hot_table_by_default(self, patient_client, patient, doctor):
+
+        book(patient, doctor, 400)
+        recent = book(patient, doctor, 10)
+        call_command('archive_appointments', days=365)
+
+        response = patient_client.get('/api/appointments/')
+
+        assert [row['id'] for row in response.data['results']] == [recent.id]
+
+    def test_list_include_archived_merges_both_tables(self, patient_client, patient, doctor,
+                                                      django_assert_max_num_queries):
+
+        ids = [book(patient, doctor, days_ago).id for days_ago in range(400, 415)]
+        recent = book(patient, doctor, 10)
+        call_command('archive_appointments', days=365)
+
+        with django_assert_max_num_queries(4):
+            response = patient_client.get('/api/appointments/', {'include_archived': 'true'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 16
+        results = response.data['results']
+        assert [row['id'] for row in results] == [recent.id] + ids[:9]
+        assert 'archived_at' not in results[0]
+        assert results[1]['archived_at'] is not None
+        assert results[1]['doctor']['id'] == doctor.id
+
+    def test_include_archived_applies_filters_and_visibility(self, patient_client, patient, doctor):
+
+        book(patient, doctor, 400, status='cancelled')
+        completed = book(patient, doctor, 401)
+        stranger = User.objects.create_user(username='stranger', password='pass')
+        book(stranger, doctor, 402)
+        call_command('archive_appointments', days=365)
+
+        response = patient_client.get('/api/appointments/', {'include_archived': 'true', 'status': 'completed'})
+
+        assert [row['id'] for row in response.data['results']] == [completed.id]
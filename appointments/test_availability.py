@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import timedelta
+from doctors.models import DoctorSchedule
+from services.models import Service
+from appointments.models import Appointment
+from appointments.availability import earliest_slots
+
+User = get_user_model()
+
+
+@pytest.fixture
+def make_doctor(make_doctor):
+    """The shared factory, with the doctor on duty every day from `start` to `end`"""
+
+    def make(clinic, username, start='09:00', end='12:00', **fields):
+        doctor = make_doctor(clinic, username, **fields)
+        for weekday in range(7):
+            DoctorSchedule.objects.create(doctor=doctor, weekday=weekday, start_time=start, end_time=end)
+        return doctor
+
+    return make
+
+
+@pytest.fixture
+def api_client():
+
+    return APIClient()
+
+
+@pytest.fixture
+def tomorrow():
+
+    return timezone.localdate() + timedelta(days=1)
+
+
+@pytest.mark.django_db
+class TestEarliestAvailability:
+
+
+    def test_earliest_slots_are_merged_across_doctors(self, make_clinic, make_doctor, tomorrow):
+
+        clinic = make_clinic('Clinic', 'Kyiv')
+        early = make_doctor(clinic, 'early', start='08:00')
+        late = make_doctor(clinic, 'late', start='10:00')
+
+        slots = earliest_slots([early.id, late.id], tomorrow, limit=3)
+
+        assert [(slot.strftime('%H:%M'), doctor_id) for _, slot, doctor_id in slots] == [
+            ('08:00', early.id), ('08:15', early.id), ('08:30', early.id)
+        ]
+
+    def test_earliest_filters_by_specialization_and_city(self, make_clinic, make_doctor, api_client, tomorrow):
+
+        kyiv = make_clinic('Kyiv Clinic', 'Kyiv')
+        lviv = make_clinic('Lviv Clinic', 'Lviv')
+        dermatologist = make_doctor(kyiv, 'derm', specialization='dermatologist', start='11:00')
+        make_doctor(kyiv, 'general', start='08:00')
+        make_doctor(lviv, 'derm_lviv', specialization='dermatologist', start='08:00')
+
+        response = api_client.get('/api/availability/earliest/', {
+            'specialization': 'dermatologist',
+            'city': 'Kyiv',
+            'from': str(tomorrow),
+            'limit': 2,
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['doctor']['id'] for item in response.data['results']] == [dermatologist.id] * 2
+        assert response.data['results'][0]['time'] == '11:00'
+
+    def test_earliest_skips_booked_slots_and_uses_service_duration(self, make_clinic, make_doctor, api_client,
+                                                                  tomorrow):
+
+        clinic = make_clinic('Clinic', 'Kyiv')
+        doctor = make_doctor(clinic, 'doc')
+        service = Service.objects.create(
+            clinic=clinic,
+            name='Surgery',
+            service_type='surgery',
+            description='Surgery',
+            price=3000,
+            duration_minutes=60
+        )
+        client_user = User.objects.create_user(username='client', password='pass')
+        Appointment.objects.create(
+            user=client_user,
+            doctor=doctor,
+            service=service,
+            appointment_date=tomorrow,
+            appointment_time='09:00'
+        )
+
+        response = api_client.get('/api/availability/earliest/', {
+            'service': service.id,
+            'from': str(tomorrow),
+            'limit': 1,
+        })
+
+        assert response.data['duration_minutes'] == 60
+        assert response.data['results'][0]['time'] == '10:00'
+
+    def test_earliest_query_count_does_not_grow_with_doctors(self, make_clinic, make_doctor, api_client, tomorrow,
+                                                             django_assert_max_num_queries):
+
+        clinic = make_clinic('Clinic', 'Kyiv')
+        for index in range(20):
+            make_doctor(clinic, f'doc{index}')
+
+        with django_assert_max_num_queries(4):
+            response = api_client.get('/api/availability/earliest/', {'from': str(tomorrow), 'limit': 20})
+
+        assert len(response.data['results']) == 20
+
+    @pytest.mark.parametrize('date_from', ['2026-02-30', 'tomorrow', '9999-12-20'])
+    def test_earliest_rejects_impossible_dates(self, api_client, date_from):
+
+        response = api_client.get('/api/availability/earliest/', {'from': date_from})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['detail'] == 'Невірний формат дати.'
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import timedelta
+from appointments.models import Appointment
+
+User = get_user_model()
+
+THREADS = 8
+
+
+@pytest.fixture
+def doctor(transactional_db, make_clinic, make_doctor):
+
+    return make_doctor(make_clinic('Clinic'), 'doctor')
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentBooking:
+
+
+    def test_many_threads_booking_same_slot_have_one_winner(self, doctor):
+
+        users = [User.objects.create_user(username=f'client{index}', password='pass') for index in range(THREADS)]
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        data = {'doctor': doctor.id, 'appointment_date': str(tomorrow), 'appointment_time': '10:00'}
+
+        barrier = threading.Barrier(THREADS)
+        outcomes = []
+        query_counts = []
+
+        def book(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.post('/api/appointments/', data, format='json')
+                outcomes.append(response.status_code)
+                query_counts.append(len(queries))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(outcomes) == [status.HTTP_201_CREATED] + [status.HTTP_400_BAD_REQUEST] * (THREADS - 1)
+        assert Appointment.objects.filter(doctor=doctor, appointment_date=tomorrow).count() == 1
+        # doctor lookup, savepoint, INSERT, overlap and hold checks, outbox INSERT, hold DELETE, release
+        assert max(query_counts) <= 10
+
+    def test_cancelled_slot_can_be_booked_again(self, doctor):
+
+        first, second = (User.objects.create_user(username=name, password='pass') for name in ('first', 'second'))
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        Appointment.objects.create(
+            user=first,
+            doctor=doctor,
+            appointment_date=tomorrow,
+            appointment_time='10:00',
+            status='cancelled'
+        )
+
+        client = APIClient()
+        client.force_authenticate(user=second)
+        response = client.post('/api/appointments/', {
+            'doctor': doctor.id,
+            'appointment_date': str(tomorrow),
+            'appointment_time': '10:00',
+        }, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
@@ -0,0 +1,169 @@
+import pytest
+from datetime import date, time
+from types import SimpleNamespace
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from appointments import google_calendar
+from appointments.calendar_backends import SyncTokenExpired
+from appointments.google_calendar import GoogleCalendarBatch, GoogleCalendarService
+
+
+class FakeEvents:
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def _request(self, method, **kwargs):
+        self.calls.append(method)
+        return SimpleNamespace(method=method, kwargs=kwargs, execute=lambda: {'id': 'single'})
+
+    def insert(self, **kwargs):
+        return self._request('insert', **kwargs)
+
+    def patch(self, **kwargs):
+        return self._request('patch', **kwargs)
+
+    def delete(self, **kwargs):
+        return self._request('delete', **kwargs)
+
+    def get(self, **kwargs):
+        return self._request('get', **kwargs)
+
+
+class FakeEventList:
+
+    def __init__(self, pages, calls):
+        self.pages = pages
+        self.calls = calls
+
+    def list(self, **kwargs):
+        self.calls.append(kwargs)
+        page = self.pages[kwargs.get('pageToken', 0)]
+        if isinstance(page, Exception):
+            raise page
+        return SimpleNamespace(execute=lambda: page)
+
+
+class FakeHttpBatch:
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.http_round_trips += 1
+        for request_id, request in self.requests:
+            self.callback(request_id, {'id': f"event-{request.kwargs['body']['summary']}"}
+                          if request.method == 'insert' else '', None)
+
+
+class FakeCalendarService:
+
+    def __init__(self):
+        self.calls = []
+        self.http_round_trips = 0
+
+    def events(self):
+        return FakeEvents(self.calls)
+
+    def new_batch_http_request(self, callback):
+        return FakeHttpBatch(self, callback)
+
+
+def fake_appointment(number):
+
+    clinic = SimpleNamespace(name='Clinic', address='Street 1')
+    doctor = SimpleNamespace(full_name=f'Doctor {number}', clinic=clinic)
+    return SimpleNamespace(
+        appointment_date=date(2030, 1, 7),
+        appointment_time=time(10, 0),
+        duration_minutes=30,
+        service=None,
+        doctor=doctor,
+        notes=''
+    )
+
+
+@pytest.fixture
+def shared_credentials(monkeypatch):
+
+    creds = Credentials(token='token')
+    monkeypatch.setattr(google_calendar, 'get_credentials', lambda: creds)
+    monkeypatch.setattr(google_calendar._local, 'client', None, raising=False)
+    return creds
+
+
+class TestGoogleCalendarClient:
+
+
+    def test_client_is_built_once_per_thread(self, shared_credentials, monkeypatch):
+
+        builds = []
+        monkeypatch.setattr(google_calendar, 'build_from_document',
+                            lambda document, credentials: builds.append(document) or object())
+
+        first = google_calendar.get_calendar_client()
+        second = google_calendar.get_calendar_client()
+
+        assert first is second
+        assert len(builds) == 1
+        assert builds[0]['name'] == 'calendar'
+
+    def test_update_patches_without_reading_event(self, shared_credentials, monkeypatch):
+
+        service = FakeCalendarService()
+        monkeypatch.setattr(google_calendar, 'get_calendar_client', lambda: service)
+
+        assert GoogleCalendarService().update_appointment_event('event', fake_appointment(1)) is True
+        assert service.calls == ['patch']
+
+    def test_batch_groups_operations_into_few_round_trips(self):
+
+        service = FakeCalendarService()
+        batch = GoogleCalendarBatch(service)
+
+        created = [batch.create_appointment_event(fake_appointment(number)) for number in range(60)]
+        deleted = batch.delete_appointment_event('old-event')
+        results = batch.execute()
+
+        assert service.http_round_trips == 2
+        assert results[created[5]] == 'event-Прийом у Doctor 5'
+        assert results[deleted] is True
+
+    def test_list_changes_follows_pages_with_sync_token(self, shared_credentials, monkeypatch):
+
+        calls = []
+        pages = {
+            0: {'items': [{'id': 'moved', 'status': 'confirmed',
+                           'start': {'dateTime': '2030-01-07T13:00:00+02:00'},
+                           'end': {'dateTime': '2030-01-07T13:30:00+02:00'}}],
+                'nextPageToken': 1},
+            1: {'items': [{'id': 'gone', 'status': 'cancelled'},
+                          {'id': 'holiday', 'status': 'confirmed', 'start': {'date': '2030-01-08'}}],
+                'nextSyncToken': 'next'},
+        }
+        service = SimpleNamespace(events=lambda: FakeEventList(pages, calls))
+        monkeypatch.setattr(google_calendar, 'get_calendar_client', lambda: service)
+
+        changes, token = GoogleCalendarService().list_changes('previous')
+
+        assert token == 'next'
+        assert len(calls) == 2
+        assert calls[0]['syncToken'] == 'previous'
+        assert changes[0]['start'].hour == 13
+        assert changes[1] == {'event_id': 'gone', 'cancelled': True, 'start': None, 'end': None}
+        assert changes[2]['start'] is None
+
+    def test_list_changes_reports_expired_token(self, shared_credentials, monkeypatch):
+
+        gone = HttpError(SimpleNamespace(status=410, reason='Gone'), b'')
+        service = SimpleNamespace(events=lambda: FakeEventList({0: gone}, []))
+        monkeypatch.setattr(google_calendar, 'get_calendar_client', lambda: service)
+
+        with pytest.raises(SyncTokenExpired):
+            GoogleCalendarService().list_changes('stale')
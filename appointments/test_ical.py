@@ -0,0 +1,105 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import timedelta
+from services.models import Service
+from appointments.models import Appointment
+from appointments.ical import feed_token
+
+User = get_user_model()
+
+
+@pytest.fixture
+def doctor(make_clinic, make_doctor):
+
+    return make_doctor(make_clinic('Clinic', address='Khreshchatyk 1, Kyiv'), 'doctor')
+
+
+@pytest.fixture
+def patient(db):
+
+    return User.objects.create_user(username='patient', password='pass')
+
+
+@pytest.fixture
+def appointment(patient, doctor):
+
+    service = Service.objects.create(
+        clinic=doctor.clinic,
+        name='Surgery',
+        service_type='surgery',
+        description='Surgery',
+        price=3000,
+        duration_minutes=90
+    )
+    return Appointment.objects.create(
+        user=patient,
+        doctor=doctor,
+        service=service,
+        appointment_date=timezone.localdate() + timedelta(days=1),
+        appointment_time='10:00'
+    )
+
+
+def feed(token, **headers):
+
+    return APIClient().get(f'/api/calendar/{token}.ics', **headers)
+
+
+@pytest.mark.django_db
+class TestCalendarFeed:
+
+
+    def test_patient_feed_streams_events(self, patient, appointment):
+
+        response = feed(feed_token('user', patient.id))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'].startswith('text/calendar')
+        body = b''.join(response.streaming_content).decode()
+        assert body.startswith('BEGIN:VCALENDAR\r\n')
+        assert f'UID:appointment-{appointment.id}@findvet' in body
+        assert 'LOCATION:Khreshchatyk 1\\, Kyiv' in body
+        assert 'STATUS:TENTATIVE' in body
+        assert body.endswith('END:VCALENDAR\r\n')
+
+    def test_doctor_feed_event_uses_service_duration(self, doctor, appointment):
+
+        body = b''.join(feed(feed_token('doctor', doctor.id)).streaming_content).decode()
+
+        start = next(line for line in body.split('\r\n') if line.startswith('DTSTART:'))[8:]
+        end = next(line for line in body.split('\r\n') if line.startswith('DTEND:'))[6:]
+        assert int(end[9:11]) * 60 + int(end[11:13]) - int(start[9:11]) * 60 - int(start[11:13]) == 90
+
+    def test_matching_etag_returns_not_modified(self, patient, appointment, django_assert_max_num_queries):
+
+        token = feed_token('user', patient.id)
+        etag = feed(token)['ETag']
+
+        with django_assert_max_num_queries(1):
+            response = feed(token, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        appointment.status = 'cancelled'
+        appointment.save()
+        assert feed(token, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_tampered_token_is_rejected(self, patient, doctor):
+
+        token = feed_token('user', patient.id).replace(f'user-{patient.id}', f'doctor-{doctor.id}')
+
+        assert feed(token).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_feed_urls_for_doctor(self, doctor):
+
+        client = APIClient()
+        client.force_authenticate(user=doctor.user)
+
+        response = client.get('/api/appointments/calendar-feeds/')
+
+        assert set(response.data) == {'user', 'doctor'}
+        assert response.data['doctor'].endswith(f"/api/calendar/{feed_token('doctor', doctor.id)}.ics")
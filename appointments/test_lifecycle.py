@@ -0,0 +1,94 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from appointments.models import Appointment
+from appointments.lifecycle import complete_past_appointments
+
+User = get_user_model()
+
+
+@pytest.fixture
+def doctor(make_clinic, make_doctor):
+
+    return make_doctor(make_clinic('Clinic'), 'doctor')
+
+
+@pytest.fixture
+def patient(db):
+
+    return User.objects.create_user(username='patient', password='pass')
+
+
+@pytest.fixture
+def noon():
+
+    today = timezone.localdate()
+    return timezone.make_aware(datetime.combine(today, time(12)))
+
+
+def book(patient, doctor, day, time, status='confirmed'):
+
+    return Appointment.objects.create(
+        user=patient,
+        doctor=doctor,
+        appointment_date=day,
+        appointment_time=time,
+        status=status
+    )
+
+
+@pytest.mark.django_db
+class TestCompletePastAppointments:
+
+
+    def test_completes_only_visits_that_have_ended(self, patient, doctor, noon):
+
+        today = noon.date()
+        yesterday = book(patient, doctor, today - timedelta(days=1), '10:00', status='pending')
+        ended = book(patient, doctor, today, '11:00')
+        running = book(patient, doctor, today, '11:45')
+        later = book(patient, doctor, today, '15:00')
+        cancelled = book(patient, doctor, today - timedelta(days=2), '10:00', status='cancelled')
+
+        stats = complete_past_appointments(batch_size=1, moment=noon)
+
+        assert stats['completed'] == 2
+        assert stats['batches'] == 2
+        statuses = dict(Appointment.objects.values_list('id', 'status'))
+        assert statuses[yesterday.id] == 'completed'
+        assert statuses[ended.id] == 'completed'
+        assert statuses[running.id] == 'confirmed'
+        assert statuses[later.id] == 'confirmed'
+        assert statuses[cancelled.id] == 'cancelled'
+
+    def test_command_reports_counts(self, patient, doctor, capsys):
+
+        book(patient, doctor, timezone.localdate() - timedelta(days=3), '10:00')
+
+        call_command('complete_past_appointments', batch_size=10)
+
+        output = capsys.readouterr().out
+        assert output.startswith('completed: 1, batches: 1, time: ')
+        assert Appointment.objects.get().status == 'completed'
+
+
+@pytest.mark.django_db
+class TestAppointmentTimeFilters:
+
+
+    def test_upcoming_and_past_filters(self, patient, doctor):
+
+        client = APIClient()
+        client.force_authenticate(user=patient)
+        today = timezone.localdate()
+        past = book(patient, doctor, today - timedelta(days=1), '10:00')
+        upcoming = book(patient, doctor, today + timedelta(days=1), '10:00')
+
+        upcoming_ids = [row['id'] for row in client.get('/api/appointments/', {'upcoming': 'true'}).data['results']]
+        past_ids = [row['id'] for row in client.get('/api/appointments/', {'past': 'true'}).data['results']]
+
+        assert upcoming_ids == [upcoming.id]
+        assert past_ids == [past.id]
@@ -1,7 +1,7 @@
 import pytest
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from datetime import timedelta
+from datetime import timedelta, time as dt_time
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 
@@ -131,6 +131,59 @@ class TestAppointmentModel:
 
         assert appointment.status == 'pending'
 
+    def test_appointment_end_time_from_service_duration(self, db):
+
+        user = User.objects.create_user(username='user6', password='pass')
+        clinic = Clinic.objects.create(
+            name='Clinic',
+            address='Addr',
+            city='City',
+            phone='+380501111111',
+            email='c@test.com',
+            latitude=50.0,
+            longitude=30.0,
+            working_hours_start='09:00',
+            working_hours_end='18:00'
+        )
+        doctor_user = User.objects.create_user(username='doc5', password='pass', role='doctor')
+        doctor = Doctor.objects.create(
+            user=doctor_user,
+            clinic=clinic,
+            first_name='Dr',
+            last_name='Test',
+            specialization='general',
+            experience_years=3,
+            education='Uni',
+            bio='B',
+            phone='+380502222222',
+            email='d@test.com'
+        )
+        service = Service.objects.create(
+            clinic=clinic,
+            name='Surgery',
+            service_type='surgery',
+            description='D',
+            price=100,
+            duration_minutes=90
+        )
+
+        appointment = Appointment.objects.create(
+            user=user,
+            doctor=doctor,
+            service=service,
+            appointment_date=(timezone.now() + timedelta(days=1)).date(),
+            appointment_time='23:00'
+        )
+        without_service = Appointment.objects.create(
+            user=user,
+            doctor=doctor,
+            appointment_date=(timezone.now() + timedelta(days=1)).date(),
+            appointment_time='10:00'
+        )
+
+        assert appointment.end_time == dt_time.max
+        assert without_service.end_time == dt_time(10, 30)
+
     def test_appointment_is_past_property(self, db):
 
         user = User.objects.create_user(username='user2', password='pass')
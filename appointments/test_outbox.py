@@ -0,0 +1,207 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import time, timedelta
+from appointments.models import Appointment, CalendarSyncState, CalendarSyncTask
+from appointments.calendar_backends import InMemoryCalendarBackend
+from appointments.calendar_pull import pull_calendar_changes
+from appointments.outbox import enqueue_calendar_sync, process_calendar_outbox
+
+User = get_user_model()
+
+
+class FailingCalendarBackend(InMemoryCalendarBackend):
+
+    def create_appointment_event(self, appointment):
+        raise ConnectionError('Calendar is unreachable')
+
+
+@pytest.fixture(autouse=True)
+def calendar(settings):
+
+    settings.CALENDAR_BACKEND = 'appointments.calendar_backends.InMemoryCalendarBackend'
+    InMemoryCalendarBackend.reset()
+    yield InMemoryCalendarBackend.events
+    InMemoryCalendarBackend.reset()
+
+
+@pytest.fixture
+def client_user(db):
+
+    return User.objects.create_user(username='client', password='pass')
+
+
+@pytest.fixture
+def authenticated_client(client_user):
+
+    client = APIClient()
+    client.force_authenticate(user=client_user)
+    return client
+
+
+@pytest.fixture
+def doctor(make_clinic, make_doctor):
+
+    return make_doctor(make_clinic('Clinic'), 'doctor')
+
+
+@pytest.fixture
+def appointment(client_user, doctor):
+
+    return Appointment.objects.create(
+        user=client_user,
+        doctor=doctor,
+        appointment_date=timezone.localdate() + timedelta(days=1),
+        appointment_time='10:00'
+    )
+
+
+@pytest.mark.django_db
+class TestCalendarOutbox:
+
+
+    def test_booking_enqueues_sync_without_calling_calendar(self, authenticated_client, doctor, calendar):
+
+        response = authenticated_client.post('/api/appointments/', {
+            'doctor': doctor.id,
+            'appointment_date': str(timezone.localdate() + timedelta(days=1)),
+            'appointment_time': '12:00',
+        }, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        task = CalendarSyncTask.objects.get()
+        assert task.action == 'create'
+        assert task.appointment_id == response.data['id']
+        assert calendar == {}
+
+    def test_worker_creates_and_deletes_event(self, authenticated_client, appointment, calendar):
+
+        enqueue_calendar_sync(appointment, 'create')
+        assert process_calendar_outbox() == {'done': 1, 'retried': 0, 'failed': 0}
+
+        appointment.refresh_from_db()
+        assert appointment.google_calendar_event_id in calendar
+
+        authenticated_client.post(f'/api/appointments/{appointment.id}/cancel/')
+        process_calendar_outbox()
+
+        assert calendar == {}
+        assert not CalendarSyncTask.objects.exclude(status='done').exists()
+
+    def test_cancelling_through_update_deletes_event(self, authenticated_client, appointment, calendar):
+
+        enqueue_calendar_sync(appointment, 'create')
+        process_calendar_outbox()
+
+        response = authenticated_client.patch(f'/api/appointments/{appointment.id}/',
+                                              {'status': 'cancelled'}, format='json')
+        process_calendar_outbox()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert CalendarSyncTask.objects.latest('id').action == 'delete'
+        assert calendar == {}
+
+    def test_duplicate_tasks_create_single_event(self, appointment, calendar):
+
+        enqueue_calendar_sync(appointment, 'create')
+        enqueue_calendar_sync(appointment, 'create')
+        enqueue_calendar_sync(appointment, 'update')
+
+        process_calendar_outbox()
+
+        assert len(calendar) == 1
+
+    def test_failed_task_is_retried_with_backoff(self, appointment, settings):
+
+        settings.CALENDAR_SYNC_MAX_ATTEMPTS = 2
+        task = enqueue_calendar_sync(appointment, 'create')
+        backend = FailingCalendarBackend()
+
+        assert process_calendar_outbox(backend=backend)['retried'] == 1
+        task.refresh_from_db()
+        assert task.status == 'pending'
+        assert task.next_attempt_at > timezone.now()
+        assert 'unreachable' in task.last_error
+
+        assert process_calendar_outbox(backend=backend) == {'done': 0, 'retried': 0, 'failed': 0}
+
+        CalendarSyncTask.objects.update(next_attempt_at=timezone.now())
+        assert process_calendar_outbox(backend=backend)['failed'] == 1
+        task.refresh_from_db()
+        assert task.status == 'failed'
+        assert task.attempts == 2
+
+
+@pytest.mark.django_db
+class TestCalendarPull:
+
+
+    def test_pull_applies_moves_and_deletions(self, appointment, doctor, client_user, calendar):
+
+        other = Appointment.objects.create(
+            user=client_user,
+            doctor=doctor,
+            appointment_date=appointment.appointment_date,
+            appointment_time='15:00'
+        )
+        enqueue_calendar_sync(appointment, 'create')
+        enqueue_calendar_sync(other, 'create')
+        process_calendar_outbox()
+        assert pull_calendar_changes()['moved'] == 0
+
+        appointment.refresh_from_db()
+        other.refresh_from_db()
+        backend = InMemoryCalendarBackend()
+        backend.edit_event(appointment.google_calendar_event_id, start=time(13, 0), end=time(13, 30))
+        backend.delete_appointment_event(other.google_calendar_event_id)
+
+        stats = pull_calendar_changes()
+
+        assert stats == {'received': 2, 'moved': 1, 'cancelled': 1, 'conflicts': 0}
+        appointment.refresh_from_db()
+        other.refresh_from_db()
+        assert appointment.appointment_time == time(13, 0)
+        assert appointment.end_time == time(13, 30)
+        assert other.status == 'cancelled'
+        assert not CalendarSyncTask.objects.filter(status='pending').exists()
+
+    def test_pull_fetches_only_changes_since_last_token(self, appointment, calendar, django_assert_max_num_queries):
+
+        enqueue_calendar_sync(appointment, 'create')
+        process_calendar_outbox()
+        pull_calendar_changes()
+        token = CalendarSyncState.objects.get().sync_token
+
+        with django_assert_max_num_queries(3):
+            stats = pull_calendar_changes()
+
+        assert stats['received'] == 0
+        assert CalendarSyncState.objects.get().sync_token == token
+
+    def test_pull_reports_conflicting_move(self, appointment, doctor, client_user, calendar):
+
+        Appointment.objects.create(
+            user=client_user,
+            doctor=doctor,
+            appointment_date=appointment.appointment_date,
+            appointment_time='15:00'
+        )
+        enqueue_calendar_sync(appointment, 'create')
+        process_calendar_outbox()
+        appointment.refresh_from_db()
+        InMemoryCalendarBackend().edit_event(appointment.google_calendar_event_id, start=time(15, 0))
+
+        assert pull_calendar_changes()['conflicts'] == 1
+        appointment.refresh_from_db()
+        assert appointment.appointment_time == time(10, 0)
+
+    def test_expired_token_falls_back_to_full_listing(self, appointment, calendar):
+
+        enqueue_calendar_sync(appointment, 'create')
+        process_calendar_outbox()
+        CalendarSyncState.objects.create(calendar_id='primary', sync_token='999')
+
+        assert pull_calendar_changes()['received'] == 1
+        assert CalendarSyncState.objects.get().sync_token == '1'
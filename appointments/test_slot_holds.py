@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import timedelta
+from doctors.models import DoctorSchedule
+from appointments.models import Appointment, SlotHold
+
+User = get_user_model()
+
+
+def make_client(username):
+
+    client = APIClient()
+    client.user = User.objects.create_user(username=username, password='pass')
+    client.force_authenticate(user=client.user)
+    return client
+
+
+@pytest.fixture
+def doctor(make_clinic, make_doctor):
+
+    doctor = make_doctor(make_clinic('Clinic'), 'doctor')
+    for weekday in range(7):
+        DoctorSchedule.objects.create(doctor=doctor, weekday=weekday, start_time='09:00', end_time='12:00')
+    return doctor
+
+
+@pytest.fixture
+def tomorrow():
+
+    return timezone.localdate() + timedelta(days=1)
+
+
+@pytest.fixture
+def holder(db):
+
+    return make_client('holder')
+
+
+@pytest.fixture
+def other(db):
+
+    return make_client('other')
+
+
+def hold(client, doctor, day, time='10:00'):
+
+    return client.post('/api/slot-holds/', {
+        'doctor': doctor.id,
+        'appointment_date': str(day),
+        'appointment_time': time,
+    }, format='json')
+
+
+def available_slots(client, doctor, day):
+
+    response = client.get(f'/api/doctors/{doctor.id}/availability/', {'from': str(day), 'to': str(day)})
+    return response.data['days'][0]['slots']
+
+
+@pytest.mark.django_db
+class TestSlotHolds:
+
+
+    def test_held_slot_is_hidden_from_other_patients(self, holder, other, doctor, tomorrow):
+
+        response = hold(holder, doctor, tomorrow)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert '10:00' in available_slots(holder, doctor, tomorrow)
+        assert '10:00' not in available_slots(other, doctor, tomorrow)
+        assert '09:45' not in available_slots(other, doctor, tomorrow)
+        assert '10:30' in available_slots(other, doctor, tomorrow)
+
+    def test_only_holder_can_book_held_slot(self, holder, other, doctor, tomorrow):
+
+        hold(holder, doctor, tomorrow)
+        data = {'doctor': doctor.id, 'appointment_date': str(tomorrow), 'appointment_time': '10:00'}
+
+        assert other.post('/api/appointments/', data, format='json').status_code == status.HTTP_400_BAD_REQUEST
+        assert holder.post('/api/appointments/', data, format='json').status_code == status.HTTP_201_CREATED
+        assert not SlotHold.objects.exists()
+
+    def test_conflicting_hold_is_rejected_until_expiry(self, holder, other, doctor, tomorrow):
+
+        hold(holder, doctor, tomorrow)
+
+        assert hold(other, doctor, tomorrow).status_code == status.HTTP_400_BAD_REQUEST
+
+        SlotHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        assert hold(other, doctor, tomorrow).status_code == status.HTTP_201_CREATED
+        assert SlotHold.objects.get().user == other.user
+
+    def test_new_hold_replaces_previous_one(self, holder, doctor, tomorrow):
+
+        hold(holder, doctor, tomorrow, '09:00')
+        hold(holder, doctor, tomorrow, '11:00')
+
+        response = holder.get('/api/slot-holds/')
+
+        results = response.data.get('results', response.data)
+        assert [item['appointment_time'] for item in results] == ['11:00:00']
+
+    def test_hold_on_booked_slot_is_rejected(self, holder, other, doctor, tomorrow):
+
+        Appointment.objects.create(
+            user=other.user,
+            doctor=doctor,
+            appointment_date=tomorrow,
+            appointment_time='10:00'
+        )
+
+        assert hold(holder, doctor, tomorrow, '10:15').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_hold_in_the_past_or_with_unavailable_doctor_is_rejected(self, holder, doctor, tomorrow):
+
+        assert hold(holder, doctor, '2001-01-01').status_code == status.HTTP_400_BAD_REQUEST
+
+        doctor.is_available = False
+        doctor.save()
+
+        assert hold(holder, doctor, tomorrow).status_code == status.HTTP_400_BAD_REQUEST
+        assert not SlotHold.objects.exists()
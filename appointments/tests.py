@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 from clinics.models import Clinic
 from doctors.models import Doctor
 from services.models import Service
-from appointments.models import Appointment
+from appointments.models import Appointment, CalendarSyncTask
 
 User = get_user_model()
 
@@ -408,3 +408,233 @@ class TestAppointmentUpdateNegative:
 
 
         assert response.status_code in [status.HTTP_400_BAD_REQUEST, status.HTTP_200_OK]
+
+
+@pytest.mark.django_db
+class TestAppointmentConfirmNegative:
+
+
+    @pytest.fixture
+    def doctor_client(self, doctor):
+
+        client = APIClient()
+        client.force_authenticate(user=doctor.user)
+        return client
+
+    def test_confirm_cancelled_appointment_after_slot_rebooked(self, doctor_client, appointment, create_user):
+
+        appointment.status = 'cancelled'
+        appointment.save()
+        rebooked = Appointment.objects.create(
+            user=create_user(username='other', email='other@example.com'),
+            doctor=appointment.doctor,
+            appointment_date=appointment.appointment_date,
+            appointment_time=appointment.appointment_time
+        )
+
+        response = doctor_client.post(f'/api/appointments/{appointment.id}/confirm/')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        appointment.refresh_from_db()
+        rebooked.refresh_from_db()
+        assert (appointment.status, rebooked.status) == ('cancelled', 'pending')
+
+
+    def test_confirm_cancelled_appointment_overlapping_live_one(self, doctor_client, appointment, create_user):
+
+        appointment.status = 'cancelled'
+        appointment.save()
+        Appointment.objects.create(
+            user=create_user(username='other', email='other@example.com'),
+            doctor=appointment.doctor,
+            service=appointment.service,
+            appointment_date=appointment.appointment_date,
+            appointment_time='14:15'
+        )
+
+        response = doctor_client.post(f'/api/appointments/{appointment.id}/confirm/')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        appointment.refresh_from_db()
+        assert appointment.status == 'cancelled'
+
+    def test_confirm_enqueues_calendar_update(self, doctor_client, appointment):
+
+        response = doctor_client.post(f'/api/appointments/{appointment.id}/confirm/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert CalendarSyncTask.objects.get(appointment=appointment).action == 'update'
+
+@pytest.mark.django_db
+class TestAppointmentOverlapNegative:
+
+
+    @pytest.fixture
+    def surgery(self, clinic):
+
+        return Service.objects.create(
+            clinic=clinic,
+            name='Surgery',
+            service_type='surgery',
+            description='Surgery',
+            price=3000,
+            duration_minutes=90
+        )
+
+    def test_create_appointment_inside_longer_visit(self, authenticated_client, doctor, service, surgery):
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date()
+        Appointment.objects.create(
+            user=authenticated_client.user,
+            doctor=doctor,
+            service=surgery,
+            appointment_date=tomorrow,
+            appointment_time='10:00'
+        )
+
+        data = {
+            'doctor': doctor.id,
+            'service': service.id,
+            'appointment_date': str(tomorrow),
+            'appointment_time': '10:30'
+        }
+
+        response = authenticated_client.post('/api/appointments/', data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'вже зайнятий' in str(response.data).lower()
+
+    def test_create_longer_visit_over_existing_one(self, authenticated_client, doctor, service, surgery):
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date()
+        Appointment.objects.create(
+            user=authenticated_client.user,
+            doctor=doctor,
+            service=service,
+            appointment_date=tomorrow,
+            appointment_time='11:00'
+        )
+
+        data = {
+            'doctor': doctor.id,
+            'service': surgery.id,
+            'appointment_date': str(tomorrow),
+            'appointment_time': '10:00'
+        }
+
+        response = authenticated_client.post('/api/appointments/', data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_create_appointment_right_after_longer_visit(self, authenticated_client, doctor, service, surgery):
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date()
+        Appointment.objects.create(
+            user=authenticated_client.user,
+            doctor=doctor,
+            service=surgery,
+            appointment_date=tomorrow,
+            appointment_time='10:00'
+        )
+
+        data = {
+            'doctor': doctor.id,
+            'service': service.id,
+            'appointment_date': str(tomorrow),
+            'appointment_time': '11:30'
+        }
+
+        response = authenticated_client.post('/api/appointments/', data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db
+class TestAppointmentBulkPositive:
+
+
+    def test_bulk_recurring_series(self, authenticated_client, doctor, service, django_assert_max_num_queries):
+
+        start = (timezone.now() + timedelta(days=1)).date()
+        data = {
+            'doctor': doctor.id,
+            'service': service.id,
+            'recurrence': {
+                'start_date': str(start),
+                'appointment_time': '10:00',
+                'every': 2,
+                'unit': 'weeks',
+                'count': 20
+            }
+        }
+
+        with django_assert_max_num_queries(8):
+            response = authenticated_client.post('/api/appointments/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == 20
+        dates = sorted(Appointment.objects.values_list('appointment_date', flat=True))
+        assert dates[0] == start
+        assert dates[-1] == start + timedelta(weeks=38)
+
+    def test_bulk_reports_conflicting_slots(self, authenticated_client, appointment, doctor, service):
+
+        data = {
+            'doctor': doctor.id,
+            'service': service.id,
+            'slots': [
+                {'appointment_date': str(appointment.appointment_date), 'appointment_time': '14:15'},
+                {'appointment_date': str(appointment.appointment_date), 'appointment_time': '15:00'},
+                {'appointment_date': str(appointment.appointment_date), 'appointment_time': '15:15'},
+            ]
+        }
+
+        response = authenticated_client.post('/api/appointments/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [result['status'] for result in response.data['results']] == ['conflict', 'created', 'conflict']
+        assert Appointment.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestAppointmentBulkNegative:
+
+
+    def test_bulk_all_or_nothing_creates_nothing_on_conflict(self, authenticated_client, appointment,
+                                                             doctor, service):
+
+        data = {
+            'doctor': doctor.id,
+            'service': service.id,
+            'all_or_nothing': True,
+            'slots': [
+                {'appointment_date': str(appointment.appointment_date), 'appointment_time': '09:00'},
+                {'appointment_date': str(appointment.appointment_date), 'appointment_time': '14:00'},
+            ]
+        }
+
+        response = authenticated_client.post('/api/appointments/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [result['status'] for result in response.data['results']] == ['skipped', 'conflict']
+        assert Appointment.objects.count() == 1
+
+    def test_bulk_requires_slots_or_recurrence(self, authenticated_client, doctor):
+
+        response = authenticated_client.post('/api/appointments/bulk/', {'doctor': doctor.id}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('recurrence', [
+        {'start_date': '2030-01-01', 'count': 2_000_000},
+        {'start_date': '2030-01-01', 'count': 2, 'every': 10 ** 9},
+        {'start_date': '9999-12-01', 'count': 10},
+    ])
+    def test_bulk_rejects_oversized_recurrence(self, authenticated_client, doctor, recurrence):
+
+        data = {'doctor': doctor.id, 'recurrence': {'appointment_time': '10:00', **recurrence}}
+
+        response = authenticated_client.post('/api/appointments/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Appointment.objects.exists()
@@ -1,33 +1,89 @@
-from rest_framework import viewsets, status
+from datetime import date, timedelta
+
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from django.conf import settings
+from django.http import Http404, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 from django_filters.rest_framework import DjangoFilterBackend
+from vet_booking.dates import parse_query_date
 
-from .google_calendar import GoogleCalendarService
-from .models import Appointment
+from doctors.models import Doctor
+from doctors.serializers import DoctorListSerializer
+from services.models import Service
+from .availability import EARLIEST_HORIZON_DAYS, earliest_slots
+from .booking import SLOT_HELD_MESSAGE, SLOT_TAKEN_MESSAGE, SlotUnavailable, book_series, check_slot_free
+from .filters import AppointmentFilter, ArchivedAppointmentFilter
+from .ical import feed_etag, feed_owner, feed_queryset, feed_token, iter_calendar
+from .outbox import enqueue_calendar_sync
+from .models import Appointment, ArchivedAppointment, SlotHold, DEFAULT_DURATION_MINUTES
 from .serializers import (AppointmentListSerializer, AppointmentDetailSerializer,
-                          AppointmentCreateSerializer, AppointmentUpdateSerializer)
+                          AppointmentCreateSerializer, AppointmentUpdateSerializer,
+                          AppointmentBulkCreateSerializer, ArchivedAppointmentListSerializer,
+                          SlotHoldSerializer)
 
 
 class AppointmentViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['status', 'doctor', 'appointment_date']
+    filterset_class = AppointmentFilter
 
-    def get_queryset(self):
+    def _visible(self, queryset):
         user = self.request.user
         if user.role == 'admin':
-            return Appointment.objects.all()
+            return queryset
         elif user.role == 'doctor':
-            return Appointment.objects.filter(doctor__user=user)
+            return queryset.filter(doctor__user=user)
         else:
-            return Appointment.objects.filter(user=user)
+            return queryset.filter(user=user)
+
+    def get_queryset(self):
+        return self._visible(Appointment.objects.select_related('doctor__clinic', 'service__clinic', 'user'))
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('include_archived') != 'true':
+            return super().list(request, *args, **kwargs)
+
+        # Page over the ids of both tables, then load only that page's rows
+        hot = self.filter_queryset(self.get_queryset())
+        archived = ArchivedAppointmentFilter(
+            request.query_params, queryset=self._visible(ArchivedAppointment.objects.all()), request=request
+        ).qs
+        columns = ('id', 'appointment_date', 'appointment_time', 'archived')
+        combined = hot.annotate(archived=Value(False)).values_list(*columns).order_by().union(
+            archived.annotate(archived=Value(True)).values_list(*columns).order_by(),
+            all=True
+        ).order_by('-appointment_date', '-appointment_time', '-id')
+
+        page = self.paginate_queryset(combined)
+        related = ('doctor__clinic', 'service__clinic')
+        hot_rows = Appointment.objects.select_related(*related).in_bulk(
+            [pk for pk, _, _, is_archived in page if not is_archived]
+        )
+        archived_rows = ArchivedAppointment.objects.select_related(*related).in_bulk(
+            [pk for pk, _, _, is_archived in page if is_archived]
+        )
+
+        context = self.get_serializer_context()
+        return self.get_paginated_response([
+            ArchivedAppointmentListSerializer(archived_rows[pk], context=context).data if is_archived
+            else AppointmentListSerializer(hot_rows[pk], context=context).data
+            for pk, _, _, is_archived in page
+        ])
 
     def get_serializer_class(self):
         if self.action == 'create':
             return AppointmentCreateSerializer
+        elif self.action == 'bulk':
+            return AppointmentBulkCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return AppointmentUpdateSerializer
         elif self.action == 'list':
@@ -35,41 +91,80 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         return AppointmentDetailSerializer
 
     def perform_create(self, serializer):
+        user = self.request.user
         try:
-            appointment = serializer.save(user=self.request.user)
+            with transaction.atomic():
+                appointment = serializer.save(user=user)
+                check_slot_free(appointment, user)
+                enqueue_calendar_sync(appointment, 'create')
+                SlotHold.objects.filter(user=user, doctor=appointment.doctor).delete()
         except IntegrityError:
             raise ValidationError({
-                'non_field_errors': ['Цей час вже зайнятий.']
+                'non_field_errors': [SLOT_TAKEN_MESSAGE]
+            })
+        except SlotUnavailable as e:
+            raise ValidationError({
+                'non_field_errors': [str(e)]
             })
 
+    def perform_update(self, serializer):
+
         try:
-            calendar_service = GoogleCalendarService()
-            event_id = calendar_service.create_appointment_event(appointment)
-            if event_id:
-                appointment.google_calendar_event_id = event_id
-                appointment.save()
-        except Exception as e:
-            print(f"Could not create calendar event: {e}")
+            with transaction.atomic():
+                appointment = serializer.save()
+                if appointment.status in Appointment.ACTIVE_STATUSES:
+                    check_slot_free(appointment, appointment.user_id)
+                action = 'delete' if appointment.status == 'cancelled' else 'update'
+                enqueue_calendar_sync(appointment, action)
+        except IntegrityError:
+            raise ValidationError({
+                'non_field_errors': [SLOT_TAKEN_MESSAGE]
+            })
+        except SlotUnavailable as e:
+            raise ValidationError({
+                'non_field_errors': [str(e)]
+            })
 
-    def perform_update(self, serializer):
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
         try:
-            appointment = serializer.save()
+            results = book_series(
+                request.user,
+                data['doctor'],
+                data['slots'],
+                service=data.get('service'),
+                notes=data['notes'],
+                all_or_nothing=data['all_or_nothing']
+            )
         except IntegrityError:
             raise ValidationError({
-                'non_field_errors': ['Цей час вже зайнятий.']
+                'non_field_errors': [SLOT_TAKEN_MESSAGE]
             })
 
+        created = sum(result['status'] == 'created' for result in results)
+        return Response(
+            {'created': created, 'results': results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
 
-        if appointment.google_calendar_event_id:
-            try:
-                calendar_service = GoogleCalendarService()
-                calendar_service.update_appointment_event(
-                    appointment.google_calendar_event_id,
-                    appointment
+    @action(detail=False, methods=['get'], url_path='calendar-feeds')
+    def calendar_feeds(self, request):
+        """Subscription URLs of the current user's .ics feeds"""
+        feeds = {'user': request.build_absolute_uri(
+            reverse('calendar-feed', args=[feed_token('user', request.user.pk)])
+        )}
+        if request.user.role == 'doctor':
+            doctor_id = Doctor.objects.filter(user=request.user).values_list('id', flat=True).first()
+            if doctor_id:
+                feeds['doctor'] = request.build_absolute_uri(
+                    reverse('calendar-feed', args=[feed_token('doctor', doctor_id)])
                 )
-            except Exception as e:
-                print(f"Could not update calendar event: {e}")
+        return Response(feeds)
 
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
@@ -82,17 +177,10 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        appointment.status = 'cancelled'
-        appointment.save()
-
-        if appointment.google_calendar_event_id:
-            try:
-                calendar_service = GoogleCalendarService()
-                calendar_service.delete_appointment_event(
-                    appointment.google_calendar_event_id
-                )
-            except Exception as e:
-                print(f"Could not delete calendar event: {e}")
+        with transaction.atomic():
+            appointment.status = 'cancelled'
+            appointment.save()
+            enqueue_calendar_sync(appointment, 'delete')
 
         return Response(
             {'detail': 'Запис успішно скасовано.'},
@@ -118,10 +206,128 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        appointment.status = 'confirmed'
-        appointment.save()
+        # A cancelled slot may have been booked again since, so confirming re-checks it
+        try:
+            with transaction.atomic():
+                appointment.status = 'confirmed'
+                appointment.save()
+                check_slot_free(appointment, appointment.user_id)
+                enqueue_calendar_sync(appointment, 'update')
+        except IntegrityError:
+            raise ValidationError({
+                'non_field_errors': [SLOT_TAKEN_MESSAGE]
+            })
+        except SlotUnavailable as e:
+            raise ValidationError({
+                'non_field_errors': [str(e)]
+            })
 
         return Response(
             {'detail': 'Запис підтверджено.'},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+class SlotHoldViewSet(mixins.CreateModelMixin,
+                      mixins.ListModelMixin,
+                      mixins.DestroyModelMixin,
+                      viewsets.GenericViewSet):
+    serializer_class = SlotHoldSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SlotHold.objects.live().filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        expires_at = timezone.now() + timedelta(minutes=settings.SLOT_HOLD_MINUTES)
+
+        try:
+            with transaction.atomic():
+                # Evict expired holds (an indexed range delete) and keep one hold per doctor
+                SlotHold.objects.expired().delete()
+                SlotHold.objects.filter(user=user, doctor=serializer.validated_data['doctor']).delete()
+                serializer.save(user=user, expires_at=expires_at)
+        except IntegrityError:
+            raise ValidationError({
+                'non_field_errors': [SLOT_HELD_MESSAGE]
+            })
+
+
+class EarliestAvailabilityView(APIView):
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        params = request.query_params
+        doctors = Doctor.objects.filter(is_available=True)
+
+        if params.get('specialization'):
+            doctors = doctors.filter(specialization=params['specialization'])
+        if params.get('clinic'):
+            if not params['clinic'].isdigit():
+                return Response({'detail': 'Клініку не знайдено.'}, status=status.HTTP_400_BAD_REQUEST)
+            doctors = doctors.filter(clinic_id=params['clinic'])
+        if params.get('city'):
+            doctors = doctors.filter(clinic__city=params['city'])
+
+        service = None
+        duration = DEFAULT_DURATION_MINUTES
+        if params.get('service'):
+            if params['service'].isdigit():
+                service = Service.objects.filter(pk=params['service'], is_available=True).first()
+            if service is None:
+                return Response({'detail': 'Послугу не знайдено.'}, status=status.HTTP_400_BAD_REQUEST)
+            doctors = doctors.filter(clinic_id=service.clinic_id)
+            duration = service.duration_minutes
+
+        try:
+            date_from = parse_query_date(params.get('from'))
+        except ValueError:
+            return Response({'detail': 'Невірний формат дати.'}, status=status.HTTP_400_BAD_REQUEST)
+        # The search looks EARLIEST_HORIZON_DAYS ahead, which has to stay inside the calendar
+        if (date.max - date_from).days < EARLIEST_HORIZON_DAYS:
+            return Response({'detail': 'Невірний формат дати.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(int(params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        slots = earliest_slots(doctors.values('id'), date_from, duration, limit=max(limit, 1), user=request.user)
+
+        doctor_map = Doctor.objects.select_related('clinic').in_bulk({doctor_id for _, _, doctor_id in slots})
+
+        return Response({
+            'service': service.id if service else None,
+            'duration_minutes': duration,
+            'results': [
+                {
+                    'date': day,
+                    'time': slot.strftime('%H:%M'),
+                    'doctor': DoctorListSerializer(doctor_map[doctor_id], context={'request': request}).data,
+                }
+                for day, slot, doctor_id in slots
+            ],
+        })
+
+
+@require_GET
+def calendar_feed(request, token):
+    """iCalendar subscription feed; the signed token in the URL stands in for authentication"""
+    owner = feed_owner(token)
+    if owner is None:
+        raise Http404
+
+    queryset = feed_queryset(*owner)
+    etag = feed_etag(queryset)
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = StreamingHttpResponse(
+            iter_calendar(queryset, 'FindVet'),
+            content_type='text/calendar; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'inline; filename="appointments.ics"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,13 +1,17 @@
 from django.contrib import admin
-from .models import Clinic, ClinicSpecialization
+from .models import Clinic, ClinicOpeningHours, ClinicSpecialization
 
 class ClinicSpecializationInline(admin.TabularInline):
     model = ClinicSpecialization
     extra = 1
 
+class ClinicOpeningHoursInline(admin.TabularInline):
+    model = ClinicOpeningHours
+    extra = 0
+
 @admin.register(Clinic)
 class ClinicAdmin(admin.ModelAdmin):
     list_display = ['name', 'city', 'phone', 'rating', 'is_active', 'created_at']
     list_filter = ['city', 'is_active', 'created_at']
     search_fields = ['name', 'city', 'address']
-    inlines = [ClinicSpecializationInline]
+    inlines = [ClinicSpecializationInline, ClinicOpeningHoursInline]
@@ -0,0 +1,32 @@
+import django_filters
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .hours import open_at_q
+from .models import Clinic, ClinicOpeningHours
+
+
+class ClinicFilter(django_filters.FilterSet):
+    open_now = django_filters.BooleanFilter(method='filter_open_now')
+    open_at = django_filters.IsoDateTimeFilter(method='filter_open_at')
+    open_on = django_filters.NumberFilter(method='filter_open_on', min_value=0, max_value=6)
+
+    class Meta:
+        model = Clinic
+        fields = ['city']
+
+    def _hours(self):
+        return ClinicOpeningHours.objects.filter(clinic=OuterRef('pk'))
+
+    def _open_at(self, queryset, moment, value=True):
+        is_open = Exists(self._hours().filter(open_at_q(moment)))
+        return queryset.filter(is_open if value else ~is_open)
+
+    def filter_open_now(self, queryset, name, value):
+        return self._open_at(queryset, timezone.now(), value)
+
+    def filter_open_at(self, queryset, name, value):
+        return self._open_at(queryset, value)
+
+    def filter_open_on(self, queryset, name, value):
+        return queryset.filter(Exists(self._hours().filter(weekday=value)))
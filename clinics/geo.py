@@ -0,0 +1,86 @@
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle; longitudes span everything near the poles"""
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(lat - delta_lat, -90.0), min(lat + delta_lat, 90.0)
+
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
+    ratio = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))
+    delta_lng = math.degrees(math.asin(min(ratio, 1.0)))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180.0 or max_lng > 180.0:
+        # The box crosses the antimeridian; fall back to the latitude band
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(a), 1.0))
+
+
+def nearest(points, lat, lng, radius_km, limit):
+    """The `limit` closest (distance_km, id) pairs within radius_km from (id, lat, lng) points
+
+    One pass over the candidates with the origin's trigonometry computed once;
+    heapq keeps only the best `limit` so the cost is O(n log limit).
+    """
+    phi1 = math.radians(lat)
+    cos_phi1 = math.cos(phi1)
+    lng_rad = math.radians(lng)
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    max_a = sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+
+    def candidates():
+        for pk, point_lat, point_lng in points:
+            phi2 = radians(point_lat)
+            a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(point_lng) - lng_rad) / 2) ** 2
+            if a <= max_a:
+                yield 2 * EARTH_RADIUS_KM * asin(min(sqrt(a), 1.0)), pk
+
+    return heapq.nsmallest(limit, candidates())
+
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+# Map zoom -> geohash prefix length used to cluster markers; above the last zoom markers are not clustered
+CLUSTER_PRECISION = ((3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6))
+
+
+def geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Geohash of a point; nearby points share a prefix, so a prefix names a grid cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, value, bits, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            value, bits = 0, 0
+    return ''.join(chars)
+
+
+def cluster_precision(zoom):
+    """Geohash prefix length to cluster on at a zoom level, or None to return single markers"""
+    for max_zoom, precision in CLUSTER_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return None
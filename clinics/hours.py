@@ -0,0 +1,54 @@
+import re
+
+from django.db.models import Q
+from django.utils import timezone
+
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+DAY_NAMES = ('пн', 'вт', 'ср', 'чт', 'пт', 'сб', 'нд')
+EVERY_DAY = ('щодня', 'без вихідних')
+
+
+def parse_working_days(text):
+    """Weekdays (0 = Monday) named by a string like 'Пн-Пт', 'Пн-Пт, Сб' or 'Щодня'
+
+    Raises ValueError for anything it does not understand.
+    """
+    text = text.strip().lower()
+    if text in EVERY_DAY:
+        return list(range(7))
+
+    days = set()
+    for part in re.split(r'[,;]', text):
+        bounds = [bound.strip().rstrip('.') for bound in re.split(r'[-–—]', part)]
+        if len(bounds) not in (1, 2) or any(bound not in DAY_NAMES for bound in bounds):
+            raise ValueError(f'Unknown working days: {text!r}')
+        first, last = DAY_NAMES.index(bounds[0]), DAY_NAMES.index(bounds[-1])
+        # 'Пт-Пн' wraps over the weekend
+        days.update(day % 7 for day in range(first, last + 1 if last >= first else last + 8))
+    return sorted(days)
+
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def week_range(weekday, opens_at, closes_at):
+    """(start, end) minutes since Monday 00:00; an interval closing at or before it opens runs past midnight"""
+    start = weekday * DAY_MINUTES + minute_of_day(opens_at)
+    length = (minute_of_day(closes_at) - minute_of_day(opens_at)) % DAY_MINUTES or DAY_MINUTES
+    return start, start + length
+
+
+def week_minute(moment):
+    moment = timezone.localtime(moment)
+    return moment.weekday() * DAY_MINUTES + minute_of_day(moment)
+
+
+def open_at_q(moment):
+    """Opening intervals covering a moment; Sunday night intervals spill past the end of the week"""
+    minute = week_minute(moment)
+    return (
+        Q(start_minute__lte=minute, end_minute__gt=minute)
+        | Q(start_minute__lte=minute + WEEK_MINUTES, end_minute__gt=minute + WEEK_MINUTES)
+    )
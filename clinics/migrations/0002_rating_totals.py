@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinic',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сума оцінок'),
+        ),
+        migrations.AddField(
+            model_name='clinic',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість відгуків'),
+        ),
+        migrations.AddIndex(
+            model_name='clinic',
+            index=models.Index(fields=['-rating', 'name'], name='clinic_rating_idx'),
+        ),
+    ]
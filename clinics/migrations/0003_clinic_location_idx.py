@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0002_rating_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clinic',
+            index=models.Index(fields=['latitude', 'longitude'], name='clinic_location_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+from clinics.geo import geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    Clinic = apps.get_model('clinics', 'Clinic')
+    clinics = list(Clinic.objects.only('id', 'latitude', 'longitude'))
+    for clinic in clinics:
+        clinic.geohash = geohash(float(clinic.latitude), float(clinic.longitude))
+    Clinic.objects.bulk_update(clinics, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0003_clinic_location_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinic',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='Геохеш'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
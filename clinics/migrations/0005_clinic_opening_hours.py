@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from clinics.hours import parse_working_days, week_range
+
+
+def opening_hours_from_working_days(apps, schema_editor):
+    Clinic = apps.get_model('clinics', 'Clinic')
+    ClinicOpeningHours = apps.get_model('clinics', 'ClinicOpeningHours')
+    hours = []
+    for clinic_id, working_days, opens_at, closes_at in Clinic.objects.values_list(
+            'id', 'working_days', 'working_hours_start', 'working_hours_end'):
+        try:
+            weekdays = parse_working_days(working_days)
+        except ValueError:
+            # Left without hours; they can be entered in the admin
+            continue
+        for weekday in weekdays:
+            start_minute, end_minute = week_range(weekday, opens_at, closes_at)
+            hours.append(ClinicOpeningHours(clinic_id=clinic_id, weekday=weekday, opens_at=opens_at,
+                                            closes_at=closes_at, start_minute=start_minute, end_minute=end_minute))
+    ClinicOpeningHours.objects.bulk_create(hours, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0004_clinic_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClinicOpeningHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.IntegerField(choices=[(0, 'Понеділок'), (1, 'Вівторок'), (2, 'Середа'), (3, 'Четвер'), (4, "П'ятниця"), (5, 'Субота'), (6, 'Неділя')], verbose_name='День тижня')),
+                ('opens_at', models.TimeField(verbose_name='Відкриття')),
+                ('closes_at', models.TimeField(verbose_name='Закриття')),
+                ('start_minute', models.PositiveIntegerField(editable=False)),
+                ('end_minute', models.PositiveIntegerField(editable=False)),
+                ('clinic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_hours', to='clinics.clinic')),
+            ],
+            options={
+                'verbose_name': 'Години роботи',
+                'verbose_name_plural': 'Години роботи',
+                'ordering': ['weekday', 'opens_at'],
+                'indexes': [models.Index(fields=['start_minute', 'end_minute'], name='opening_hours_minute_idx')],
+            },
+        ),
+        migrations.RunPython(opening_hours_from_working_days, migrations.RunPython.noop),
+    ]
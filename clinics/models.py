@@ -1,5 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .geo import geohash
+from .hours import parse_working_days, week_range
 
 
 class Clinic(models.Model):
@@ -14,6 +16,8 @@ class Clinic(models.Model):
 
     latitude = models.DecimalField(max_digits=9, decimal_places=6, verbose_name='Широта')
     longitude = models.DecimalField(max_digits=9, decimal_places=6, verbose_name='Довгота')
+    # Grid cell of the location; map clustering groups clinics on a prefix of it
+    geohash = models.CharField(max_length=12, blank=True, editable=False, db_index=True, verbose_name='Геохеш')
 
 
     working_hours_start = models.TimeField(verbose_name='Початок роботи')
@@ -28,6 +32,9 @@ class Clinic(models.Model):
         validators=[MinValueValidator(0.0), MaxValueValidator(5.0)],
         verbose_name='Рейтинг'
     )
+    # Running totals kept in step with reviews; rating = rating_sum / review_count
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name='Сума оцінок')
+    review_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість відгуків')
 
     image = models.ImageField(upload_to='clinics/', blank=True, null=True, verbose_name='Фото')
     is_active = models.BooleanField(default=True, verbose_name='Активна')
@@ -37,8 +44,46 @@ class Clinic(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_hours = instance._legacy_hours()
+        return instance
+
+    def _legacy_hours(self):
+        return tuple(self.__dict__.get(name) for name in ('working_days', 'working_hours_start', 'working_hours_end'))
+
+    def save(self, *args, **kwargs):
+        self.geohash = geohash(float(self.latitude), float(self.longitude))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+        # Hours edited per day are kept until the summary fields themselves change
+        if self._legacy_hours() != getattr(self, '_loaded_hours', None):
+            self.reset_opening_hours()
+
+    def reset_opening_hours(self):
+        """Rebuild the weekly hours from working_days and working_hours_start/end"""
+        try:
+            weekdays = parse_working_days(self.working_days)
+        except ValueError:
+            return
+        opens_at = self._meta.get_field('working_hours_start').to_python(self.working_hours_start)
+        closes_at = self._meta.get_field('working_hours_end').to_python(self.working_hours_end)
+        self.opening_hours.all().delete()
+        ClinicOpeningHours.objects.bulk_create([
+            ClinicOpeningHours.build(self, weekday, opens_at, closes_at) for weekday in weekdays
+        ])
+        self._loaded_hours = self._legacy_hours()
+
     class Meta:
         ordering = ['-rating', 'name']
+        indexes = [
+            models.Index(fields=['-rating', 'name'], name='clinic_rating_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='clinic_location_idx'),
+        ]
         verbose_name = 'Клініка'
         verbose_name_plural = 'Клініки'
 
@@ -64,3 +109,44 @@ class ClinicSpecialization(models.Model):
         unique_together = ['clinic', 'specialization']
         verbose_name = 'Спеціалізація клініки'
         verbose_name_plural = 'Спеціалізації клінік'
+
+
+class ClinicOpeningHours(models.Model):
+    WEEKDAY_CHOICES = (
+        (0, 'Понеділок'),
+        (1, 'Вівторок'),
+        (2, 'Середа'),
+        (3, 'Четвер'),
+        (4, 'П\'ятниця'),
+        (5, 'Субота'),
+        (6, 'Неділя'),
+    )
+
+    clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE, related_name='opening_hours')
+    weekday = models.IntegerField(choices=WEEKDAY_CHOICES, verbose_name='День тижня')
+    opens_at = models.TimeField(verbose_name='Відкриття')
+    closes_at = models.TimeField(verbose_name='Закриття')
+    # Minutes since Monday 00:00, so "open at" is a range predicate on an index
+    start_minute = models.PositiveIntegerField(editable=False)
+    end_minute = models.PositiveIntegerField(editable=False)
+
+    def __str__(self):
+        return f"{self.clinic.name} - {self.get_weekday_display()} {self.opens_at:%H:%M}-{self.closes_at:%H:%M}"
+
+    @classmethod
+    def build(cls, clinic, weekday, opens_at, closes_at):
+        start_minute, end_minute = week_range(weekday, opens_at, closes_at)
+        return cls(clinic=clinic, weekday=weekday, opens_at=opens_at, closes_at=closes_at,
+                   start_minute=start_minute, end_minute=end_minute)
+
+    def save(self, *args, **kwargs):
+        self.start_minute, self.end_minute = week_range(self.weekday, self.opens_at, self.closes_at)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        ordering = ['weekday', 'opens_at']
+        indexes = [
+            models.Index(fields=['start_minute', 'end_minute'], name='opening_hours_minute_idx'),
+        ]
+        verbose_name = 'Години роботи'
+        verbose_name_plural = 'Години роботи'
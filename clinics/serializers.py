@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Clinic, ClinicSpecialization
+from .models import Clinic, ClinicOpeningHours, ClinicSpecialization
 
 
 class ClinicSpecializationSerializer(serializers.ModelSerializer):
@@ -10,24 +10,33 @@ class ClinicSpecializationSerializer(serializers.ModelSerializer):
         fields = ['id', 'specialization', 'specialization_display']
 
 
+class ClinicOpeningHoursSerializer(serializers.ModelSerializer):
+    weekday_display = serializers.CharField(source='get_weekday_display', read_only=True)
+
+    class Meta:
+        model = ClinicOpeningHours
+        fields = ['weekday', 'weekday_display', 'opens_at', 'closes_at']
+
+
 class ClinicListSerializer(serializers.ModelSerializer):
     specializations = ClinicSpecializationSerializer(many=True, read_only=True)
 
     class Meta:
         model = Clinic
-        fields = ['id', 'name', 'address', 'city', 'phone', 'rating', 'image',
+        fields = ['id', 'name', 'address', 'city', 'phone', 'rating', 'review_count', 'image',
                   'specializations', 'latitude', 'longitude']
 
 
 class ClinicDetailSerializer(serializers.ModelSerializer):
     specializations = ClinicSpecializationSerializer(many=True, read_only=True)
+    opening_hours = ClinicOpeningHoursSerializer(many=True, read_only=True)
 
     class Meta:
         model = Clinic
         fields = ['id', 'name', 'description', 'address', 'city', 'phone', 'email',
                   'website', 'latitude', 'longitude', 'working_hours_start',
-                  'working_hours_end', 'working_days', 'rating', 'image',
-                  'specializations', 'is_active', 'created_at']
+                  'working_hours_end', 'working_days', 'rating', 'review_count', 'image',
+                  'specializations', 'opening_hours', 'is_active', 'created_at']
 
 
 class ClinicCreateUpdateSerializer(serializers.ModelSerializer):
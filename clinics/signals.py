@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from doctors.models import Doctor
+# Imported first so its rating handlers run before the review receivers below bump the page
+import reviews.signals  # noqa: F401
+from reviews.models import ClinicReview, DoctorReview
+from services.models import Service
+from vet_booking.cache import invalidate, watch_models
+
+from .models import Clinic, ClinicOpeningHours, ClinicSpecialization
+
+watch_models(Clinic, ClinicSpecialization, ClinicOpeningHours)
+
+
+def clinic_cache(clinic_id):
+    """Namespace of everything cached about one clinic's page"""
+    return f'clinic:{clinic_id}'
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+def clinic_changed(sender, instance, **kwargs):
+    invalidate(clinic_cache(instance.pk))
+
+
+@receiver(post_save, sender=ClinicSpecialization)
+@receiver(post_delete, sender=ClinicSpecialization)
+@receiver(post_save, sender=ClinicOpeningHours)
+@receiver(post_delete, sender=ClinicOpeningHours)
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=ClinicReview)
+@receiver(post_delete, sender=ClinicReview)
+def clinic_part_changed(sender, instance, **kwargs):
+    invalidate(clinic_cache(instance.clinic_id))
+
+
+@receiver(pre_save, sender=Doctor)
+@receiver(pre_save, sender=Service)
+def clinic_part_moving(sender, instance, **kwargs):
+    # Moving a doctor or service to another clinic also changes the page it leaves
+    if instance.pk is None:
+        return
+    old_clinic_id = sender.objects.filter(pk=instance.pk).values_list('clinic_id', flat=True).first()
+    if old_clinic_id is not None and old_clinic_id != instance.clinic_id:
+        invalidate(clinic_cache(old_clinic_id))
+
+
+@receiver(post_save, sender=DoctorReview)
+@receiver(post_delete, sender=DoctorReview)
+def doctor_review_changed(sender, instance, **kwargs):
+    # Doctor ratings shown on the clinic page are updated without a Doctor save
+    clinic_id = Doctor.objects.filter(pk=instance.doctor_id).values_list('clinic_id', flat=True).first()
+    if clinic_id is not None:
+        invalidate(clinic_cache(clinic_id))
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from clinics.models import Clinic, ClinicOpeningHours, ClinicSpecialization
+from clinics.geo import bounding_box, geohash, haversine_km
+from clinics.hours import parse_working_days
+from reviews.models import ClinicReview, DoctorReview
+from services.models import Service
 
-# Create your tests here.
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+
+    return APIClient()
+
+
+class TestGeo:
+
+
+    def test_haversine_kyiv_to_lviv(self):
+
+        assert 465 < haversine_km(50.4501, 30.5234, 49.8397, 24.0297) < 470
+
+    def test_bounding_box_contains_radius(self):
+
+        min_lat, max_lat, min_lng, max_lng = bounding_box(50.45, 30.52, 10)
+
+        assert haversine_km(50.45, 30.52, max_lat, 30.52) == pytest.approx(10, rel=1e-3)
+        assert haversine_km(50.45, 30.52, 50.45, max_lng) >= 10
+        assert min_lat < 50.45 < max_lat and min_lng < 30.52 < max_lng
+
+    def test_geohash_prefix_is_shared_by_neighbours(self):
+
+        assert geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+        assert geohash(50.4501, 30.5234)[:5] == geohash(50.4547, 30.5238)[:5]
+        assert geohash(50.4501, 30.5234)[:3] != geohash(49.8397, 24.0297)[:3]
+
+
+@pytest.mark.django_db
+class TestNearbyClinics:
+
+
+    def test_nearby_ranks_by_distance_within_radius(self, make_clinic, api_client, django_assert_max_num_queries):
+
+        far = make_clinic('Far', latitude=50.52, longitude=30.60)
+        near = make_clinic('Near', latitude=50.451, longitude=30.524)
+        make_clinic('Lviv', latitude=49.8397, longitude=24.0297, city='Lviv')
+        make_clinic('Closed', latitude=50.4502, longitude=30.5235, is_active=False)
+        ClinicSpecialization.objects.create(clinic=near, specialization='surgery')
+
+        with django_assert_max_num_queries(3):
+            response = api_client.get('/api/clinics/nearby/', {'lat': 50.4501, 'lng': 30.5234, 'radius_km': 15})
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [row['id'] for row in results] == [near.id, far.id]
+        assert results[0]['distance_km'] < 0.2
+        assert 9 < results[1]['distance_km'] < 15
+        assert results[0]['specializations'][0]['specialization'] == 'surgery'
+
+    def test_nearby_respects_limit(self, make_clinic, api_client):
+
+        for number in range(5):
+            make_clinic(f'Clinic {number}', latitude=50.45 + number / 1000, longitude=30.52)
+
+        response = api_client.get('/api/clinics/nearby/', {'lat': 50.45, 'lng': 30.52, 'limit': 2})
+
+        assert [row['name'] for row in response.data['results']] == ['Clinic 0', 'Clinic 1']
+
+    def test_nearby_requires_coordinates(self, api_client):
+
+        assert api_client.get('/api/clinics/nearby/').status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/clinics/nearby/', {'lat': 95, 'lng': 30}).status_code == \
+            status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/clinics/nearby/', {'lat': 50, 'lng': 30, 'radius_km': 'nan'}).status_code == \
+            status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestClinicMap:
+
+
+    def test_low_zoom_clusters_by_grid_cell(self, make_clinic, api_client):
+
+        make_clinic('Kyiv 1', latitude=50.4501, longitude=30.5234)
+        make_clinic('Kyiv 2', latitude=50.4547, longitude=30.5238)
+        lviv = make_clinic('Lviv', latitude=49.8397, longitude=24.0297, city='Lviv')
+
+        response = api_client.get('/api/clinics/map/', {'bbox': '22,44,40,53', 'zoom': 6})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['type'] == 'FeatureCollection'
+        features = sorted(response.data['features'], key=lambda feature: feature['geometry']['coordinates'][0])
+        assert features[0]['properties'] == {'id': lviv.id, 'name': 'Lviv'}
+        assert features[0]['geometry']['coordinates'] == [24.0297, 49.8397]
+        assert features[1]['properties'] == {'cluster': True, 'count': 2}
+        assert features[1]['geometry']['coordinates'] == [30.5236, 50.4524]
+
+    def test_high_zoom_returns_clinics_inside_bbox(self, make_clinic, api_client):
+
+        inside = make_clinic('Inside', latitude=50.4501, longitude=30.5234)
+        make_clinic('Outside', latitude=50.52, longitude=30.60)
+        make_clinic('Closed', latitude=50.4502, longitude=30.5235, is_active=False)
+
+        response = api_client.get('/api/clinics/map/', {'bbox': '30.50,50.44,30.55,50.46', 'zoom': 17})
+
+        assert [feature['properties'] for feature in response.data['features']] == [{'id': inside.id, 'name': 'Inside'}]
+
+    def test_map_is_cached_until_a_clinic_changes(self, make_clinic, api_client, django_assert_num_queries):
+
+        clinic = make_clinic('Clinic', latitude=50.4501, longitude=30.5234)
+        params = {'bbox': '30,50,31,51', 'zoom': 17}
+        api_client.get('/api/clinics/map/', params)
+
+        with django_assert_num_queries(0):
+            api_client.get('/api/clinics/map/', params)
+
+        clinic.latitude = 50.9
+        clinic.save()
+        response = api_client.get('/api/clinics/map/', params)
+
+        assert response.data['features'][0]['geometry']['coordinates'] == [30.5234, 50.9]
+        assert Clinic.objects.get().geohash == geohash(50.9, 30.5234)
+
+    def test_map_rejects_bad_bbox(self, api_client):
+
+        assert api_client.get('/api/clinics/map/', {'bbox': '1,2,3'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/clinics/map/', {'zoom': 40}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/clinics/map/', {'bbox': 'nan,0,1,1'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/clinics/map/', {'bbox': '0,0,inf,1'}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestOpeningHours:
+
+
+    def test_parse_working_days(self):
+
+        assert parse_working_days('Пн-Пт') == [0, 1, 2, 3, 4]
+        assert parse_working_days('пн-пт, Сб') == [0, 1, 2, 3, 4, 5]
+        assert parse_working_days('Пт–Пн') == [0, 4, 5, 6]
+        assert parse_working_days('Щодня') == list(range(7))
+        with pytest.raises(ValueError):
+            parse_working_days('Mon-Fri')
+
+    def test_hours_follow_working_days(self, make_clinic):
+
+        clinic = make_clinic('Clinic', working_days='Пн-Сб')
+        assert list(clinic.opening_hours.values_list('weekday', flat=True)) == [0, 1, 2, 3, 4, 5]
+
+        ClinicOpeningHours.objects.filter(clinic=clinic, weekday=5).update(closes_at='14:00')
+        clinic = Clinic.objects.get(pk=clinic.pk)
+        clinic.name = 'Renamed'
+        clinic.save()
+        assert clinic.opening_hours.get(weekday=5).closes_at.hour == 14
+
+        clinic.working_days = 'Пн-Пт'
+        clinic.save()
+        assert clinic.opening_hours.count() == 5
+
+    def test_open_at_filter(self, make_clinic, api_client):
+
+        weekdays = make_clinic('Weekdays')
+        saturday = make_clinic('Saturday', working_days='Сб', working_hours_start='10:00', working_hours_end='14:00')
+        night = make_clinic('Night', working_days='Нд', working_hours_start='22:00', working_hours_end='02:00')
+
+        def open_at(moment):
+            response = api_client.get('/api/clinics/', {'open_at': moment})
+            return {row['id'] for row in response.data['results']}
+
+        # 2024-01-01 is a Monday
+        assert open_at('2024-01-01T09:30:00+02:00') == {weekdays.id}
+        assert open_at('2024-01-06T13:59:00+02:00') == {saturday.id}
+        assert open_at('2024-01-06T14:00:00+02:00') == set()
+        assert open_at('2024-01-07T23:00:00+02:00') == {night.id}
+        assert open_at('2024-01-08T01:30:00+02:00') == {night.id}
+
+    def test_open_now_and_open_on_filters(self, make_clinic, api_client):
+
+        always = make_clinic('Always', working_days='Щодня', working_hours_start='00:00', working_hours_end='00:00')
+        make_clinic('Unknown', working_days='за домовленістю')
+        saturday = make_clinic('Saturday', working_days='Сб')
+
+        open_now = api_client.get('/api/clinics/', {'open_now': 'true'}).data['results']
+        open_on = api_client.get('/api/clinics/', {'open_on': 5}).data['results']
+
+        assert [row['id'] for row in open_now] == [always.id]
+        assert {row['id'] for row in open_on} == {always.id, saturday.id}
+
+
+@pytest.mark.django_db
+class TestClinicBundle:
+
+
+    def test_bundle_has_everything_the_page_shows(self, make_clinic, make_doctor, api_client,
+                                                  django_assert_num_queries):
+
+        clinic = make_clinic('Clinic')
+        ClinicSpecialization.objects.create(clinic=clinic, specialization='surgery')
+        doctor = make_doctor(clinic, 'doe')
+        make_doctor(clinic, 'away', is_available=False)
+        Service.objects.create(clinic=clinic, name='Checkup', service_type='consultation', description='Checkup',
+                               price=300, duration_minutes=30)
+        for number in range(7):
+            ClinicReview.objects.create(clinic=clinic, user=User.objects.create(username=f'user{number}'),
+                                        rating=4, comment=f'Review {number}')
+
+        with django_assert_num_queries(6):
+            response = api_client.get(f'/api/clinics/{clinic.id}/bundle/')
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.data
+        assert data['clinic']['name'] == 'Clinic'
+        assert data['clinic']['specializations'][0]['specialization'] == 'surgery'
+        assert len(data['clinic']['opening_hours']) == 5
+        assert [row['id'] for row in data['doctors']] == [doctor.id]
+        assert data['doctors'][0]['clinic_name'] == 'Clinic'
+        assert [row['name'] for row in data['services']] == ['Checkup']
+        assert data['reviews']['count'] == 7
+        assert data['reviews']['histogram'][4] == 7
+        assert [row['comment'] for row in data['reviews']['latest']][0] == 'Review 6'
+        assert len(data['reviews']['latest']) == 5
+
+    def test_bundle_is_cached_until_its_parts_change(self, make_clinic, make_doctor, api_client,
+                                                     django_assert_num_queries):
+
+        clinic = make_clinic('Clinic')
+        other = make_clinic('Other')
+        doctor = make_doctor(clinic, 'doe')
+        url = f'/api/clinics/{clinic.id}/bundle/'
+        api_client.get(url)
+
+        with django_assert_num_queries(0):
+            api_client.get(url)
+
+        Service.objects.create(clinic=other, name='Elsewhere', service_type='consultation', description='Other',
+                               price=100, duration_minutes=15)
+        with django_assert_num_queries(0):
+            api_client.get(url)
+
+        DoctorReview.objects.create(doctor=doctor, user=User.objects.create(username='author'), rating=5,
+                                    comment='Great')
+        assert api_client.get(url).data['doctors'][0]['review_count'] == 1
+
+        doctor.clinic = other
+        doctor.save()
+        assert api_client.get(url).data['doctors'] == []
+
+    def test_bundle_url_variants_share_invalidation(self, make_clinic, make_doctor, api_client):
+
+        clinic = make_clinic('Clinic')
+        url = f'/api/clinics/0{clinic.id}/bundle/'
+        api_client.get(url)
+
+        make_doctor(clinic, 'doe')
+
+        assert len(api_client.get(url).data['doctors']) == 1
+
+    def test_bundle_of_missing_clinic(self, make_clinic, api_client):
+
+        closed = make_clinic('Closed', is_active=False)
+
+        assert api_client.get(f'/api/clinics/{closed.id}/bundle/').status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get('/api/clinics/abc/bundle/').status_code == status.HTTP_404_NOT_FOUND
@@ -1,11 +1,38 @@
-from rest_framework import viewsets, filters
+import math
+
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Clinic
+from django.core.cache import cache
+from django.db.models import Avg, Count, Min, Prefetch
+from django.db.models.functions import Substr
+from doctors.models import Doctor
+from doctors.serializers import DoctorListSerializer
+from reviews.models import ClinicReview
+from reviews.serializers import ClinicReviewSerializer
+from reviews.views import ReviewSummaryMixin
+from services.models import Service
+from services.serializers import ServiceSerializer
+from vet_booking.cache import CachedReadMixin, models_version, versioned_key
+from vet_booking.facets import Facet, FacetsMixin
+from .filters import ClinicFilter
+from .geo import bounding_box, cluster_precision, nearest
+from .models import Clinic, ClinicOpeningHours, ClinicSpecialization
 from .serializers import ClinicListSerializer, ClinicDetailSerializer
-from django.http import JsonResponse
+from .signals import clinic_cache
+from django.http import Http404, JsonResponse
 from django.conf import settings
 from django.views.decorators.http import require_GET
 
+def _feature(latitude, longitude, **properties):
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(float(longitude), 5), round(float(latitude), 5)]},
+        'properties': properties,
+    }
+
+
 @require_GET
 def get_google_maps_key(request):
 
@@ -13,15 +40,148 @@ def get_google_maps_key(request):
         'apiKey': settings.GOOGLE_MAPS_API_KEY
     })
 
-class ClinicViewSet(viewsets.ModelViewSet):
-    queryset = Clinic.objects.filter(is_active=True)
+class ClinicViewSet(CachedReadMixin, FacetsMixin, ReviewSummaryMixin, viewsets.ModelViewSet):
+    queryset = Clinic.objects.filter(is_active=True).prefetch_related('specializations')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['city']
+    filterset_class = ClinicFilter
     search_fields = ['name', 'city', 'address']
     ordering_fields = ['rating', 'name']
     ordering = ['-rating']
+    review_model = ClinicReview
+    review_serializer_class = ClinicReviewSerializer
+    # Reviews change the ratings through UPDATEs that send no Clinic signals
+    cache_models = (Clinic, ClinicSpecialization, ClinicOpeningHours, ClinicReview)
+    uncached_params = ('open_now',)
+    facets = {
+        'city': Facet('city'),
+        'specialization': Facet('specializations__specialization', ClinicSpecialization.SPECIALIZATION_CHOICES),
+    }
+    nearby_default_radius_km = 10
+    nearby_max_radius_km = 200
+    nearby_default_limit = 10
+    nearby_max_limit = 50
+    map_max_zoom = 22
+    bundle_latest_reviews = 5
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('opening_hours')
+        elif self.action == 'bundle':
+            queryset = queryset.select_related('review_summary').prefetch_related(
+                'opening_hours',
+                Prefetch('doctors', queryset=Doctor.objects.filter(is_available=True).order_by('-rating', 'id')),
+                Prefetch('services',
+                         queryset=Service.objects.filter(is_available=True).order_by('service_type', 'price')),
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
             return ClinicListSerializer
         return ClinicDetailSerializer
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        params = request.query_params
+        try:
+            lat = float(params['lat'])
+            lng = float(params['lng'])
+            radius_km = float(params.get('radius_km', self.nearby_default_radius_km))
+            limit = int(params.get('limit', self.nearby_default_limit))
+        except (KeyError, ValueError):
+            return Response({'detail': 'Вкажіть коректні lat та lng.'}, status=status.HTTP_400_BAD_REQUEST)
+        # NaN slips past `radius_km <= 0`, so non-finite values are rejected first
+        if not all(map(math.isfinite, (lat, lng, radius_km))) \
+                or not (-90 <= lat <= 90 and -180 <= lng <= 180) or radius_km <= 0:
+            return Response({'detail': 'Вкажіть коректні lat та lng.'}, status=status.HTTP_400_BAD_REQUEST)
+        radius_km = min(radius_km, self.nearby_max_radius_km)
+        limit = min(max(limit, 1), self.nearby_max_limit)
+
+        # Indexed bounding-box prefilter, then exact distances over the candidates only
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        candidates = self.filter_queryset(self.get_queryset()).filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lng, max_lng)
+        ).order_by().values_list('id', 'latitude', 'longitude')
+        ranked = nearest(((pk, float(a), float(b)) for pk, a, b in candidates), lat, lng, radius_km, limit)
+
+        clinics = self.get_queryset().in_bulk([pk for _, pk in ranked])
+        context = self.get_serializer_context()
+        return Response({
+            'results': [
+                {**ClinicListSerializer(clinics[pk], context=context).data, 'distance_km': round(distance, 3)}
+                for distance, pk in ranked
+            ],
+        })
+
+    @action(detail=False, methods=['get'], url_path='map')
+    def map(self, request):
+        params = request.query_params
+        try:
+            zoom = int(params.get('zoom', 0))
+            bbox = [float(value) for value in params.get('bbox', '-180,-90,180,90').split(',')]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4 or not all(map(math.isfinite, bbox)) or not 0 <= zoom <= self.map_max_zoom:
+            return Response({'detail': 'Вкажіть bbox як min_lng,min_lat,max_lng,max_lat та zoom від 0 до 22.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        min_lng, min_lat, max_lng, max_lat = bbox
+
+        key = ':'.join(['clinic-map', models_version((Clinic,)), str(zoom), *(f'{value:.5f}' for value in bbox)])
+        data = cache.get(key)
+        if data is None:
+            features = self._map_features(min_lng, min_lat, max_lng, max_lat, zoom)
+            data = {'type': 'FeatureCollection', 'features': features}
+            cache.set(key, data, settings.CLINIC_MAP_CACHE_SECONDS)
+        return Response(data)
+
+    def _map_features(self, min_lng, min_lat, max_lng, max_lat, zoom):
+        clinics = Clinic.objects.filter(is_active=True, latitude__range=(min_lat, max_lat))
+        if min_lng <= max_lng:
+            clinics = clinics.filter(longitude__range=(min_lng, max_lng))
+        else:
+            # The viewport crosses the antimeridian
+            clinics = clinics.exclude(longitude__gt=max_lng, longitude__lt=min_lng)
+
+        precision = cluster_precision(zoom)
+        if precision is None:
+            rows = clinics.order_by('id').values_list('id', 'name', 'latitude', 'longitude')
+            return [_feature(latitude, longitude, id=pk, name=name) for pk, name, latitude, longitude in rows]
+
+        # One row per grid cell; for a cell holding a single clinic Min() is that clinic
+        cells = (
+            clinics
+            .annotate(cell=Substr('geohash', 1, precision))
+            .values('cell')
+            .annotate(count=Count('id'), lat=Avg('latitude'), lng=Avg('longitude'), pk=Min('id'), name=Min('name'))
+            .order_by('cell')
+        )
+        return [
+            _feature(cell['lat'], cell['lng'], id=cell['pk'], name=cell['name']) if cell['count'] == 1
+            else _feature(cell['lat'], cell['lng'], cluster=True, count=cell['count'])
+            for cell in cells
+        ]
+
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """Everything the clinic page shows, in one cached response"""
+        # Keyed on the int the signals bump, so '01' and '1' share one entry
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise Http404
+        key = versioned_key(clinic_cache(pk), 'bundle')
+        data = cache.get(key)
+        if data is None:
+            clinic = self.get_object()
+            # Serialized without the request so cached image URLs do not depend on who asked first
+            context = {'view': self}
+            data = {
+                'clinic': ClinicDetailSerializer(clinic, context=context).data,
+                'doctors': DoctorListSerializer(clinic.doctors.all(), many=True, context=context).data,
+                'services': ServiceSerializer(clinic.services.all(), many=True, context=context).data,
+                'reviews': self.review_summary_data(clinic, self.bundle_latest_reviews, context),
+            }
+            cache.set(key, data, settings.CLINIC_BUNDLE_CACHE_SECONDS)
+        return Response(data)
@@ -0,0 +1,58 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from clinics.models import Clinic
+from doctors.models import Doctor
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+
+    # Cached responses and version counters outlive the rolled-back test data
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_clinic(db):
+    """Creates an active clinic in Kyiv; keyword arguments override any field"""
+
+    def make(name, city='Kyiv', **fields):
+        return Clinic.objects.create(**{
+            'name': name,
+            'description': 'Description',
+            'address': 'Street 1',
+            'city': city,
+            'phone': '+380501234567',
+            'email': 'clinic@test.com',
+            'latitude': 50.45,
+            'longitude': 30.52,
+            'working_hours_start': '09:00',
+            'working_hours_end': '18:00',
+            **fields
+        })
+
+    return make
+
+
+@pytest.fixture
+def make_doctor(db):
+    """Creates an available doctor named after `username`; keyword arguments override any field"""
+
+    def make(clinic, username, specialization='general', **fields):
+        return Doctor.objects.create(**{
+            'user': get_user_model().objects.create(username=username, role='doctor'),
+            'clinic': clinic,
+            'first_name': 'John',
+            'last_name': username,
+            'specialization': specialization,
+            'experience_years': 5,
+            'education': 'University',
+            'bio': 'Bio',
+            'phone': '+380507654321',
+            'email': f'{username}@test.com',
+            **fields
+        })
+
+    return make
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сума оцінок'),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість відгуків'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['-rating', 'last_name'], name='doctor_rating_idx'),
+        ),
+    ]
@@ -37,6 +37,9 @@ class Doctor(models.Model):
         validators=[MinValueValidator(0.0), MaxValueValidator(5.0)],
         verbose_name='Рейтинг'
     )
+    # Running totals kept in step with reviews; rating = rating_sum / review_count
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name='Сума оцінок')
+    review_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість відгуків')
 
     is_available = models.BooleanField(default=True, verbose_name='Доступний')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -51,6 +54,7 @@ class Doctor(models.Model):
 
     class Meta:
         ordering = ['-rating', 'last_name']
+        indexes = [models.Index(fields=['-rating', 'last_name'], name='doctor_rating_idx')]
         verbose_name = 'Лікар'
         verbose_name_plural = 'Лікарі'
 
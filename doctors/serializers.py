@@ -18,7 +18,7 @@ class DoctorListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Doctor
         fields = ['id', 'first_name', 'last_name', 'full_name', 'specialization',
-                  'specialization_display', 'experience_years', 'rating', 'photo',
+                  'specialization_display', 'experience_years', 'rating', 'review_count', 'photo',
                   'clinic_name', 'is_available']
 
 
@@ -31,7 +31,7 @@ class DoctorDetailSerializer(serializers.ModelSerializer):
         model = Doctor
         fields = ['id', 'first_name', 'last_name', 'full_name', 'specialization',
                   'specialization_display', 'experience_years', 'education', 'bio',
-                  'photo', 'phone', 'email', 'rating', 'clinic', 'schedules',
+                  'photo', 'phone', 'email', 'rating', 'review_count', 'clinic', 'schedules',
                   'is_available', 'created_at']
 
 
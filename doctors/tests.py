@@ -1,3 +1,239 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.utils import timezone
+from datetime import timedelta
+from doctors.models import DoctorSchedule
+from services.models import Service
+from appointments.models import Appointment
 
-# Create your tests here.
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+
+    return APIClient()
+
+
+@pytest.fixture
+def clinic(make_clinic):
+
+    return make_clinic('Test Clinic')
+
+
+@pytest.fixture
+def doctor(clinic, make_doctor):
+
+    return make_doctor(clinic, 'doctor')
+
+
+@pytest.fixture
+def surgery(db, clinic):
+
+    return Service.objects.create(
+        clinic=clinic,
+        name='Surgery',
+        service_type='surgery',
+        description='Surgery',
+        price=3000,
+        duration_minutes=90
+    )
+
+
+@pytest.fixture
+def next_monday():
+
+    today = timezone.localdate()
+    return today + timedelta(days=7 - today.weekday())
+
+
+@pytest.fixture
+def schedule(db, doctor):
+
+    return DoctorSchedule.objects.create(
+        doctor=doctor,
+        weekday=0,
+        start_time='09:00',
+        end_time='13:00'
+    )
+
+
+@pytest.mark.django_db
+class TestDoctorAvailability:
+
+
+    def test_availability_lists_slots_within_schedule(self, api_client, doctor, schedule, next_monday):
+
+        response = api_client.get(
+            f'/api/doctors/{doctor.id}/availability/',
+            {'from': str(next_monday), 'to': str(next_monday)}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['duration_minutes'] == 30
+        slots = response.data['days'][0]['slots']
+        assert slots[0] == '09:00'
+        assert slots[-1] == '12:30'
+        assert len(slots) == 15
+
+    def test_availability_respects_appointment_duration(self, api_client, doctor, schedule,
+                                                        surgery, next_monday):
+
+        client_user = User.objects.create_user(username='client', password='pass')
+        Appointment.objects.create(
+            user=client_user,
+            doctor=doctor,
+            service=surgery,
+            appointment_date=next_monday,
+            appointment_time='10:00'
+        )
+        Appointment.objects.create(
+            user=client_user,
+            doctor=doctor,
+            service=surgery,
+            appointment_date=next_monday,
+            appointment_time='09:00',
+            status='cancelled'
+        )
+
+        response = api_client.get(
+            f'/api/doctors/{doctor.id}/availability/',
+            {'from': str(next_monday), 'to': str(next_monday)}
+        )
+
+        slots = response.data['days'][0]['slots']
+        assert '09:30' in slots
+        assert '09:45' not in slots
+        assert '11:15' not in slots
+        assert '11:30' in slots
+
+    def test_availability_uses_service_duration(self, api_client, doctor, schedule, surgery, next_monday):
+
+        response = api_client.get(
+            f'/api/doctors/{doctor.id}/availability/',
+            {'from': str(next_monday), 'to': str(next_monday), 'service': surgery.id}
+        )
+
+        assert response.data['duration_minutes'] == 90
+        assert response.data['days'][0]['slots'][-1] == '11:30'
+
+    def test_availability_query_count_is_constant(self, api_client, doctor, schedule, surgery,
+                                                  next_monday, django_assert_max_num_queries):
+
+        client_user = User.objects.create_user(username='client', password='pass')
+        for week in range(2):
+            for hour in (9, 11):
+                Appointment.objects.create(
+                    user=client_user,
+                    doctor=doctor,
+                    service=surgery,
+                    appointment_date=next_monday + timedelta(weeks=week),
+                    appointment_time=f'{hour:02d}:00'
+                )
+
+        with django_assert_max_num_queries(5):
+            response = api_client.get(
+                f'/api/doctors/{doctor.id}/availability/',
+                {'from': str(next_monday), 'to': str(next_monday + timedelta(days=13)),
+                 'service': surgery.id}
+            )
+
+        assert len(response.data['days']) == 14
+        assert response.data['days'][0]['slots'] == []
+
+    def test_availability_rejects_invalid_range(self, api_client, doctor, next_monday):
+
+        response = api_client.get(
+            f'/api/doctors/{doctor.id}/availability/',
+            {'from': str(next_monday), 'to': str(next_monday - timedelta(days=1))}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('params', [
+        {'from': '2026-02-30'},
+        {'from': '9999-12-31'},
+        {'from': '2026-03-01', 'to': '2026-13-01'},
+    ])
+    def test_availability_rejects_impossible_dates(self, api_client, doctor, params):
+
+        response = api_client.get(f'/api/doctors/{doctor.id}/availability/', params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['detail'] == 'Невірний формат дати.'
+
+    def test_availability_up_to_the_last_date(self, api_client, doctor):
+
+        response = api_client.get(f'/api/doctors/{doctor.id}/availability/',
+                                  {'from': '9999-12-30', 'to': '9999-12-31'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['days']) == 2
+
+
+@pytest.mark.django_db
+class TestDoctorAgenda:
+
+
+    def test_agenda_returns_flat_day_rows(self, api_client, doctor, surgery, next_monday,
+                                          django_assert_max_num_queries):
+
+        patient = User.objects.create_user(username='patient', password='pass',
+                                           first_name='Olena', last_name='Koval')
+        for hour in (9, 11, 14):
+            Appointment.objects.create(user=patient, doctor=doctor, service=surgery,
+                                       appointment_date=next_monday, appointment_time=f'{hour:02d}:00')
+        Appointment.objects.create(user=patient, doctor=doctor, appointment_date=next_monday,
+                                   appointment_time='16:00', status='cancelled')
+        Appointment.objects.create(user=patient, doctor=doctor,
+                                   appointment_date=next_monday + timedelta(days=1), appointment_time='09:00')
+        api_client.force_authenticate(user=doctor.user)
+
+        with django_assert_max_num_queries(1):
+            response = api_client.get('/api/doctors/me/agenda/', {'date': str(next_monday)})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['time'] for row in response.data] == ['09:00', '11:00', '14:00']
+        assert response.data[0]['patient'] == 'Olena Koval'
+        assert response.data[0]['service'] == 'Surgery'
+        assert response.data[0]['duration_minutes'] == 90
+        assert response.data[0]['end_time'] == '10:30'
+
+    def test_agenda_week_covers_monday_to_sunday(self, api_client, doctor, next_monday):
+
+        patient = User.objects.create_user(username='patient', password='pass')
+        for offset in (0, 6, 7):
+            Appointment.objects.create(user=patient, doctor=doctor,
+                                       appointment_date=next_monday + timedelta(days=offset),
+                                       appointment_time='10:00')
+        api_client.force_authenticate(user=doctor.user)
+
+        response = api_client.get('/api/doctors/me/agenda/week/', {'date': str(next_monday + timedelta(days=3))})
+
+        assert [row['date'] for row in response.data] == [next_monday, next_monday + timedelta(days=6)]
+        assert response.data[0]['patient'] == 'patient'
+        assert response.data[0]['duration_minutes'] == 30
+
+    @pytest.mark.parametrize('url, day', [
+        ('/api/doctors/me/agenda/', '2026-13-01'),
+        ('/api/doctors/me/agenda/week/', '2026-02-30'),
+        ('/api/doctors/me/agenda/week/', '9999-12-31'),
+    ])
+    def test_agenda_rejects_impossible_dates(self, api_client, doctor, url, day):
+
+        api_client.force_authenticate(user=doctor.user)
+
+        response = api_client.get(url, {'date': day})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_agenda_is_for_doctors_only(self, api_client, doctor):
+
+        patient = User.objects.create_user(username='patient', password='pass')
+        api_client.force_authenticate(user=patient)
+
+        response = api_client.get('/api/doctors/me/agenda/')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -1,20 +1,52 @@
+import datetime
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Doctor, FavoriteDoctor
+from appointments.availability import DEFAULT_DURATION_MINUTES, doctor_availability
+from appointments.models import Appointment
+from reviews.models import ClinicReview, DoctorReview
+from reviews.serializers import DoctorReviewSerializer
+from reviews.views import ReviewSummaryMixin
+from services.models import Service
+from vet_booking.cache import CachedReadMixin
+from vet_booking.dates import parse_query_date
+from vet_booking.facets import Facet, FacetsMixin
+from clinics.models import Clinic, ClinicSpecialization
+from .models import Doctor, DoctorSchedule, FavoriteDoctor
 from .serializers import (DoctorListSerializer, DoctorDetailSerializer,
                           FavoriteDoctorSerializer)
 
 
-class DoctorViewSet(viewsets.ModelViewSet):
-    queryset = Doctor.objects.filter(is_available=True)
+AVAILABILITY_DEFAULT_DAYS = 14
+AVAILABILITY_MAX_DAYS = 31
+
+
+class DoctorViewSet(CachedReadMixin, FacetsMixin, ReviewSummaryMixin, viewsets.ModelViewSet):
+    queryset = Doctor.objects.filter(is_available=True).select_related('clinic')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['specialization', 'clinic']
     search_fields = ['first_name', 'last_name', 'specialization']
     ordering_fields = ['rating', 'experience_years']
     ordering = ['-rating']
+    review_model = DoctorReview
+    review_serializer_class = DoctorReviewSerializer
+    cache_models = (Doctor, DoctorSchedule, Clinic, ClinicSpecialization, DoctorReview, ClinicReview)
+    facets = {
+        'specialization': Facet('specialization', Doctor.SPECIALIZATION_CHOICES),
+        'clinic': Facet('clinic', 'clinic__name'),
+        'city': Facet('clinic__city'),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('schedules', 'clinic__specializations')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -43,10 +75,104 @@ class DoctorViewSet(viewsets.ModelViewSet):
             return Response({'status': 'removed from favorites'}, status=status.HTTP_204_NO_CONTENT)
         return Response({'status': 'not in favorites'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        doctor = self.get_object()
+        params = request.query_params
+
+        try:
+            date_from = parse_query_date(params.get('from'))
+            date_to = (parse_query_date(params['to']) if params.get('to')
+                       else date_from + datetime.timedelta(days=AVAILABILITY_DEFAULT_DAYS - 1))
+        except (ValueError, OverflowError):
+            return Response({'detail': 'Невірний формат дати.'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_to < date_from or (date_to - date_from).days >= AVAILABILITY_MAX_DAYS:
+            return Response(
+                {'detail': f'Період має бути від 1 до {AVAILABILITY_MAX_DAYS} днів.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        service = None
+        duration = DEFAULT_DURATION_MINUTES
+        if params.get('service'):
+            if params['service'].isdigit():
+                service = Service.objects.filter(pk=params['service']).only('duration_minutes').first()
+            if service is None:
+                return Response({'detail': 'Послугу не знайдено.'}, status=status.HTTP_400_BAD_REQUEST)
+            duration = service.duration_minutes
+
+        days = doctor_availability(doctor.id, date_from, date_to, duration, user=request.user)
+
+        return Response({
+            'doctor': doctor.id,
+            'service': service.id if service else None,
+            'duration_minutes': duration,
+            'from': date_from,
+            'to': date_to,
+            'days': [
+                {'date': day, 'slots': [slot.strftime('%H:%M') for slot in slots]}
+                for day, slots in days
+            ],
+        })
+
+
+    def _agenda(self, request, date_from, date_to):
+        if request.user.role != 'doctor':
+            return Response({'detail': 'Недостатньо прав.'}, status=status.HTTP_403_FORBIDDEN)
+
+        rows = (
+            Appointment.objects
+            .filter(doctor__user=request.user, appointment_date__range=(date_from, date_to))
+            .exclude(status='cancelled')
+            .order_by('appointment_date', 'appointment_time')
+            .values('id', 'appointment_date', 'appointment_time', 'end_time', 'status', 'notes',
+                    'user__first_name', 'user__last_name', 'user__username', 'user__phone',
+                    'service__name')
+            .annotate(duration_minutes=Coalesce('service__duration_minutes', Value(DEFAULT_DURATION_MINUTES)))
+        )
+
+        return Response([
+            {
+                'id': row['id'],
+                'date': row['appointment_date'],
+                'time': row['appointment_time'].strftime('%H:%M'),
+                'end_time': row['end_time'].strftime('%H:%M') if row['end_time'] else None,
+                'patient': (f"{row['user__first_name']} {row['user__last_name']}".strip()
+                            or row['user__username']),
+                'phone': row['user__phone'],
+                'service': row['service__name'],
+                'duration_minutes': row['duration_minutes'],
+                'status': row['status'],
+                'notes': row['notes'],
+            }
+            for row in rows
+        ])
+
+    @action(detail=False, methods=['get'], url_path='me/agenda', permission_classes=[IsAuthenticated])
+    def agenda(self, request):
+        try:
+            day = parse_query_date(request.query_params.get('date'))
+        except ValueError:
+            return Response({'detail': 'Невірний формат дати.'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._agenda(request, day, day)
+
+    @action(detail=False, methods=['get'], url_path='me/agenda/week', permission_classes=[IsAuthenticated])
+    def agenda_week(self, request):
+        try:
+            day = parse_query_date(request.query_params.get('date'))
+            monday = day - datetime.timedelta(days=day.weekday())
+            sunday = monday + datetime.timedelta(days=6)
+        except (ValueError, OverflowError):
+            return Response({'detail': 'Невірний формат дати.'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._agenda(request, monday, sunday)
+
 
 class FavoriteDoctorViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = FavoriteDoctorSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return FavoriteDoctor.objects.filter(user=self.request.user)
\ No newline at end of file
+        return (FavoriteDoctor.objects
+                .filter(user=self.request.user)
+                .select_related('doctor__clinic')
+                .order_by('-created_at'))
\ No newline at end of file
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild doctor and clinic ratings and review counts from the reviews tables'
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings()
+        self.stdout.write(f"doctors: {updated['doctor']}, clinics: {updated['clinic']}")
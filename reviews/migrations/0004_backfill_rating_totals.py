@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+
+
+def backfill_rating_totals(apps, schema_editor):
+    average = Case(
+        When(review_count=0, then=Value(0.0)),
+        default=Round(Cast(F('rating_sum'), FloatField()) / F('review_count'), 2),
+        output_field=FloatField()
+    )
+    for target, review_name in (('doctors.Doctor', 'reviews.DoctorReview'), ('clinics.Clinic', 'reviews.ClinicReview')):
+        model = apps.get_model(target)
+        field = model._meta.model_name
+        reviews = apps.get_model(review_name).objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        model.objects.update(
+            rating_sum=Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total'),
+                                         output_field=IntegerField()), 0),
+            review_count=Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total'),
+                                           output_field=IntegerField()), 0),
+        )
+        # Objects without reviews keep the rating they were given by hand
+        model.objects.filter(review_count__gt=0).update(rating=average)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_alter_clinicreview_options_and_more'),
+        ('doctors', '0003_rating_totals'),
+        ('clinics', '0002_rating_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:53
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def backfill_summaries(apps, schema_editor):
+    for review_name, summary_name, target in (('ClinicReview', 'ClinicReviewSummary', 'clinic'),
+                                              ('DoctorReview', 'DoctorReviewSummary', 'doctor')):
+        summary_model = apps.get_model('reviews', summary_name)
+        rows = apps.get_model('reviews', review_name).objects.order_by().values(target).annotate(
+            **{f'stars_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+        )
+        summary_model.objects.bulk_create([
+            summary_model(**{f'{target}_id': row.pop(target)}, **row) for row in rows
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0002_rating_totals'),
+        ('doctors', '0003_rating_totals'),
+        ('reviews', '0004_backfill_rating_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClinicReviewSummary',
+            fields=[
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('clinic', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_summary', serialize=False, to='clinics.clinic')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DoctorReviewSummary',
+            fields=[
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('doctor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_summary', serialize=False, to='doctors.doctor')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
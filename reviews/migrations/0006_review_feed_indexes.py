@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_review_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clinicreview',
+            index=models.Index(fields=['clinic', '-created_at', '-id'], name='clinic_review_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctorreview',
+            index=models.Index(fields=['doctor', '-created_at', '-id'], name='doctor_review_feed_idx'),
+        ),
+    ]
@@ -5,7 +5,27 @@ from doctors.models import Doctor
 
 User = get_user_model()
 
-class ClinicReview(models.Model):
+
+class TrackedReview(models.Model):
+    """Remembers the reviewed object and rating as loaded, so a save can apply the difference"""
+    TARGET = None
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_state()
+        return instance
+
+    def remember_state(self):
+        self._saved_state = (self.__dict__.get(f'{self.TARGET}_id'), self.__dict__.get('rating'))
+
+
+class ClinicReview(TrackedReview):
+    TARGET = 'clinic'
+
     clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='clinic_reviews')
     rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)])  # 1-5 stars
@@ -16,12 +36,15 @@ class ClinicReview(models.Model):
     class Meta:
         unique_together = ('clinic', 'user')  # One review per user per clinic
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['clinic', '-created_at', '-id'], name='clinic_review_feed_idx')]
 
     def __str__(self):
         return f"{self.user.username} - {self.clinic.name} - {self.rating}★"
 
 
-class DoctorReview(models.Model):
+class DoctorReview(TrackedReview):
+    TARGET = 'doctor'
+
     doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='doctor_reviews')
     rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)])
@@ -32,6 +55,37 @@ class DoctorReview(models.Model):
     class Meta:
         unique_together = ('doctor', 'user')
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['doctor', '-created_at', '-id'], name='doctor_review_feed_idx')]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.doctor.full_name} - {self.rating}★"
+
+
+class ReviewSummary(models.Model):
+    """Star histogram of one clinic or doctor, kept in step with its reviews"""
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def histogram(self):
+        return {star: getattr(self, f'stars_{star}') for star in range(1, 6)}
+
+
+class ClinicReviewSummary(ReviewSummary):
+    clinic = models.OneToOneField(Clinic, on_delete=models.CASCADE, primary_key=True, related_name='review_summary')
+
+    def __str__(self):
+        return f"{self.clinic_id}: {self.histogram}"
+
+
+class DoctorReviewSummary(ReviewSummary):
+    doctor = models.OneToOneField(Doctor, on_delete=models.CASCADE, primary_key=True, related_name='review_summary')
 
     def __str__(self):
-        return f"{self.user.username} - {self.doctor.full_name} - {self.rating}★"
\ No newline at end of file
+        return f"{self.doctor_id}: {self.histogram}"
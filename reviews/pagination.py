@@ -0,0 +1,6 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ReviewCursorPagination(CursorPagination):
+    """Newest-first keyset pagination; no COUNT(*) and no OFFSET scan on deep pages"""
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,111 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+
+from .models import ClinicReview, ClinicReviewSummary, DoctorReview, DoctorReviewSummary
+
+SUMMARIES = {
+    ClinicReview: ClinicReviewSummary,
+    DoctorReview: DoctorReviewSummary,
+}
+STARS = range(1, 6)
+
+# Average of the running totals, rounded to the 2 decimal places of `rating`
+AVERAGE = Case(
+    When(review_count=0, then=Value(0.0)),
+    default=Round(Cast(F('rating_sum'), FloatField()) / F('review_count'), 2),
+    output_field=FloatField()
+)
+
+
+def _target_model(review_model):
+    return review_model._meta.get_field(review_model.TARGET).related_model
+
+
+def _star_counts():
+    return {f'stars_{star}': Count('id', filter=Q(rating=star)) for star in STARS}
+
+
+def apply_rating_change(model, pk, sum_delta, count_delta):
+    """Add to a doctor's or clinic's running totals and refresh its rating
+
+    Both statements are single-row UPDATEs computed by the database from the
+    current values, so concurrent reviews cannot overwrite each other.
+    """
+    if not sum_delta and not count_delta:
+        return
+    with transaction.atomic():
+        queryset = model.objects.filter(pk=pk)
+        queryset.update(rating_sum=F('rating_sum') + sum_delta, review_count=F('review_count') + count_delta)
+        queryset.update(rating=AVERAGE)
+
+
+def apply_review_changes(review_model, changes):
+    """Apply (target id, rating, +1 or -1) review changes to ratings and star histograms"""
+    model = _target_model(review_model)
+    summary_model = SUMMARIES[review_model]
+
+    deltas = defaultdict(lambda: [0, 0, Counter()])
+    for target_id, rating, sign in changes:
+        delta = deltas[target_id]
+        delta[0] += sign * rating
+        delta[1] += sign
+        delta[2][rating] += sign
+
+    with transaction.atomic():
+        for target_id, (sum_delta, count_delta, stars) in deltas.items():
+            apply_rating_change(model, target_id, sum_delta, count_delta)
+
+            stars = {f'stars_{star}': F(f'stars_{star}') + change for star, change in stars.items() if change}
+            if not stars:
+                continue
+            updated = summary_model.objects.filter(pk=target_id).update(**stars)
+            # A missing row is built from the reviews, unless the target is being deleted
+            if not updated and count_delta >= 0:
+                refresh_summary(review_model, target_id)
+
+
+def refresh_summary(review_model, pk):
+    counts = review_model.objects.filter(**{review_model.TARGET: pk}).aggregate(**_star_counts())
+    SUMMARIES[review_model].objects.update_or_create(pk=pk, defaults=counts)
+
+
+def _totals(review_model, target):
+    reviews = review_model.objects.filter(**{target: OuterRef('pk')}).order_by().values(target)
+    return (
+        Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()), 0),
+        Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0),
+    )
+
+
+def refresh_rating(review_model, pk):
+    """Rebuild the totals and histogram of one doctor or clinic from its reviews"""
+    rating_sum, review_count = _totals(review_model, review_model.TARGET)
+    with transaction.atomic():
+        queryset = _target_model(review_model).objects.filter(pk=pk)
+        queryset.update(rating_sum=rating_sum, review_count=review_count)
+        queryset.update(rating=AVERAGE)
+        refresh_summary(review_model, pk)
+
+
+def recompute_ratings():
+    """Rebuild totals, ratings and histograms of all doctors and clinics from the reviews tables"""
+    updated = {}
+    for review_model in (DoctorReview, ClinicReview):
+        target = review_model.TARGET
+        model = _target_model(review_model)
+        summary_model = SUMMARIES[review_model]
+        rating_sum, review_count = _totals(review_model, target)
+        histograms = review_model.objects.order_by().values(target).annotate(**_star_counts())
+
+        with transaction.atomic():
+            updated[target] = model.objects.update(rating_sum=rating_sum, review_count=review_count)
+            # Objects without reviews keep the rating they were given by hand
+            model.objects.filter(review_count__gt=0).update(rating=AVERAGE)
+            summary_model.objects.all().delete()
+            summary_model.objects.bulk_create([
+                summary_model(**{f'{target}_id': row.pop(target)}, **row) for row in histograms
+            ])
+    return updated
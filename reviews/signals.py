@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from vet_booking.cache import watch_models
+
+from .models import ClinicReview, DoctorReview
+from .ratings import apply_review_changes, refresh_rating
+
+@receiver(post_save, sender=ClinicReview)
+@receiver(post_save, sender=DoctorReview)
+def review_saved(sender, instance, created, **kwargs):
+    target_id = getattr(instance, f'{sender.TARGET}_id')
+    old_target_id, old_rating = getattr(instance, '_saved_state', (None, None))
+
+    if created:
+        apply_review_changes(sender, [(target_id, instance.rating, 1)])
+    elif old_target_id is None or old_rating is None:
+        # Saved without being loaded first; the previous values are unknown
+        refresh_rating(sender, target_id)
+    else:
+        apply_review_changes(sender, [(old_target_id, old_rating, -1), (target_id, instance.rating, 1)])
+
+    instance.remember_state()
+
+
+@receiver(post_delete, sender=ClinicReview)
+@receiver(post_delete, sender=DoctorReview)
+def review_deleted(sender, instance, **kwargs):
+    target_id, rating = getattr(instance, '_saved_state', (None, None))
+    if target_id is None or rating is None:
+        target_id, rating = getattr(instance, f'{sender.TARGET}_id'), instance.rating
+    apply_review_changes(sender, [(target_id, rating, -1)])
+
+
+# Connected after the handlers above, so the version moves only once ratings and histograms are updated
+watch_models(ClinicReview, DoctorReview)
@@ -1,3 +1,165 @@
-from django.test import TestCase
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework import status
+from clinics.models import Clinic
+from doctors.models import Doctor
+from reviews.models import ClinicReview, ClinicReviewSummary, DoctorReview, DoctorReviewSummary
 
-# Create your tests here.
+User = get_user_model()
+
+
+@pytest.fixture
+def clinic(make_clinic):
+
+    return make_clinic('Test Clinic')
+
+
+@pytest.fixture
+def doctor(clinic, make_doctor):
+
+    return make_doctor(clinic, 'doctor')
+
+
+def make_client(username):
+
+    client = APIClient()
+    client.user = User.objects.create_user(username=username, password='pass')
+    client.force_authenticate(user=client.user)
+    return client
+
+
+@pytest.mark.django_db
+class TestRatingTotals:
+
+
+    def test_review_create_update_delete_keep_rating_in_step(self, doctor):
+
+        first, second = make_client('first'), make_client('second')
+
+        response = first.post('/api/doctor-reviews/', {'doctor': doctor.id, 'rating': 5, 'comment': 'Great'})
+        second.post('/api/doctor-reviews/', {'doctor': doctor.id, 'rating': 2, 'comment': 'Meh'})
+        doctor.refresh_from_db()
+        assert (doctor.rating_sum, doctor.review_count, doctor.rating) == (7, 2, Decimal('3.50'))
+
+        first.patch(f"/api/doctor-reviews/{response.data['id']}/", {'rating': 4})
+        doctor.refresh_from_db()
+        assert (doctor.rating_sum, doctor.review_count, doctor.rating) == (6, 2, Decimal('3.00'))
+
+        first.delete(f"/api/doctor-reviews/{response.data['id']}/")
+        doctor.refresh_from_db()
+        assert (doctor.rating_sum, doctor.review_count, doctor.rating) == (2, 1, Decimal('2.00'))
+
+    def test_moving_review_to_another_clinic_updates_both(self, clinic):
+
+        other = Clinic.objects.get(pk=clinic.pk)
+        other.pk = None
+        other.save()
+        review = ClinicReview.objects.create(clinic=clinic, user=User.objects.create_user(username='u'),
+                                             rating=3, comment='Ok')
+
+        review = ClinicReview.objects.get(pk=review.pk)
+        review.clinic = other
+        review.save()
+
+        clinic.refresh_from_db()
+        other.refresh_from_db()
+        assert (clinic.review_count, clinic.rating) == (0, Decimal('0.00'))
+        assert (other.review_count, other.rating) == (1, Decimal('3.00'))
+
+    def test_recompute_ratings_rebuilds_from_reviews(self, doctor, clinic):
+
+        for number, rating in enumerate((5, 4, 4)):
+            user = User.objects.create_user(username=f'user{number}')
+            DoctorReview.objects.create(doctor=doctor, user=user, rating=rating, comment='Ok')
+        Doctor.objects.update(rating=0, rating_sum=0, review_count=0)
+        Clinic.objects.update(rating=5)
+
+        call_command('recompute_ratings')
+
+        doctor.refresh_from_db()
+        clinic.refresh_from_db()
+        assert (doctor.rating_sum, doctor.review_count, doctor.rating) == (13, 3, Decimal('4.33'))
+        assert (clinic.review_count, clinic.rating) == (0, Decimal('5.00'))
+
+    def test_doctors_sorted_by_maintained_rating(self, doctor, clinic, make_doctor):
+
+        rival = make_doctor(clinic, 'rival')
+        reviewer = User.objects.create_user(username='reviewer', password='pass')
+        DoctorReview.objects.create(doctor=doctor, user=reviewer, rating=2, comment='Ok')
+        DoctorReview.objects.create(doctor=rival, user=reviewer, rating=5, comment='Great')
+
+        response = APIClient().get('/api/doctors/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in response.data['results']] == [rival.id, doctor.id]
+        assert response.data['results'][0]['review_count'] == 1
+
+
+@pytest.mark.django_db
+class TestReviewSummary:
+
+
+    def test_clinic_summary_histogram_and_latest(self, clinic, django_assert_max_num_queries):
+
+        for number, rating in enumerate((5, 5, 4, 1)):
+            user = User.objects.create_user(username=f'user{number}', password='pass')
+            ClinicReview.objects.create(clinic=clinic, user=user, rating=rating, comment=f'Review {number}')
+
+        with django_assert_max_num_queries(2):
+            response = APIClient().get(f'/api/clinics/{clinic.id}/review-summary/', {'latest': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 4
+        assert response.data['average'] == Decimal('3.75')
+        assert response.data['histogram'] == {1: 1, 2: 0, 3: 0, 4: 1, 5: 2}
+        assert [review['comment'] for review in response.data['latest']] == ['Review 3', 'Review 2']
+
+    def test_doctor_summary_follows_edits_and_deletes(self, doctor):
+
+        client = make_client('author')
+        response = client.post('/api/doctor-reviews/', {'doctor': doctor.id, 'rating': 2, 'comment': 'Meh'})
+        client.patch(f"/api/doctor-reviews/{response.data['id']}/", {'rating': 5})
+        assert DoctorReviewSummary.objects.get(pk=doctor.pk).histogram == {1: 0, 2: 0, 3: 0, 4: 0, 5: 1}
+
+        client.delete(f"/api/doctor-reviews/{response.data['id']}/")
+
+        summary = APIClient().get(f'/api/doctors/{doctor.id}/review-summary/').data
+        assert summary['count'] == 0
+        assert summary['histogram'] == {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        assert summary['latest'] == []
+
+    def test_recompute_rebuilds_summaries(self, clinic):
+
+        user = User.objects.create_user(username='author', password='pass')
+        ClinicReview.objects.create(clinic=clinic, user=user, rating=3, comment='Ok')
+        ClinicReviewSummary.objects.all().delete()
+
+        call_command('recompute_ratings')
+
+        assert ClinicReviewSummary.objects.get(pk=clinic.pk).histogram[3] == 1
+
+
+@pytest.mark.django_db
+class TestReviewFeed:
+
+
+    def test_cursor_pages_walk_newest_first_without_count(self, clinic, django_assert_num_queries):
+
+        for number in range(25):
+            user = User.objects.create_user(username=f'user{number}')
+            ClinicReview.objects.create(clinic=clinic, user=user, rating=5, comment=f'Review {number}')
+
+        client = APIClient()
+        url = f'/api/clinic-reviews/?clinic={clinic.id}'
+        seen = []
+        while url:
+            with django_assert_num_queries(1):
+                response = client.get(url)
+            assert 'count' not in response.data
+            seen.extend(review['comment'] for review in response.data['results'])
+            url = response.data['next']
+
+        assert seen == [f'Review {number}' for number in reversed(range(25))]
@@ -1,15 +1,66 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from clinics.models import Clinic
+from doctors.models import Doctor
+from vet_booking.cache import CachedReadMixin
 from .models import ClinicReview, DoctorReview
+from .pagination import ReviewCursorPagination
 from .serializers import ClinicReviewSerializer, DoctorReviewSerializer
 
 
-class ClinicReviewViewSet(viewsets.ModelViewSet):
+class ReviewSummaryMixin:
+    """Adds GET {id}/review-summary/ served from the precomputed summary row"""
+    review_model = None
+    review_serializer_class = None
+    latest_default = 3
+    latest_max = 20
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'review_summary':
+            queryset = queryset.select_related('review_summary').prefetch_related(None)
+        return queryset
+
+    @action(detail=True, methods=['get'], url_path='review-summary')
+    def review_summary(self, request, pk=None):
+        target = self.get_object()
+
+        try:
+            latest = max(min(int(request.query_params.get('latest', self.latest_default)), self.latest_max), 0)
+        except ValueError:
+            latest = self.latest_default
+
+        return Response(self.review_summary_data(target, latest, self.get_serializer_context()))
+
+    def review_summary_data(self, target, latest, context):
+        """Count, average, histogram and the newest `latest` reviews; target.review_summary should be loaded"""
+        summary = getattr(target, 'review_summary', None)
+        reviews = (
+            self.review_model.objects
+            .filter(**{self.review_model.TARGET: target})
+            .select_related('user', self.review_model.TARGET)
+            .order_by('-created_at', '-id')[:latest]
+        )
+
+        return {
+            'count': target.review_count,
+            'average': target.rating,
+            'histogram': summary.histogram if summary else {star: 0 for star in range(1, 6)},
+            'latest': self.review_serializer_class(reviews, many=True, context=context).data,
+        }
+
+
+class ClinicReviewViewSet(CachedReadMixin, viewsets.ModelViewSet):
     serializer_class = ClinicReviewSerializer
+    # The feed shows the clinic's name too
+    cache_models = (ClinicReview, Clinic)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = ReviewCursorPagination
 
     def get_queryset(self):
-        queryset = ClinicReview.objects.all()
+        queryset = ClinicReview.objects.select_related('user', 'clinic')
 
 
         clinic_id = self.request.query_params.get('clinic')
@@ -37,12 +88,15 @@ class ClinicReviewViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class DoctorReviewViewSet(viewsets.ModelViewSet):
+class DoctorReviewViewSet(CachedReadMixin, viewsets.ModelViewSet):
     serializer_class = DoctorReviewSerializer
+    # The feed shows the doctor's name too
+    cache_models = (DoctorReview, Doctor)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = ReviewCursorPagination
 
     def get_queryset(self):
-        queryset = DoctorReview.objects.all()
+        queryset = DoctorReview.objects.select_related('user', 'doctor')
 
         # Filter by doctor if provided
         doctor_id = self.request.query_params.get('doctor')
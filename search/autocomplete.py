@@ -0,0 +1,186 @@
+import heapq
+import re
+import threading
+import time
+from contextlib import contextmanager
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+
+TYPES = ('clinic', 'doctor', 'city', 'service')
+WORD_START = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def _keys(label):
+    """Every suffix of the label that starts a word, so 'Олена Петренко' is found by 'пет' too"""
+    normalized = normalize(label)
+    return {normalized[match.start():] for match in WORD_START.finditer(normalized)}
+
+
+class AutocompleteIndex:
+    """Sorted arrays of (key, label, id) per type, searched with bisect
+
+    Updates keep the arrays sorted with insort, so lookups never need a
+    rebuild; a fresh index is filled inside `bulk()`, which appends and sorts
+    each array once instead. Once `max_entries` is reached new entries are dropped and
+    `truncated` is set; the next scheduled rebuild starts over.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.size = 0
+        self.truncated = False
+        self.built_at = time.monotonic()
+        self._arrays = {kind: [] for kind in TYPES}
+        self._objects = {}
+        self._cities = Counter()
+        self._bulk = False
+
+    @contextmanager
+    def bulk(self):
+        """Append while loading many objects, then sort each array once"""
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            for array in self._arrays.values():
+                array.sort()
+
+    def _add(self, kind, label, pk):
+        entries = []
+        for key in _keys(label):
+            if self.size >= self.max_entries:
+                self.truncated = True
+                break
+            entry = (key, label, pk)
+            if self._bulk:
+                self._arrays[kind].append(entry)
+            else:
+                insort(self._arrays[kind], entry)
+            entries.append(entry)
+            self.size += 1
+        return entries
+
+    def _remove(self, kind, entries):
+        array = self._arrays[kind]
+        for entry in entries:
+            position = bisect_left(array, entry)
+            if position < len(array) and array[position] == entry:
+                del array[position]
+                self.size -= 1
+
+    def put(self, kind, pk, label, city=None):
+        """Add or replace an object; `city` is counted so a city disappears with its last clinic"""
+        self.discard(kind, pk)
+        self._objects[kind, pk] = (self._add(kind, label, pk), city)
+        if city:
+            self._cities[city] += 1
+            if self._cities[city] == 1:
+                self._objects['city', city] = (self._add('city', city, None), None)
+
+    def discard(self, kind, pk):
+        entries, city = self._objects.pop((kind, pk), ((), None))
+        self._remove(kind, entries)
+        if city:
+            self._cities[city] -= 1
+            if not self._cities[city]:
+                del self._cities[city]
+                self._remove('city', self._objects.pop(('city', city))[0])
+
+    def _matches(self, kind, prefix):
+        array = self._arrays[kind]
+        seen = set()
+        for position in range(bisect_left(array, (prefix,)), len(array)):
+            key, label, pk = array[position]
+            if not key.startswith(prefix):
+                return
+            ref = pk if pk is not None else label
+            if ref not in seen:
+                seen.add(ref)
+                yield key, kind, label, pk
+
+    def suggest(self, prefix, types=TYPES, limit=10):
+        """Up to `limit` (type, id, label) in key order; cities have no id"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        merged = heapq.merge(*(self._matches(kind, prefix) for kind in types))
+        return [(kind, pk, label) for _, kind, label, pk in islice(merged, limit)]
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def build_index():
+    from clinics.models import Clinic
+    from doctors.models import Doctor
+    from services.models import Service
+
+    index = AutocompleteIndex(settings.AUTOCOMPLETE_MAX_ENTRIES)
+    with index.bulk():
+        for pk, name, city in Clinic.objects.filter(is_active=True).values_list('id', 'name', 'city').iterator():
+            index.put('clinic', pk, name, city=city)
+        for pk, first_name, last_name in Doctor.objects.filter(is_available=True).values_list(
+                'id', 'first_name', 'last_name').iterator():
+            index.put('doctor', pk, f'{first_name} {last_name}')
+        for pk, name in Service.objects.filter(is_available=True).values_list('id', 'name').iterator():
+            index.put('service', pk, name)
+    return index
+
+
+def get_index():
+    """This process's index, built on first use and rebuilt every AUTOCOMPLETE_REFRESH_SECONDS
+
+    Signals keep it exact for changes made in this process; the periodic
+    rebuild picks up changes made by other processes.
+    """
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.built_at > settings.AUTOCOMPLETE_REFRESH_SECONDS:
+        with _lock:
+            if _index is index:
+                _index = build_index()
+            index = _index
+    return index
+
+
+def reset_index():
+    global _index
+    with _lock:
+        _index = None
+
+
+def update(kind, instance):
+    """Apply a saved clinic, doctor or service to the index if this process has built one"""
+    visible = instance.is_active if kind == 'clinic' else instance.is_available
+    # Read under the lock so a change made during a rebuild lands in the new index
+    with _lock:
+        index = _index
+        if index is None:
+            return
+        if not visible:
+            index.discard(kind, instance.pk)
+        elif kind == 'clinic':
+            index.put(kind, instance.pk, instance.name, city=instance.city)
+        else:
+            index.put(kind, instance.pk, instance.full_name if kind == 'doctor' else instance.name)
+
+
+def remove(kind, pk):
+    with _lock:
+        if _index is not None:
+            _index.discard(kind, pk)
+
+
+def suggest(prefix, types=TYPES, limit=10):
+    index = get_index()
+    with _lock:
+        return index.suggest(prefix, types, limit)
@@ -0,0 +1,108 @@
+import re
+
+from django.apps import apps
+from django.db import connection, transaction
+
+TABLE = 'search_index'
+# The FTS rowid packs the object id and its kind: rowid = object_id * KIND_SLOTS + kind code
+KIND_SLOTS = 4
+KINDS = {'clinic': 1, 'doctor': 2, 'service': 3}
+# bm25 weights of the title and body columns
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+MAX_TERMS = 8
+
+
+def clinic_document(clinic):
+    return clinic.name, f'{clinic.city} {clinic.address}'
+
+
+def doctor_document(doctor):
+    return f'{doctor.first_name} {doctor.last_name}', f'{doctor.get_specialization_display()} {doctor.bio}'
+
+
+def service_document(service):
+    return service.name, f'{service.get_service_type_display()} {service.description}'
+
+
+# kind -> (model, fields an object must have to be searchable, (title, body) builder)
+SOURCES = {
+    'clinic': ('clinics.Clinic', {'is_active': True}, clinic_document),
+    'doctor': ('doctors.Doctor', {'is_available': True}, doctor_document),
+    'service': ('services.Service', {'is_available': True}, service_document),
+}
+
+
+def kind_of(model):
+    label = model._meta.label
+    return next((kind for kind, (source, _, _) in SOURCES.items() if source == label), None)
+
+
+def _rowid(kind, pk):
+    return pk * KIND_SLOTS + KINDS[kind]
+
+
+def index_object(kind, instance):
+    """Replace the object's row; objects that are not searchable are only removed"""
+    _, visible, document = SOURCES[kind]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_rowid(kind, instance.pk)])
+        if all(getattr(instance, field) == value for field, value in visible.items()):
+            cursor.execute(f'INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)',
+                           [_rowid(kind, instance.pk), *document(instance)])
+
+
+def remove_object(kind, pk):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_rowid(kind, pk)])
+
+
+def rebuild(get_model=apps.get_model, using=connection, batch_size=500):
+    """Refill the index from the catalogue tables; also used by the migration with historical models"""
+    counts = {}
+    with transaction.atomic(using=using.alias), using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for kind, (label, visible, document) in SOURCES.items():
+            rows = [
+                (_rowid(kind, instance.pk), *document(instance))
+                for instance in get_model(label).objects.filter(**visible).iterator(chunk_size=batch_size)
+            ]
+            cursor.executemany(f'INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)', rows)
+            counts[kind] = len(rows)
+    return counts
+
+
+def match_expression(text):
+    """FTS5 query matching every word of the input as a prefix; None when there is nothing to look for"""
+    terms = re.findall(r'\w+', text.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(text, limit):
+    """{kind: [object id, ...]} with at most `limit` best-ranked ids per kind"""
+    expression = match_expression(text)
+    results = {kind: [] for kind in KINDS}
+    if expression is None:
+        return results
+
+    # bm25() cannot be used inside a window function, so score the hits first
+    sql = f'''
+        WITH hits AS MATERIALIZED (
+            SELECT rowid, bm25({TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score
+            FROM {TABLE} WHERE {TABLE} MATCH %s
+        )
+        SELECT rowid FROM (
+            SELECT rowid, score, row_number() OVER (PARTITION BY rowid %% {KIND_SLOTS} ORDER BY score) AS position
+            FROM hits
+        )
+        WHERE position <= %s
+        ORDER BY score
+    '''
+    codes = {code: kind for kind, code in KINDS.items()}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [expression, limit])
+        for (rowid,) in cursor.fetchall():
+            results[codes[rowid % KIND_SLOTS]].append(rowid // KIND_SLOTS)
+    return results
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from search.index import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Refill the full-text search index from clinics, doctors and services'
+
+    def handle(self, *args, **options):
+        counts = rebuild()
+        self.stdout.write(', '.join(f'{kind}: {count}' for kind, count in counts.items()))
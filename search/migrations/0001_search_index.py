@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from search.index import TABLE, rebuild
+
+
+def fill_search_index(apps, schema_editor):
+    rebuild(apps.get_model, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('clinics', '0005_clinic_opening_hours'),
+        ('doctors', '0003_rating_totals'),
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        # SQLite FTS5 table; the rowid encodes the object's kind and id (see search.index)
+        migrations.RunSQL(
+            f"CREATE VIRTUAL TABLE {TABLE} USING fts5(title, body, tokenize='unicode61 remove_diacritics 2', "
+            f"prefix='2 3')",
+            f'DROP TABLE {TABLE}',
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clinics.models import Clinic
+from doctors.models import Doctor
+from services.models import Service
+
+from . import autocomplete
+from .index import index_object, kind_of, remove_object
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Service)
+def catalogue_saved(sender, instance, **kwargs):
+    kind = kind_of(sender)
+    index_object(kind, instance)
+    # The in-memory index cannot be rolled back, so it only sees committed changes
+    transaction.on_commit(lambda: autocomplete.update(kind, instance))
+
+
+@receiver(post_delete, sender=Clinic)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Service)
+def catalogue_deleted(sender, instance, **kwargs):
+    kind, pk = kind_of(sender), instance.pk
+    remove_object(kind, pk)
+    transaction.on_commit(lambda: autocomplete.remove(kind, pk))
@@ -0,0 +1,226 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework import status
+from services.models import Service
+from search import autocomplete
+from search.index import match_expression
+
+
+def make_service(clinic, name, description='Огляд тварини', **kwargs):
+
+    return Service.objects.create(
+        clinic=clinic,
+        name=name,
+        service_type='consultation',
+        description=description,
+        price=300,
+        duration_minutes=30,
+        **kwargs
+    )
+
+
+@pytest.fixture
+def api_client():
+
+    return APIClient()
+
+
+def search(api_client, query, **params):
+
+    response = api_client.get('/api/search/', {'q': query, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return response.data['results']
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+
+    def test_results_are_grouped_by_type_and_ranked(self, make_clinic, make_doctor, api_client):
+
+        clinic = make_clinic('Ветклініка Хвіст', city='Львів')
+        other = make_clinic('Зоолайф', address='вул. Хвостова, 3')
+        doctor = make_doctor(clinic, 'Хвостенко')
+        service = make_service(clinic, 'Стрижка хвоста')
+        make_service(clinic, 'Вакцинація')
+
+        results = search(api_client, 'хвіс')
+
+        assert [row['id'] for row in results['clinics']] == [clinic.id]
+        assert results['doctors'] == []
+
+        results = search(api_client, 'ХВОСТ')
+
+        assert [row['id'] for row in results['clinics']] == [other.id]
+        assert [row['id'] for row in results['doctors']] == [doctor.id]
+        assert [row['id'] for row in results['services']] == [service.id]
+        assert results['doctors'][0]['clinic_name'] == 'Ветклініка Хвіст'
+
+    def test_title_matches_rank_above_body_matches(self, make_clinic, make_doctor, api_client):
+
+        clinic = make_clinic('Клініка')
+        in_bio = make_doctor(clinic, 'Петренко', bio='Кардіолог з досвідом')
+        in_name = make_doctor(clinic, 'Кардашян')
+
+        results = search(api_client, 'кард')
+
+        assert [row['id'] for row in results['doctors']] == [in_name.id, in_bio.id]
+
+    def test_every_word_must_match(self, make_clinic, make_doctor, api_client):
+
+        clinic = make_clinic('Клініка')
+        surgeon = make_doctor(clinic, 'Іваненко', specialization='surgeon')
+        make_doctor(clinic, 'Іваненко2')
+
+        results = search(api_client, 'іваненко хірург')
+
+        assert [row['id'] for row in results['doctors']] == [surgeon.id]
+
+    def test_index_follows_saves_and_deletes(self, make_clinic, api_client):
+
+        clinic = make_clinic('Старт')
+        service = make_service(clinic, 'Чіпування')
+
+        clinic.name = 'Фініш'
+        clinic.save()
+        assert search(api_client, 'старт')['clinics'] == []
+        assert len(search(api_client, 'фініш')['clinics']) == 1
+
+        service.is_available = False
+        service.save()
+        assert search(api_client, 'чіпування')['services'] == []
+
+        clinic.delete()
+        assert search(api_client, 'фініш')['clinics'] == []
+
+    def test_query_count_does_not_grow_with_catalogue(self, make_clinic, make_doctor, api_client,
+                                                      django_assert_num_queries):
+
+        for number in range(20):
+            clinic = make_clinic(f'Клініка {number}')
+            make_doctor(clinic, f'Лікар{number}', bio='Клініка')
+            make_service(clinic, f'Послуга {number}', description='Клініка')
+
+        with django_assert_num_queries(5):
+            results = search(api_client, 'клініка', limit=3)
+
+        assert len(results['clinics']) == 3
+        assert len(results['doctors']) == 3
+        assert len(results['services']) == 3
+
+    def test_short_or_empty_query_is_rejected(self, api_client):
+
+        assert api_client.get('/api/search/', {'q': ' x '}).status_code == status.HTTP_400_BAD_REQUEST
+        assert match_expression('"; DROP --') == '"drop"*'
+        assert search(api_client, '!!!') == {'clinics': [], 'doctors': [], 'services': []}
+
+    def test_rebuild_command(self, make_clinic, api_client, capsys):
+
+        clinic = make_clinic('Перебудова')
+        make_clinic('Закрита', is_active=False)
+
+        call_command('rebuild_search_index')
+
+        assert capsys.readouterr().out.strip() == 'clinic: 1, doctor: 0, service: 0'
+        assert [row['id'] for row in search(api_client, 'перебудова')['clinics']] == [clinic.id]
+
+
+@pytest.fixture
+def fresh_autocomplete():
+
+    autocomplete.reset_index()
+    yield
+    autocomplete.reset_index()
+
+
+def suggest(api_client, prefix, **params):
+
+    response = api_client.get('/api/autocomplete/', {'prefix': prefix, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return [(row['type'], row['label']) for row in response.data['results']]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('fresh_autocomplete')
+class TestAutocomplete:
+
+
+    def test_suggests_names_by_any_word_start(self, make_clinic, make_doctor, api_client):
+
+        clinic = make_clinic('Лапа Плюс', city='Львів')
+        make_clinic('Лапка', city='Львів')
+        make_doctor(clinic, 'Лавренко', first_name='Олена')
+        make_service(clinic, 'Лазерна терапія')
+
+        assert suggest(api_client, 'ла') == [
+            ('doctor', 'Олена Лавренко'),
+            ('service', 'Лазерна терапія'),
+            ('clinic', 'Лапа Плюс'),
+            ('clinic', 'Лапка'),
+        ]
+        assert suggest(api_client, 'ПЛЮ') == [('clinic', 'Лапа Плюс')]
+        assert suggest(api_client, 'льв', type='city') == [('city', 'Львів')]
+        assert suggest(api_client, 'ла', type='clinic,service', limit=2) == [
+            ('service', 'Лазерна терапія'),
+            ('clinic', 'Лапа Плюс'),
+        ]
+
+    def test_served_without_queries_once_built(self, make_clinic, api_client, django_assert_num_queries):
+
+        make_clinic('Лапа')
+        suggest(api_client, 'л')
+
+        with django_assert_num_queries(0):
+            assert suggest(api_client, 'лап') == [('clinic', 'Лапа')]
+
+    def test_committed_changes_update_the_index(self, make_clinic, api_client, django_capture_on_commit_callbacks):
+
+        clinic = make_clinic('Лапа', city='Київ')
+        suggest(api_client, 'л')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other = make_clinic('Хвіст', city='Одеса')
+            clinic.city = 'Дніпро'
+            clinic.save()
+        assert suggest(api_client, 'хв') == [('clinic', 'Хвіст')]
+        assert suggest(api_client, 'к', type='city') == []
+        assert suggest(api_client, 'д', type='city') == [('city', 'Дніпро')]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other.delete()
+            clinic.is_active = False
+            clinic.save()
+        assert suggest(api_client, 'хв') == []
+        assert suggest(api_client, 'л') == []
+        assert suggest(api_client, 'д', type='city') == []
+
+    def test_index_stops_growing_at_the_cap(self):
+
+        index = autocomplete.AutocompleteIndex(max_entries=3)
+        index.put('clinic', 1, 'Лапа Плюс')
+        index.put('clinic', 2, 'Хвіст Котик')
+
+        assert index.size == 3
+        assert index.truncated
+        assert index.suggest('лап') == [('clinic', 1, 'Лапа Плюс')]
+
+    def test_bulk_load_matches_incremental_puts(self):
+
+        labels = {1: 'Хвіст Котик', 2: 'Лапа Плюс', 3: 'Котик'}
+        incremental = autocomplete.AutocompleteIndex(max_entries=100)
+        bulk = autocomplete.AutocompleteIndex(max_entries=100)
+        with bulk.bulk():
+            for pk, label in labels.items():
+                incremental.put('clinic', pk, label, city='Київ')
+                bulk.put('clinic', pk, label, city='Київ')
+
+        assert bulk._arrays == incremental._arrays
+        bulk.discard('clinic', 1)
+        assert bulk.suggest('кот') == [('clinic', 3, 'Котик')]
+
+    def test_bad_requests(self, api_client):
+
+        assert api_client.get('/api/autocomplete/').status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get('/api/autocomplete/', {'prefix': 'ла', 'type': 'pet'}).status_code == \
+            status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,81 @@
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from clinics.models import Clinic
+from clinics.serializers import ClinicListSerializer
+from doctors.models import Doctor
+from doctors.serializers import DoctorListSerializer
+from services.models import Service
+from services.serializers import ServiceSerializer
+
+from . import autocomplete
+from .index import search
+
+# kind -> (response key, queryset of searchable objects, serializer)
+RESULT_TYPES = {
+    'clinic': ('clinics', lambda: Clinic.objects.filter(is_active=True).prefetch_related('specializations'),
+               ClinicListSerializer),
+    'doctor': ('doctors', lambda: Doctor.objects.filter(is_available=True).select_related('clinic'),
+               DoctorListSerializer),
+    'service': ('services', lambda: Service.objects.filter(is_available=True).select_related('clinic'),
+                ServiceSerializer),
+}
+
+
+class SearchView(APIView):
+    """Full-text search over clinics, doctors and services, best matches first within each type"""
+    default_limit = 5
+    max_limit = 20
+    min_query_length = 2
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if len(query) < self.min_query_length:
+            return Response({'detail': 'Введіть щонайменше 2 символи для пошуку.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = max(min(int(request.query_params.get('limit', self.default_limit)), self.max_limit), 1)
+        except ValueError:
+            limit = self.default_limit
+
+        context = {'request': request, 'view': self}
+        results = {}
+        for kind, ids in search(query, limit).items():
+            key, queryset, serializer_class = RESULT_TYPES[kind]
+            objects = queryset().in_bulk(ids) if ids else {}
+            results[key] = serializer_class([objects[pk] for pk in ids if pk in objects], many=True,
+                                            context=context).data
+
+        return Response({'query': query, 'results': results})
+
+
+class AutocompleteView(APIView):
+    """Name suggestions from the in-memory index; no database access once the index is built"""
+    # Public and anonymous, so JWT authentication does not load a user per keystroke
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request):
+        prefix = request.query_params.get('prefix', '')
+        types = request.query_params.get('type')
+        types = types.split(',') if types else autocomplete.TYPES
+        if not prefix.strip() or any(kind not in autocomplete.TYPES for kind in types):
+            return Response({'detail': 'Вкажіть prefix та type з: clinic, doctor, city, service.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = max(min(int(request.query_params.get('limit', self.default_limit)), self.max_limit), 1)
+        except ValueError:
+            limit = self.default_limit
+
+        return Response({
+            'results': [
+                {'type': kind, 'id': pk, 'label': label}
+                for kind, pk, label in autocomplete.suggest(prefix, types, limit)
+            ],
+        })
@@ -0,0 +1,5 @@
+from vet_booking.cache import watch_models
+
+from .models import Service
+
+watch_models(Service)
@@ -1,13 +1,22 @@
 from rest_framework import viewsets, filters
 from django_filters.rest_framework import DjangoFilterBackend
+from clinics.models import Clinic
 from .models import Service
 from .serializers import ServiceSerializer
+from vet_booking.cache import CachedReadMixin
+from vet_booking.facets import Facet, FacetsMixin
 
-class ServiceViewSet(viewsets.ModelViewSet):
-    queryset = Service.objects.filter(is_available=True)
+class ServiceViewSet(CachedReadMixin, FacetsMixin, viewsets.ModelViewSet):
+    queryset = Service.objects.filter(is_available=True).select_related('clinic')
     serializer_class = ServiceSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['service_type', 'clinic']
     search_fields = ['name', 'description']
     ordering_fields = ['price', 'name']
     ordering = ['service_type', 'price']
+    cache_models = (Service, Clinic)
+    facets = {
+        'service_type': Facet('service_type', Service.SERVICE_TYPE_CHOICES),
+        'clinic': Facet('clinic', 'clinic__name'),
+        'city': Facet('clinic__city'),
+    }
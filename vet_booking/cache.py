@@ -0,0 +1,123 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_TIMEOUT = None
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(namespace):
+    """Current version of a namespace; entries keyed with an older version are never read again
+
+    A missing counter restarts from the clock rather than 1, so an evicted
+    counter cannot come back to a version that still has entries cached.
+    """
+    return cache.get_or_set(_version_key(namespace), time.time_ns, VERSION_TIMEOUT)
+
+
+def bump_version(namespace):
+    """Invalidate every cached entry of a namespace at once"""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), time.time_ns(), VERSION_TIMEOUT)
+
+
+def invalidate(namespace):
+    """Bump a namespace from a signal handler, once more when the surrounding transaction commits
+
+    A read between the two bumps may cache rows that are not committed yet;
+    the second bump drops that entry again.
+    """
+    bump_version(namespace)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_version(namespace))
+
+
+def versioned_key(namespace, *parts):
+    return ':'.join([namespace, f'v{get_version(namespace)}', *map(str, parts)])
+
+
+def model_namespace(model):
+    return f'model:{model._meta.label_lower}'
+
+
+def models_version(models):
+    """Combined version of several models' namespaces, read with one cache round trip"""
+    keys = [_version_key(model_namespace(model)) for model in models]
+    found = cache.get_many(keys)
+    return '.'.join(
+        str(found[key]) if key in found else str(get_version(model_namespace(model)))
+        for key, model in zip(keys, models)
+    )
+
+
+def _model_changed(sender, **kwargs):
+    invalidate(model_namespace(sender))
+
+
+def watch_models(*models):
+    """Bump a model's namespace whenever one of its rows is saved or deleted; call from AppConfig.ready
+
+    The bump runs after receivers connected earlier, so connect this after
+    any handler that updates data derived from the model.
+    """
+    for model in models:
+        label = model._meta.label_lower
+        post_save.connect(_model_changed, sender=model, dispatch_uid=f'cache-save-{label}')
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=f'cache-delete-{label}')
+
+
+def query_digest(params, *parts):
+    """Hash of query parameters (in any order) and any extra parts, safe to use in a cache key"""
+    encoded = urlencode([*((str(index), part) for index, part in enumerate(parts)),
+                         *sorted((name, value) for name, values in params.lists() for value in values)])
+    return hashlib.md5(encoded.encode(), usedforsecurity=False).hexdigest()
+
+
+class CachedReadMixin:
+    """Caches anonymous list and retrieve responses until one of `cache_models` changes
+
+    Models must be registered with watch_models(). Requests carrying any of
+    `uncached_params` (answers that depend on the clock) always run.
+    """
+    cache_models = ()
+    uncached_params = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def response_cache_key(self, request):
+        # The host is part of the key because serializers build absolute URLs from it
+        digest = query_digest(request.query_params, request.get_host(), *sorted(self.kwargs.items()))
+        return ':'.join(['response', models_version(self.cache_models), self.basename, self.action, digest])
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated or any(param in request.query_params for param in self.uncached_params):
+            return handler(request, *args, **kwargs)
+
+        key = self.response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_SECONDS)
+            response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,16 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def parse_query_date(value):
+    """A YYYY-MM-DD query parameter as a date, today when it is empty
+
+    Raises ValueError for malformed and impossible dates (2026-02-30) alike,
+    so views can answer both with the same 400.
+    """
+    if not value:
+        return timezone.localdate()
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'Invalid date: {value}')
+    return day
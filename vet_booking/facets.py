@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import models_version, query_digest
+
+
+class Facet:
+    """A list filter whose options are counted: `path` is grouped on, `label` names the option
+
+    `label` is a lookup (e.g. 'clinic__name') or a choices tuple. `param` is
+    the query parameter that filters on this facet; it is left out while the
+    facet itself is counted, so a chosen option does not hide the others.
+    """
+
+    def __init__(self, path, label=None, param=None):
+        self.path = path
+        self.label = label
+        self.param = param
+
+    def counts(self, queryset):
+        label_field = self.label if isinstance(self.label, str) else None
+        choices = dict(self.label or ()) if label_field is None else {}
+        rows = (
+            queryset
+            .exclude(**{f'{self.path}__isnull': True})
+            .order_by()
+            .values(*filter(None, [self.path, label_field]))
+            .annotate(count=Count('pk', distinct=True))
+        )
+        options = [
+            {
+                'value': row[self.path],
+                'label': row[label_field] if label_field else choices.get(row[self.path], row[self.path]),
+                'count': row['count'],
+            }
+            for row in rows
+        ]
+        return sorted(options, key=lambda option: (-option['count'], str(option['label'])))
+
+
+class FacetsMixin:
+    """?facets=a,b on a list adds {'facets': {a: [{value, label, count}]}} for the filtered results
+
+    Each facet is one grouped query, cached for FACET_CACHE_SECONDS per
+    facet and filter combination.
+    """
+    facets = {}
+
+    def list(self, request, *args, **kwargs):
+        names = [name for name in request.query_params.get('facets', '').split(',') if name]
+        unknown = [name for name in names if name not in self.facets]
+        if unknown:
+            return Response({'detail': f"Невідомі фасети: {', '.join(unknown)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        response = super().list(request, *args, **kwargs)
+        if names:
+            response.data['facets'] = {name: self.facet_counts(name) for name in names}
+        return response
+
+    def facet_counts(self, name):
+        facet = self.facets[name]
+        params = self.request.query_params.copy()
+        for ignored in ('facets', 'page', 'ordering', facet.param or name):
+            params.pop(ignored, None)
+
+        # Views that also cache responses list the models they read; their changes drop the counts too
+        version = models_version(getattr(self, 'cache_models', ()))
+        key = f'facets:{version}:{self.basename}:{name}:{query_digest(params)}'
+        options = cache.get(key)
+        if options is None:
+            with self._query_params(params):
+                queryset = self.filter_queryset(self.get_queryset())
+            options = facet.counts(queryset)
+            cache.set(key, options, settings.FACET_CACHE_SECONDS)
+        return options
+
+    @contextmanager
+    def _query_params(self, params):
+        """Run the filter backends as if the request had only `params`"""
+        request = self.request._request
+        original = request.GET
+        request.GET = params
+        try:
+            yield
+        finally:
+            request.GET = original
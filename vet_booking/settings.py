@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     'appointments',
     'users',
     'reviews',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -73,6 +74,29 @@ GOOGLE_MAPS_API_KEY = config('GOOGLE_MAPS_API_KEY', default='')
 GOOGLE_CALENDAR_CLIENT_ID = config('GOOGLE_CALENDAR_CLIENT_ID', default='')
 GOOGLE_CALENDAR_CLIENT_SECRET = config('GOOGLE_CALENDAR_CLIENT_SECRET', default='')
 
+# Calendar sync outbox (drained by `manage.py process_calendar_outbox`)
+CALENDAR_BACKEND = config('CALENDAR_BACKEND', default='appointments.google_calendar.GoogleCalendarService')
+CALENDAR_SYNC_MAX_ATTEMPTS = config('CALENDAR_SYNC_MAX_ATTEMPTS', default=5, cast=int)
+
+# How long a slot stays reserved while the booking form is being filled in
+SLOT_HOLD_MINUTES = config('SLOT_HOLD_MINUTES', default=10, cast=int)
+
+# Completed/cancelled appointments older than this are moved to the archive table
+APPOINTMENT_ARCHIVE_AFTER_DAYS = config('APPOINTMENT_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# Cached clinic map responses; any clinic change invalidates them earlier
+CLINIC_MAP_CACHE_SECONDS = config('CLINIC_MAP_CACHE_SECONDS', default=600, cast=int)
+
+# Cached clinic page bundles; saving the clinic, its doctors, services or reviews invalidates them earlier
+CLINIC_BUNDLE_CACHE_SECONDS = config('CLINIC_BUNDLE_CACHE_SECONDS', default=600, cast=int)
+
+# Per-process autocomplete index: size cap and how often it is rebuilt to pick up other processes' changes
+AUTOCOMPLETE_MAX_ENTRIES = config('AUTOCOMPLETE_MAX_ENTRIES', default=100000, cast=int)
+AUTOCOMPLETE_REFRESH_SECONDS = config('AUTOCOMPLETE_REFRESH_SECONDS', default=300, cast=int)
+
+# Facet counts returned by list endpoints with ?facets= are cached this long
+FACET_CACHE_SECONDS = config('FACET_CACHE_SECONDS', default=60, cast=int)
+
 # Email configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -87,9 +111,26 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file-backed test database gives threads real SQLite locking
+        # (busy waits) instead of shared-cache "table is locked" errors.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# Local memory by default (one cache per process); point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend such as django.core.cache.backends.redis.RedisCache to share entries between processes
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='findvet'),
     }
 }
 
+# Anonymous list/detail responses of catalogue and review endpoints; model changes invalidate them earlier
+RESPONSE_CACHE_SECONDS = config('RESPONSE_CACHE_SECONDS', default=300, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from clinics.models import ClinicSpecialization
+from services.models import Service
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalogue(make_clinic, make_doctor):
+
+    kyiv = make_clinic('Kyiv Vet', 'Kyiv')
+    lviv = make_clinic('Lviv Vet', 'Lviv')
+    make_doctor(kyiv, 'first', 'surgeon')
+    make_doctor(kyiv, 'second', 'surgeon')
+    make_doctor(kyiv, 'third', 'dentist')
+    make_doctor(lviv, 'fourth', 'dentist')
+    for clinic in (kyiv, lviv):
+        ClinicSpecialization.objects.create(clinic=clinic, specialization='surgery')
+    ClinicSpecialization.objects.create(clinic=kyiv, specialization='dental')
+    Service.objects.create(clinic=kyiv, name='Checkup', service_type='consultation', description='Checkup',
+                           price=300, duration_minutes=30)
+    return {'kyiv': kyiv, 'lviv': lviv}
+
+
+@pytest.fixture
+def api_client():
+
+    return APIClient()
+
+
+def facet(response, name):
+
+    return [(option['value'], option['label'], option['count']) for option in response.data['facets'][name]]
+
+
+@pytest.mark.django_db
+class TestFacets:
+
+
+    def test_doctor_facets_count_the_filtered_list(self, api_client, catalogue):
+
+        params = {'facets': 'specialization,clinic,city', 'clinic': catalogue['kyiv'].id}
+        response = api_client.get('/api/doctors/', params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 3
+        assert facet(response, 'specialization') == [('surgeon', 'Хірург', 2), ('dentist', 'Стоматолог', 1)]
+        assert facet(response, 'city') == [('Kyiv', 'Kyiv', 3)]
+
+    def test_chosen_option_does_not_hide_the_others(self, api_client, catalogue):
+
+        response = api_client.get('/api/doctors/', {'facets': 'clinic,specialization', 'specialization': 'dentist'})
+
+        assert response.data['count'] == 2
+        assert facet(response, 'clinic') == [
+            (catalogue['kyiv'].id, 'Kyiv Vet', 1),
+            (catalogue['lviv'].id, 'Lviv Vet', 1),
+        ]
+        assert facet(response, 'specialization') == [('dentist', 'Стоматолог', 2), ('surgeon', 'Хірург', 2)]
+
+    def test_clinic_and_service_facets(self, api_client, catalogue):
+
+        clinics = api_client.get('/api/clinics/', {'facets': 'city,specialization'})
+        services = api_client.get('/api/services/', {'facets': 'service_type,city'})
+
+        assert facet(clinics, 'city') == [('Kyiv', 'Kyiv', 1), ('Lviv', 'Lviv', 1)]
+        assert facet(clinics, 'specialization') == [('surgery', 'Хірургія', 2), ('dental', 'Стоматологія', 1)]
+        assert facet(services, 'service_type') == [('consultation', 'Консультація', 1)]
+        assert facet(services, 'city') == [('Kyiv', 'Kyiv', 1)]
+
+    def test_one_query_per_facet_then_cached(self, api_client, catalogue, django_assert_num_queries):
+
+        # Signed in, so the whole response is not served from the anonymous response cache
+        api_client.force_authenticate(user=User.objects.create(username='patient'))
+        params = {'facets': 'specialization,clinic,city'}
+        with django_assert_num_queries(2 + 3):
+            api_client.get('/api/doctors/', params)
+
+        with django_assert_num_queries(2):
+            api_client.get('/api/doctors/', params)
+
+    def test_without_facets_and_unknown_facet(self, api_client, catalogue):
+
+        assert 'facets' not in api_client.get('/api/doctors/').data
+        assert api_client.get('/api/doctors/', {'facets': 'colour'}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,132 @@
+import itertools
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework.test import APIClient
+from rest_framework import status
+from clinics.models import ClinicSpecialization
+from doctors.models import DoctorSchedule, FavoriteDoctor
+from services.models import Service
+from appointments.models import Appointment, SlotHold
+from reviews.models import ClinicReview, DoctorReview
+
+User = get_user_model()
+
+# Rows added by the second seeding round; more than one page so that
+# a per-row query shows up as a difference between the two rounds.
+EXTRA_ROWS = 15
+
+_sequence = itertools.count(1)
+
+
+def seed(world, count):
+    """Add `count` clinics, each with a doctor, service, booking, hold, favourite and reviews"""
+
+    tomorrow = timezone.localdate() + timedelta(days=1)
+
+    for _ in range(count):
+        n = next(_sequence)
+        clinic = world['make_clinic'](f'Clinic {n}', address=f'Street {n}', email=f'clinic{n}@test.com')
+        ClinicSpecialization.objects.create(clinic=clinic, specialization='therapy')
+        ClinicSpecialization.objects.create(clinic=clinic, specialization='surgery')
+
+        doctor = world['make_doctor'](clinic, f'doctor{n}', first_name=f'Doctor{n}', last_name='Doe')
+        DoctorSchedule.objects.create(doctor=doctor, weekday=0, start_time='09:00', end_time='13:00')
+        DoctorSchedule.objects.create(doctor=doctor, weekday=2, start_time='09:00', end_time='13:00')
+
+        service = Service.objects.create(
+            clinic=clinic,
+            name=f'Service {n}',
+            service_type='consultation',
+            description='Description',
+            price=500,
+            duration_minutes=30
+        )
+
+        world['appointments'].append(Appointment.objects.create(
+            user=world['patient'],
+            doctor=doctor,
+            service=service,
+            appointment_date=tomorrow,
+            appointment_time='10:00'
+        ))
+        SlotHold.objects.create(
+            user=world['patient'],
+            doctor=doctor,
+            appointment_date=tomorrow,
+            appointment_time='11:00',
+            end_time='11:30',
+            expires_at=timezone.now() + timedelta(minutes=10)
+        )
+        FavoriteDoctor.objects.create(user=world['patient'], doctor=doctor)
+        ClinicReview.objects.create(clinic=clinic, user=world['patient'], rating=5, comment='Good')
+        DoctorReview.objects.create(doctor=doctor, user=world['patient'], rating=4, comment='Good')
+
+        world['clinics'].append(clinic)
+        world['doctors'].append(doctor)
+
+    return world
+
+
+@pytest.fixture
+def world(make_clinic, make_doctor):
+
+    return seed({
+        'make_clinic': make_clinic,
+        'make_doctor': make_doctor,
+        'patient': User.objects.create_user(username='patient', password='pass'),
+        'admin': User.objects.create_user(username='admin', password='pass', role='admin'),
+        'appointments': [],
+        'clinics': [],
+        'doctors': [],
+    }, 1)
+
+
+# (url, user key or None for anonymous, query budget)
+ENDPOINTS = {
+    'clinic-list': (lambda w: '/api/clinics/', None, 3),
+    'clinic-detail': (lambda w: f'/api/clinics/{w["clinics"][0].id}/', None, 3),
+    'doctor-list': (lambda w: '/api/doctors/', None, 2),
+    'doctor-detail': (lambda w: f'/api/doctors/{w["doctors"][0].id}/', None, 3),
+    'service-list': (lambda w: '/api/services/', None, 2),
+    'appointment-list': (lambda w: '/api/appointments/', 'patient', 2),
+    'appointment-list-admin': (lambda w: '/api/appointments/', 'admin', 2),
+    'appointment-detail': (lambda w: f'/api/appointments/{w["appointments"][0].id}/', 'patient', 1),
+    'slot-hold-list': (lambda w: '/api/slot-holds/', 'patient', 2),
+    'favorite-list': (lambda w: '/api/favorites/', 'patient', 2),
+    'clinic-review-list': (lambda w: '/api/clinic-reviews/', None, 1),
+    'doctor-review-list': (lambda w: '/api/doctor-reviews/', None, 1),
+}
+
+
+def count_queries(world, endpoint):
+
+    url, user, _ = ENDPOINTS[endpoint]
+    client = APIClient()
+    if user:
+        client.force_authenticate(user=world[user])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url(world))
+
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+
+    @pytest.mark.parametrize('endpoint', ENDPOINTS)
+    def test_endpoint_stays_within_budget(self, world, endpoint):
+
+        small = count_queries(world, endpoint)
+        seed(world, EXTRA_ROWS)
+        large = count_queries(world, endpoint)
+
+        assert large == small, f'{endpoint}: {small} queries for one row, {large} for a full page'
+        assert large <= ENDPOINTS[endpoint][2]
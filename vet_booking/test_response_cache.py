@@ -0,0 +1,117 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from vet_booking import cache
+from clinics.models import ClinicSpecialization
+from doctors.models import DoctorSchedule
+from services.models import Service
+from reviews.models import ClinicReview, DoctorReview
+
+User = get_user_model()
+
+
+@pytest.fixture
+def clinic(make_clinic):
+
+    return make_clinic('Clinic')
+
+
+@pytest.fixture
+def doctor(clinic, make_doctor):
+
+    return make_doctor(clinic, 'doctor')
+
+
+@pytest.fixture
+def api_client():
+
+    return APIClient()
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+
+    def test_repeated_anonymous_reads_are_served_from_cache(self, api_client, clinic, django_assert_num_queries):
+
+        first = api_client.get('/api/clinics/', {'city': 'Kyiv', 'ordering': 'name'})
+
+        with django_assert_num_queries(0):
+            second = api_client.get('/api/clinics/', {'ordering': 'name', 'city': 'Kyiv'})
+
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.data == first.data
+
+    def test_saving_a_watched_model_invalidates(self, api_client, clinic):
+
+        url = f'/api/clinics/{clinic.id}/'
+        api_client.get(url)
+
+        ClinicSpecialization.objects.create(clinic=clinic, specialization='surgery')
+        response = api_client.get(url)
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['specializations'][0]['specialization'] == 'surgery'
+
+        ClinicReview.objects.create(clinic=clinic, user=User.objects.create(username='author'), rating=4,
+                                    comment='Good')
+        assert api_client.get('/api/clinics/').data['results'][0]['review_count'] == 1
+
+    def test_review_feeds_follow_renamed_clinics_and_doctors(self, api_client, clinic, doctor):
+
+        author = User.objects.create(username='author')
+        ClinicReview.objects.create(clinic=clinic, user=author, rating=4, comment='Good')
+        DoctorReview.objects.create(doctor=doctor, user=author, rating=5, comment='Great')
+        api_client.get('/api/clinic-reviews/')
+        api_client.get('/api/doctor-reviews/')
+
+        clinic.name = 'Renamed'
+        clinic.save()
+        doctor.last_name = 'Roe'
+        doctor.save()
+
+        assert api_client.get('/api/clinic-reviews/').data['results'][0]['clinic_name'] == 'Renamed'
+        assert api_client.get('/api/doctor-reviews/').data['results'][0]['doctor_name'] == 'John Roe'
+
+    def test_version_moves_after_ratings_are_updated(self, api_client, clinic, monkeypatch):
+
+        bump_version = cache.bump_version
+
+        def bump_and_read(namespace):
+            # A read racing the save lands right after each bump
+            bump_version(namespace)
+            api_client.get('/api/clinics/')
+            api_client.get(f'/api/clinics/{clinic.id}/bundle/')
+
+        monkeypatch.setattr(cache, 'bump_version', bump_and_read)
+        ClinicReview.objects.create(clinic=clinic, user=User.objects.create(username='author'), rating=4,
+                                    comment='Good')
+        monkeypatch.undo()
+
+        assert api_client.get('/api/clinics/').data['results'][0]['review_count'] == 1
+        assert api_client.get(f'/api/clinics/{clinic.id}/bundle/').data['reviews']['count'] == 1
+
+    def test_unrelated_changes_keep_the_entry(self, api_client, clinic, doctor):
+
+        api_client.get('/api/clinics/')
+        Service.objects.create(clinic=clinic, name='Checkup', service_type='consultation', description='Checkup',
+                               price=300, duration_minutes=30)
+
+        assert api_client.get('/api/clinics/')['X-Cache'] == 'HIT'
+
+        api_client.get(f'/api/doctors/{doctor.id}/')
+        DoctorSchedule.objects.create(doctor=doctor, weekday=0, start_time='09:00', end_time='17:00')
+
+        response = api_client.get(f'/api/doctors/{doctor.id}/')
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.data['schedules']) == 1
+
+    def test_signed_in_and_clock_dependent_requests_are_not_cached(self, api_client, clinic):
+
+        assert 'X-Cache' not in api_client.get('/api/clinics/', {'open_now': 'true'})
+
+        api_client.force_authenticate(user=User.objects.create(username='patient'))
+        api_client.get('/api/clinics/')
+
+        assert 'X-Cache' not in api_client.get('/api/clinics/')
@@ -7,8 +7,9 @@ from rest_framework.routers import DefaultRouter
 from clinics.views import ClinicViewSet
 from doctors.views import DoctorViewSet, FavoriteDoctorViewSet
 from services.views import ServiceViewSet
-from appointments.views import AppointmentViewSet
+from appointments.views import AppointmentViewSet, EarliestAvailabilityView, SlotHoldViewSet, calendar_feed
 from reviews.views import ClinicReviewViewSet, DoctorReviewViewSet
+from search.views import AutocompleteView, SearchView
 from users.views import UserRegistrationView, UserProfileView, LogoutView
 from clinics.views import get_google_maps_key
 router = DefaultRouter()
@@ -16,6 +17,7 @@ router.register(r'clinics', ClinicViewSet, basename='clinic')
 router.register(r'doctors', DoctorViewSet, basename='doctor')
 router.register(r'services', ServiceViewSet, basename='service')
 router.register(r'appointments', AppointmentViewSet, basename='appointment')
+router.register(r'slot-holds', SlotHoldViewSet, basename='slot-hold')
 router.register(r'clinic-reviews', ClinicReviewViewSet, basename='clinic-review')
 router.register(r'doctor-reviews', DoctorReviewViewSet, basename='doctor-review')
 router.register(r'favorites', FavoriteDoctorViewSet, basename='favorite-doctor')
@@ -24,6 +26,10 @@ urlpatterns = [
     path('admin/', admin.site.urls),
 
     path('api/config/google-maps-key/', get_google_maps_key, name='google-maps-key'),
+    path('api/availability/earliest/', EarliestAvailabilityView.as_view(), name='earliest-availability'),
+    path('api/calendar/<str:token>.ics', calendar_feed, name='calendar-feed'),
+    path('api/search/', SearchView.as_view(), name='search'),
+    path('api/autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
     path('api/', include(router.urls)),
 
     # Authentication